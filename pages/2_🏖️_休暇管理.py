@@ -23,11 +23,27 @@ from shift_scheduler import (
     get_absence,
     list_absences_for_employee,
     get_month_range,
+    repair_shifts,
+    load_area_registry,
+    set_area_registry,
 )
 
 st.set_page_config(page_title="休暇管理", page_icon="🏖️", layout="wide")
 
+
+def repair_roster(employee_id, start, end):
+    """登録済みシフトのうち、休暇で勤務できなくなった枠だけを差し替える"""
+    # シフト生成ページで設定した連続勤務・週の労働時間の上限を守る
+    result = repair_shifts(start, end, [employee_id], limits=st.session_state.get("work_limits"))
+    if result.removed:
+        st.toast(f"🔧 シフト{len(result.removed)}件を差し替えました（補充 {len(result.added)}件）")
+    for issue in result.issues:
+        st.toast(f"⚠️ {issue.message}")
+
+
 init_database()
+# エリアごとの担当可能な職員タイプとスキル項目を読み込む（差し替えも生成と同じ規則で行う）
+set_area_registry(load_area_registry())
 
 st.title("🏖️ 休暇管理")
 
@@ -273,6 +289,7 @@ with tab1:
                                     type_map[absence_type],
                                     reason
                                 )
+                                repair_roster(selected_employee['id'], date_str, date_str)
                                 st.success(f"✅ {absence_type}を登録しました")
                             st.rerun()
 
@@ -315,6 +332,11 @@ with tab1:
                     count += 1
                 current += timedelta(days=1)
             
+            repair_roster(
+                selected_employee['id'],
+                bulk_start.strftime("%Y-%m-%d"),
+                bulk_end.strftime("%Y-%m-%d"),
+            )
             st.success(f"✅ {count}日分の{bulk_type}を登録しました")
             st.rerun()
 
@@ -2,7 +2,11 @@
 シフト生成ページ
 """
 import streamlit as st
+import os
+import pandas as pd
+import plotly.express as px
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -22,17 +26,102 @@ from shift_scheduler import (
     create_shift,
     delete_shifts_by_date_range,
     generate_shifts,
+    generate_shifts_iter,
+    generate_pareto_front,
+    generation_fingerprint,
+    get_generation_cache,
     calculate_skill_balance,
     get_month_range,
     ShiftGenerationError,
+    GenerationReport,
+    AvailabilityIndex,
+    MODE_WEIGHTS,
+    ScoringWeights,
+    WorkLimits,
+    check_feasibility,
+    improve_shifts,
+    load_warm_start,
+    list_locked_shifts,
     auto_assign_and_save_breaks,
     list_shifts,
+    load_area_registry,
+    set_area_registry,
+    Scenario,
+    ScenarioInputs,
+    absence_days,
+    run_scenarios,
 )
 
 st.set_page_config(page_title="シフト生成", page_icon="🎯", layout="wide")
 
+
+def render_issue(issue):
+    """生成失敗の詳細を表示する"""
+    st.warning(issue.message)
+
+    detail_lines = []
+    if issue.date and issue.time_slot_name:
+        detail_lines.append(f"対象: {issue.date} {issue.time_slot_name}")
+    if issue.required is not None and issue.available is not None:
+        detail_lines.append(
+            f"必要人数: {issue.required}名 / 確保できた人数: {issue.available}名"
+        )
+    if issue.shortage:
+        detail_lines.append(f"不足人数: {issue.shortage}名")
+
+    if detail_lines:
+        st.markdown("\n".join(f"- {line}" for line in detail_lines))
+
+    if issue.available_employees:
+        st.info(
+            "割り当て可能と判断された職員: "
+            + ", ".join(issue.available_employees)
+        )
+
+    if issue.rejections:
+        with st.expander("除外された理由の詳細"):
+            for summary in issue.rejections:
+                label = f"{summary.reason} ({summary.count}名)"
+                st.write(label)
+                if summary.examples:
+                    st.write("例: " + ", ".join(summary.examples))
+
+
+def save_shifts(shifts):
+    """シフトを保存し、保存件数と重複で保存できなかったシフトの一覧を返す"""
+    saved = 0
+    failed = []
+    for shift in shifts:
+        if create_shift(shift.date, shift.time_slot_id, shift.employee_id):
+            saved += 1
+        else:
+            failed.append(f"{shift.date} {shift.time_slot_name} - {shift.employee_name}")
+    return saved, failed
+
+
+def render_generation_error(issue, saved=0, headcount_feasible=False):
+    """生成失敗時のメッセージを表示する
+
+    ``headcount_feasible`` は事前の最大フローチェックを通過したかどうか。
+    このチェックは固定シフトと勤務上限を考慮しないため、各時間帯の人数だけを満たせることしか示さない。
+    """
+    st.error("❌ シフト生成に失敗しました")
+    if saved:
+        st.info(f"💾 失敗した日より前の {saved}件のシフトは保存済みです")
+    if headcount_feasible:
+        st.info(
+            "💡 各時間帯の必要人数を満たす割り当て自体は存在します（固定シフトと勤務上限は考慮していません）。"
+            "最適化モードを変更するか、固定シフトや勤務上限の設定を見直して再度お試しください。"
+        )
+    else:
+        st.info("💡 最適化モードを変更するか、固定シフトや勤務上限の設定を見直して再度お試しください。")
+    render_issue(issue)
+
+
 # データベース初期化
 init_database()
+# エリアごとの担当可能な職員タイプとスキル項目を読み込む
+set_area_registry(load_area_registry())
 
 st.title("🎯 シフト自動生成")
 st.markdown("---")
@@ -197,26 +286,124 @@ st.subheader("🔧 オプション")
 # 最適化モード選択
 optimization_mode = st.selectbox(
     "最適化モード",
-    options=["balance", "skill", "days"],
+    options=["balance", "skill", "days", "exact", "custom"],
     format_func=lambda x: {
         "balance": "⚖️ バランス（勤務回数とスキルの両方を考慮）",
         "skill": "🎯 スキル重視（スキル能力の平均化を優先）",
-        "days": "📅 日数重視（勤務回数の均等化を優先）"
+        "days": "📅 日数重視（勤務回数の均等化を優先）",
+        "exact": "🧮 厳密解（1日ごとに分枝限定法で最適化）",
+        "custom": "🎛️ カスタム（重みを指定）"
     }[x],
     index=0,
     help="""
     **バランス**: 勤務回数とスキル能力の両方を考慮して最適化します（推奨）
     **スキル重視**: 各時間帯のスキル能力を平均化し、日によるサービス品質の偏りを防止します
     **日数重視**: 職員の勤務回数をできるだけ均等にすることを優先します
+    **厳密解**: 目標スキルからのずれと勤務回数の偏りの合計を1日ごとに最小化します（小規模な職場向け。時間がかかります）
+    **カスタム**: 勤務回数・スキル・連続勤務・午前からの継続の重みを指定します
     """
 )
 
+if optimization_mode == "custom":
+    balance_weights = MODE_WEIGHTS["balance"]
+    col_w1, col_w2, col_w3, col_w4 = st.columns(4)
+    with col_w1:
+        work_weight = st.number_input(
+            "勤務回数の重み", min_value=0.0, value=10.0, step=1.0,
+            help="勤務回数が1回多い職員ほど、この値だけ選ばれにくくなります"
+        )
+    with col_w2:
+        skill_weight = st.number_input(
+            "スキル差の重み", min_value=0.0, value=balance_weights.skill_deviation, step=0.1,
+            help="目標スキルとの差1点あたりの重み（時間帯のスキル重みが掛かります）"
+        )
+    with col_w3:
+        consecutive_weight = st.number_input(
+            "連続勤務の重み", min_value=0.0, value=0.0, step=1.0,
+            help="前日までの連続勤務1日あたり、この値だけ選ばれにくくなります"
+        )
+    with col_w4:
+        continuity_weight = st.number_input(
+            "午前からの継続の重み", min_value=0.0, value=0.0, step=1.0,
+            help="午後の時間帯で、同じエリアの午前に勤務している職員をこの値だけ優先します"
+        )
+    optimization_mode = ScoringWeights(
+        work=work_weight,
+        skill_deviation=skill_weight,
+        consecutive_days=consecutive_weight,
+        continuity=continuity_weight,
+    )
+
+enforce_limits = st.checkbox(
+    "連続勤務と週の労働時間の上限を守る",
+    value=False,
+    help="チェックを入れると、上限を超える職員はその時間帯に割り当てません。週の上限は勤務形態の1日の労働時間×週の勤務日数です（勤務形態のない職員は週40時間）"
+)
+work_limits = None
+if enforce_limits:
+    col_l1, col_l2 = st.columns(2)
+    with col_l1:
+        max_consecutive_days = st.number_input(
+            "連続勤務の上限（日）", min_value=1, max_value=13, value=6, step=1
+        )
+    with col_l2:
+        weekly_workdays = st.number_input(
+            "週の勤務日数", min_value=1.0, max_value=6.0, value=5.0, step=0.5,
+            help="月曜〜日曜の労働時間の上限を、1日の労働時間の何日分とするか"
+        )
+    work_limits = WorkLimits(
+        max_consecutive_days=int(max_consecutive_days),
+        weekly_workdays=weekly_workdays,
+    )
+# 休暇管理ページの差し替えにも同じ上限を使う
+st.session_state.work_limits = work_limits
+
+warm_start = st.checkbox(
+    "既存のシフトを残して空き枠だけ埋める",
+    value=False,
+    help="チェックを入れると、登録済みのシフトはそのまま残し、不足している枠だけを割り当てます。前の締め期間の勤務回数も考慮して公平に配分します"
+)
+
 overwrite = st.checkbox(
     "既存のシフトを上書きする",
     value=True,
+    disabled=warm_start,
     help="チェックを入れると、指定期間の既存シフトを削除してから新規生成します"
 )
 
+improve_seconds = st.number_input(
+    "改善フェーズの時間（秒）",
+    min_value=0.0,
+    max_value=60.0,
+    value=0.0,
+    step=1.0,
+    help="0より大きい値を指定すると、生成後に職員の入れ替えを試してスキルと勤務回数の偏りをさらに小さくします"
+)
+
+n_starts = st.number_input(
+    "生成の試行回数",
+    min_value=1,
+    max_value=32,
+    value=1,
+    step=1,
+    help="2以上を指定すると、同点の職員の選び方を変えて複数回生成し、スキルと勤務回数の偏りが最も小さい結果を採用します（複数のCPUコアで並列に実行します）"
+)
+
+time_limit = st.number_input(
+    "生成の時間制限（秒）",
+    min_value=0.0,
+    max_value=600.0,
+    value=0.0,
+    step=5.0,
+    help="0より大きい値を指定すると、制限時間に達した時点までに得られた最良の結果を使用します（0は無制限）"
+)
+
+collect_all = st.checkbox(
+    "人員不足があっても最後まで確認する",
+    value=False,
+    help="チェックを入れると、不足している日時をすべて洗い出して一覧表示します（シフトは保存されません）"
+)
+
 st.markdown("---")
 
 # 生成ボタン
@@ -225,151 +412,413 @@ col_btn1, col_btn2 = st.columns([3, 1])
 with col_btn1:
     if st.button("🚀 シフトを生成", type="primary", width="stretch"):
         with st.spinner("🔄 シフトを生成中..."):
-            # 既存シフトの削除
-            if overwrite:
-                deleted = delete_shifts_by_date_range(start_date, end_date)
-                if deleted > 0:
-                    st.info(f"🗑️ 既存のシフト {deleted}件を削除しました")
-            
-            # 最適化実行（V3エンジン）
-            try:
-                result_shifts = generate_shifts(
-                    employees=employees,
-                    time_slots=time_slots,
-                    start_date=start_date,
-                    end_date=end_date,
-                    optimisation_mode=optimization_mode,
+            availability = AvailabilityIndex.load(start_date, end_date)
+
+            # 事前の実現可能性チェック（最大フロー）
+            feasibility = check_feasibility(
+                employees, time_slots, start_date, end_date, availability=availability
+            )
+            if not feasibility.is_feasible and not collect_all:
+                st.error(
+                    f"❌ どのように割り当てても必要人数を満たせません（少なくとも {feasibility.shortage}名分不足）"
                 )
-            except ShiftGenerationError as exc:
-                issue = exc.issue
-                st.error("❌ シフト生成に失敗しました")
-                st.warning(issue.message)
-
-                detail_lines = []
-                if issue.date and issue.time_slot_name:
-                    detail_lines.append(f"対象: {issue.date} {issue.time_slot_name}")
-                if issue.required is not None and issue.available is not None:
-                    detail_lines.append(
-                        f"必要人数: {issue.required}名 / 確保できた人数: {issue.available}名"
-                    )
-                if issue.shortage:
-                    detail_lines.append(f"不足人数: {issue.shortage}名")
+                for issue in feasibility.issues:
+                    render_issue(issue)
+                st.stop()
 
-                if detail_lines:
-                    st.markdown("\n".join(f"- {line}" for line in detail_lines))
+            warm = (
+                load_warm_start(start_date, end_date, employees, time_slots)
+                if warm_start
+                else None
+            )
 
-                if issue.available_employees:
-                    st.info(
-                        "割り当て可能と判断された職員: "
-                        + ", ".join(issue.available_employees)
-                    )
+            # 固定シフトは上書き時も残す
+            locked = list_locked_shifts(start_date, end_date)
+            if locked:
+                st.info(f"🔒 固定シフト {len(locked)}件はそのまま残します")
 
-                if issue.rejections:
-                    with st.expander("除外された理由の詳細"):
-                        for summary in issue.rejections:
-                            label = f"{summary.reason} ({summary.count}名)"
-                            st.write(label)
-                            if summary.examples:
-                                st.write("例: " + ", ".join(summary.examples))
-                st.stop()
-            else:
-                shift_payloads = [shift.to_dict() for shift in result_shifts]
+            # 既存シフトの削除
+            if overwrite and not warm_start and not collect_all:
+                deleted = delete_shifts_by_date_range(start_date, end_date, keep_locked=True)
+                if deleted > 0:
+                    st.info(f"🗑️ 既存のシフト {deleted}件を削除しました")
 
-                # データベースに保存
-                success_count = 0
-                failed_count = 0
-                error_messages = []
-
-                for payload in shift_payloads:
-                    shift_id = create_shift(
-                        payload["date"],
-                        payload["time_slot_id"],
-                        payload["employee_id"],
+            # 最適化実行（V3エンジン）
+            report = GenerationReport() if collect_all else None
+            progress_bar = st.progress(0.0, text="シフトを生成中...")
+            progress = {"fraction": 0.0}
+
+            def on_progress(fraction, best_score):
+                progress["fraction"] = fraction
+                text = f"シフトを生成中... {fraction:.0%}"
+                if best_score is not None:
+                    text += f"（評価値 {best_score:.1f}）"
+                progress_bar.progress(min(fraction, 1.0), text=text)
+
+            # 保存済みのシフト（固定・既存）は改善でも動かさず、保存もしない
+            stored = set(locked)
+            if warm:
+                stored |= {
+                    (s.date, s.time_slot_id, s.employee_id) for s in warm.initial_shifts
+                }
+
+            def is_stored(shift):
+                return (shift.date, shift.time_slot_id, shift.employee_id) in stored
+
+            generation_options = dict(
+                employees=employees,
+                time_slots=time_slots,
+                start_date=start_date,
+                end_date=end_date,
+                optimisation_mode=optimization_mode,
+                availability=availability,
+                report=report,
+                initial_shifts=warm.initial_shifts if warm else (),
+                carry_over_work_count=warm.carry_over_work_count if warm else None,
+                locked=locked,
+                time_limit_s=time_limit or None,
+                limits=work_limits,
+            )
+
+            # 同じ入力で生成済みの結果があれば再利用する
+            cache = get_generation_cache()
+            cacheable = not collect_all and not time_limit
+            cache_key = (
+                generation_fingerprint(**generation_options, n_starts=int(n_starts))
+                if cacheable
+                else None
+            )
+            cached = cache.get(cache_key, employees, time_slots) if cacheable else None
+            if cached is not None:
+                st.info("♻️ 同じ条件で生成済みの結果を再利用します")
+
+            success_count = 0
+            error_messages = []
+
+            if cached is None and not collect_all and improve_seconds == 0 and int(n_starts) == 1:
+                # 1日分ずつ保存し、保存中に次の日のシフトを計算する
+                result_shifts = []
+                generated = []
+                pending_saves = []
+                generation_error = None
+                with ThreadPoolExecutor(max_workers=1) as writer:
+                    try:
+                        for index, day_shifts in enumerate(
+                            generate_shifts_iter(**generation_options), 1
+                        ):
+                            generated.extend(day_shifts)
+                            new_shifts = [s for s in day_shifts if not is_stored(s)]
+                            result_shifts.extend(new_shifts)
+                            pending_saves.append(writer.submit(save_shifts, new_shifts))
+                            on_progress(index / days, None)
+                    except ShiftGenerationError as exc:
+                        generation_error = exc.issue
+                for future in pending_saves:
+                    saved, failed = future.result()
+                    success_count += saved
+                    error_messages.extend(failed)
+                progress_bar.empty()
+                if generation_error is not None:
+                    render_generation_error(
+                        generation_error, success_count, feasibility.is_feasible
                     )
-                    if shift_id:
-                        success_count += 1
+                    st.stop()
+                if cacheable:
+                    cache.put(cache_key, generated)
+            else:
+                try:
+                    if cached is not None:
+                        result_shifts = cached
+                        on_progress(1.0, None)
                     else:
-                        failed_count += 1
-                        error_messages.append(
-                            f"{payload['date']} {payload['time_slot_name']} - {payload['employee_name']}"
+                        result_shifts = generate_shifts(
+                            **generation_options,
+                            n_starts=int(n_starts),
+                            workers=min(int(n_starts), os.cpu_count() or 1),
+                            on_progress=on_progress,
+                        )
+                        if cacheable:
+                            cache.put(cache_key, result_shifts)
+                except ShiftGenerationError as exc:
+                    render_generation_error(exc.issue, headcount_feasible=feasibility.is_feasible)
+                    st.stop()
+                finally:
+                    progress_bar.empty()
+
+                if report is not None:
+                    if report.optimality_gap is not None:
+                        st.caption(f"🧮 最適性ギャップ: {report.optimality_gap:.1%}")
+                    if report.heuristic_days:
+                        st.caption(
+                            f"🧮 厳密に解けなかった{len(report.heuristic_days)}日は balance で生成しました"
+                            f"（{', '.join(report.heuristic_days)}）。最適性ギャップは算出できません"
+                        )
+                    if report.is_complete:
+                        st.success(
+                            f"✅ 人員不足はありません（{len(result_shifts)}件のシフトを割り当て可能）"
                         )
+                    else:
+                        st.error(f"❌ {len(report.issues)}件の問題が見つかりました")
+                        for index, issue in enumerate(report.issues, 1):
+                            st.markdown(f"**{index}.**")
+                            render_issue(issue)
+                    st.stop()
+
+                if improve_seconds > 0:
+                    result_shifts = improve_shifts(
+                        result_shifts,
+                        employees,
+                        time_slots,
+                        availability=availability,
+                        time_budget_s=improve_seconds,
+                        pinned=[s for s in result_shifts if is_stored(s)],
+                        limits=work_limits,
+                    )
 
-                if failed_count > 0:
-                    st.warning(f"⚠️ {failed_count}件のシフトが重複のため保存されませんでした")
-                    with st.expander("保存に失敗したシフト"):
-                        for msg in error_messages[:10]:  # 最初の10件のみ表示
-                            st.write(f"- {msg}")
-
-                st.success(f"✅ シフト生成完了！ {success_count}件のシフトを作成しました")
-                if success_count > 0:
-                    st.balloons()
-
-                # 休憩時間の自動割り当て
-                if success_count > 0:
-                    with st.spinner("⏰ 休憩時間を自動割り当て中..."):
-                        # 生成期間の各日について休憩を割り当て
-                        total_break_count = 0
-                        break_warnings = []
-                        current_date = datetime.strptime(start_date, "%Y-%m-%d")
-                        end_date_dt = datetime.strptime(end_date, "%Y-%m-%d")
-                        
-                        while current_date <= end_date_dt:
-                            date_str = current_date.strftime("%Y-%m-%d")
-                            # その日のシフトを取得
-                            daily_shifts = list_shifts(date_str, date_str)
-                            
-                            if daily_shifts:
-                                saved_count, is_valid, warnings = auto_assign_and_save_breaks(
-                                    date_str,
-                                    daily_shifts
-                                )
-                                total_break_count += saved_count
-                                if warnings:
-                                    break_warnings.extend([f"{date_str}: {w}" for w in warnings])
-                            
-                            current_date += timedelta(days=1)
+                # データベースに保存
+                result_shifts = [s for s in result_shifts if not is_stored(s)]
+                success_count, error_messages = save_shifts(result_shifts)
+
+            if progress["fraction"] < 1.0:
+                st.warning("⏱️ 時間制限に達したため、それまでに得られた最良の結果を使用します")
+
+            if error_messages:
+                st.warning(f"⚠️ {len(error_messages)}件のシフトが重複のため保存されませんでした")
+                with st.expander("保存に失敗したシフト"):
+                    for msg in error_messages[:10]:  # 最初の10件のみ表示
+                        st.write(f"- {msg}")
+
+            st.success(f"✅ シフト生成完了！ {success_count}件のシフトを作成しました")
+            if success_count > 0:
+                st.balloons()
+
+            # 休憩時間の自動割り当て
+            if success_count > 0:
+                with st.spinner("⏰ 休憩時間を自動割り当て中..."):
+                    # 生成期間の各日について休憩を割り当て
+                    total_break_count = 0
+                    break_warnings = []
+                    current_date = datetime.strptime(start_date, "%Y-%m-%d")
+                    end_date_dt = datetime.strptime(end_date, "%Y-%m-%d")
+                    
+                    while current_date <= end_date_dt:
+                        date_str = current_date.strftime("%Y-%m-%d")
+                        # その日のシフトを取得
+                        daily_shifts = list_shifts(date_str, date_str)
                         
-                        if total_break_count > 0:
-                            st.success(f"✅ 休憩時間を {total_break_count}件割り当てました")
+                        if daily_shifts:
+                            saved_count, is_valid, warnings = auto_assign_and_save_breaks(
+                                date_str,
+                                daily_shifts
+                            )
+                            total_break_count += saved_count
+                            if warnings:
+                                break_warnings.extend([f"{date_str}: {w}" for w in warnings])
                         
-                        if break_warnings:
-                            with st.expander("⚠️ 休憩割り当ての警告"):
-                                for warning in break_warnings[:20]:  # 最大20件表示
-                                    st.write(f"- {warning}")
-
-                # 統計情報表示
-                stats = calculate_skill_balance(result_shifts, time_slots)
-                
-                st.markdown("### 📊 生成結果の統計")
-                
-                col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
-                
-                with col_stat1:
-                    st.metric("平均スキル合計", f"{stats['avg_skill']:.1f}")
-                
-                with col_stat2:
-                    st.metric("標準偏差", f"{stats['std_skill']:.2f}")
-                
-                with col_stat3:
-                    st.metric("最小値", f"{stats['min_skill']:.0f}")
-                
-                with col_stat4:
-                    st.metric("最大値", f"{stats['max_skill']:.0f}")
-                
-                if stats['std_skill'] < 10:
-                    st.success("🌟 スキルバランスが非常に良好です！")
-                elif stats['std_skill'] < 20:
-                    st.info("✨ スキルバランスは良好です")
-                else:
-                    st.warning("⚠️ スキルにやや偏りがあります")
-                
-                st.markdown("---")
-                st.info("📋 「シフト表示」ページで生成されたシフトを確認できます")
+                        current_date += timedelta(days=1)
+                    
+                    if total_break_count > 0:
+                        st.success(f"✅ 休憩時間を {total_break_count}件割り当てました")
+                    
+                    if break_warnings:
+                        with st.expander("⚠️ 休憩割り当ての警告"):
+                            for warning in break_warnings[:20]:  # 最大20件表示
+                                st.write(f"- {warning}")
+
+            # 統計情報表示
+            stats = calculate_skill_balance(result_shifts, time_slots)
+            
+            st.markdown("### 📊 生成結果の統計")
+            
+            col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
+            
+            with col_stat1:
+                st.metric("平均スキル合計", f"{stats['avg_skill']:.1f}")
+            
+            with col_stat2:
+                st.metric("標準偏差", f"{stats['std_skill']:.2f}")
+            
+            with col_stat3:
+                st.metric("最小値", f"{stats['min_skill']:.0f}")
+            
+            with col_stat4:
+                st.metric("最大値", f"{stats['max_skill']:.0f}")
+            
+            if stats['std_skill'] < 10:
+                st.success("🌟 スキルバランスが非常に良好です！")
+            elif stats['std_skill'] < 20:
+                st.info("✨ スキルバランスは良好です")
+            else:
+                st.warning("⚠️ スキルにやや偏りがあります")
+            
+            st.markdown("---")
+            st.info("📋 「シフト表示」ページで生成されたシフトを確認できます")
 
 with col_btn2:
     if st.button("🔄 リセット", width="stretch"):
         st.rerun()
 
+# スキルと公平性のトレードオフ
+with st.expander("⚖️ スキルと勤務回数のトレードオフを比較する"):
+    st.caption(
+        "スキルの偏りと勤務回数の偏りのどちらも他より悪くない候補を一度にまとめて計算します。"
+        "グラフで比較し、採用する候補を選んで保存できます。"
+    )
+    pareto_key = (start_date, end_date, warm_start, work_limits)
+    if st.button("📈 候補を計算"):
+        with st.spinner("🔄 候補を計算中..."):
+            availability = AvailabilityIndex.load(start_date, end_date)
+            warm = (
+                load_warm_start(start_date, end_date, employees, time_slots)
+                if warm_start
+                else None
+            )
+            try:
+                st.session_state.pareto_front = (
+                    pareto_key,
+                    generate_pareto_front(
+                        employees,
+                        time_slots,
+                        start_date,
+                        end_date,
+                        availability=availability,
+                        initial_shifts=warm.initial_shifts if warm else (),
+                        carry_over_work_count=warm.carry_over_work_count if warm else None,
+                        locked=list_locked_shifts(start_date, end_date),
+                        limits=work_limits,
+                    ),
+                )
+            except ShiftGenerationError as exc:
+                render_generation_error(exc.issue)
+                st.stop()
+
+    stored_front = st.session_state.get("pareto_front")
+    if stored_front and stored_front[0] == pareto_key:
+        front = stored_front[1]
+        front_df = pd.DataFrame(
+            [
+                {
+                    "候補": f"{index}. {roster.label}",
+                    "スキル合計の標準偏差": round(roster.skill_std, 2),
+                    "勤務回数の標準偏差": round(roster.work_std, 2),
+                }
+                for index, roster in enumerate(front, 1)
+            ]
+        )
+        fig = px.line(
+            front_df,
+            x="スキル合計の標準偏差",
+            y="勤務回数の標準偏差",
+            text="候補",
+            markers=True,
+            title="候補の比較（左下ほど良い）",
+        )
+        fig.update_traces(textposition="top right")
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(front_df, hide_index=True, use_container_width=True)
+
+        choice = st.selectbox(
+            "採用する候補",
+            options=range(len(front)),
+            format_func=lambda index: front_df["候補"][index],
+        )
+        if st.button("💾 この候補を保存"):
+            locked = list_locked_shifts(start_date, end_date)
+            stored = set(locked)
+            if warm_start:
+                warm = load_warm_start(start_date, end_date, employees, time_slots)
+                stored |= {
+                    (s.date, s.time_slot_id, s.employee_id) for s in warm.initial_shifts
+                }
+            elif overwrite:
+                delete_shifts_by_date_range(start_date, end_date, keep_locked=True)
+            saved, failed = save_shifts(
+                [
+                    s for s in front[choice].shifts
+                    if (s.date, s.time_slot_id, s.employee_id) not in stored
+                ]
+            )
+            if failed:
+                st.warning(f"⚠️ {len(failed)}件のシフトが重複のため保存されませんでした")
+            st.success(f"✅ {saved}件のシフトを保存しました")
+
+# 条件を変えた試算（保存しない）
+with st.expander("🔮 条件を変えて試算する（保存しません）"):
+    st.caption(
+        "職員の休み・必要人数・職員の稼働を変えた場合のシフトを、現在の条件と並べて計算します。"
+        "データベースには書き込みません。"
+    )
+    all_employees = list_employees(active_only=False)
+    employee_names = {emp.id: emp.name for emp in all_employees}
+    col_s1, col_s2 = st.columns(2)
+    with col_s1:
+        absent_id = st.selectbox(
+            "休む職員",
+            options=[None, *employee_names],
+            format_func=lambda emp_id: "（なし）" if emp_id is None else employee_names[emp_id],
+        )
+        absent_range = st.date_input(
+            "休む期間",
+            value=(datetime.strptime(start_date, "%Y-%m-%d"),),
+            key="scenario_absence_range",
+        )
+        inactive_ids = st.multiselect(
+            "稼働しない職員",
+            options=[emp.id for emp in employees],
+            format_func=lambda emp_id: employee_names[emp_id],
+        )
+    with col_s2:
+        slot_names = {ts.id: ts.display_name or ts.id for ts in time_slots}
+        staff_slot_id = st.selectbox(
+            "必要人数を変える時間帯",
+            options=[None, *slot_names],
+            format_func=lambda slot_id: "（なし）" if slot_id is None else slot_names[slot_id],
+        )
+        staff_count = st.number_input("変更後の必要人数", min_value=0, max_value=10, value=2, step=1)
+
+    if st.button("🔮 試算する"):
+        scenario = Scenario(name="変更後")
+        if absent_id is not None and absent_range:
+            first_day = absent_range[0].strftime("%Y-%m-%d")
+            last_day = absent_range[-1].strftime("%Y-%m-%d")
+            scenario.absences = absence_days(absent_id, first_day, last_day, reason="試算")
+        if staff_slot_id is not None:
+            scenario.required_staff = {staff_slot_id: int(staff_count)}
+        scenario.active = {emp_id: False for emp_id in inactive_ids}
+        with st.spinner("🔄 試算中..."):
+            results = run_scenarios(
+                [Scenario(name="現在の条件"), scenario],
+                ScenarioInputs.load(start_date, end_date),
+                optimisation_mode=optimization_mode,
+                limits=work_limits,
+                workers=2,
+            )
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "条件": result.name,
+                        "シフト数": len(result.shifts),
+                        "不足人数": result.shortage,
+                        "平均スキル": round(result.metrics["avg_skill"], 1),
+                        "スキルの標準偏差": round(result.metrics["std_skill"], 2),
+                        "最低スキル": result.metrics["min_skill"],
+                        "最高スキル": result.metrics["max_skill"],
+                    }
+                    for result in results
+                ]
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        for date_str, slot_id, emp_id in results[1].dropped_locks:
+            st.info(
+                f"📌 {date_str} {slot_names.get(slot_id, slot_id)} の{employee_names.get(emp_id, emp_id)}さんの固定シフトは、"
+                "変更後の条件では勤務できないため外して試算しました"
+            )
+        for issue in results[1].issues:
+            st.warning(issue.message)
+
 # サイドバーにヘルプ
 with st.sidebar:
     st.markdown("### 💡 ヘルプ")
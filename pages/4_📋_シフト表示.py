@@ -21,6 +21,7 @@ from shift_scheduler import (
     init_database,
     list_shifts,
     delete_shift,
+    set_shift_locked,
     get_break_schedules,
     get_employee,
     auto_assign_and_save_breaks,
@@ -303,10 +304,19 @@ with tab1:
                                     
                                     # 職員を表示
                                     for _, shift in period_shifts.iterrows():
-                                        col_a, col_b = st.columns([3, 1])
+                                        col_a, col_lock, col_b = st.columns([3, 1, 1])
                                         with col_a:
-                                            st.text(f"👤 {shift['employee_name']}")
+                                            lock_mark = "🔒 " if shift['is_locked'] else ""
+                                            st.text(f"{lock_mark}👤 {shift['employee_name']}")
                                             st.caption(f"💪 {shift['skill_score']:.1f}")
+                                        with col_lock:
+                                            if st.button(
+                                                "🔓" if shift['is_locked'] else "🔒",
+                                                key=f"lock_{shift['id']}",
+                                                help="固定を解除" if shift['is_locked'] else "固定（再生成で上書きしない）",
+                                            ):
+                                                set_shift_locked(shift['id'], not shift['is_locked'])
+                                                st.rerun()
                                         with col_b:
                                             if st.button("🗑️", key=f"del_{shift['id']}", help="削除"):
                                                 if delete_shift(shift['id']):
@@ -0,0 +1,100 @@
+"""Month-end roster generation for several facility databases.
+
+Runs the shift generation of every given ``shift.db`` in a worker pool and
+prints one consolidated report. Example::
+
+    python scripts/generate_facilities.py clinics/*/shift.db --year 2025 --month 12 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = REPO_ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from shift_scheduler import FacilityConfig, generate_facilities, get_month_range
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate rosters for several facility databases")
+    parser.add_argument("databases", nargs="+", type=Path, help="Facility shift.db files")
+    parser.add_argument("--year", type=int, help="Year of the scheduling month")
+    parser.add_argument("--month", type=int, help="Scheduling month (period starts on the closing day)")
+    parser.add_argument("--closing-day", type=int, default=20, help="Closing day of the period (default 20)")
+    parser.add_argument("--start", help="Start date YYYY-MM-DD (instead of --year/--month)")
+    parser.add_argument("--end", help="End date YYYY-MM-DD (instead of --year/--month)")
+    parser.add_argument(
+        "--mode",
+        default="balance",
+        choices=["balance", "skill", "days", "exact"],
+        help="Optimisation mode (default balance)",
+    )
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Keep stored shifts and only fill open seats",
+    )
+    parser.add_argument(
+        "--save-incomplete",
+        action="store_true",
+        help="Store rosters even when some slots are short-staffed",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    args = parser.parse_args(argv)
+    if args.start and args.end:
+        return args
+    if args.year is None or args.month is None:
+        parser.error("give --year and --month, or --start and --end")
+    args.start, args.end = get_month_range(args.year, args.month, args.closing_day)
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    configs = [
+        FacilityConfig(
+            db_path=path,
+            name=path.parent.name or path.stem,
+            optimisation_mode=args.mode,
+            warm_start=args.warm_start,
+            save_incomplete=args.save_incomplete,
+        )
+        for path in args.databases
+    ]
+
+    print("=" * 60)
+    print(f"Shift Scheduler - Batch generation {args.start} - {args.end}")
+    print("=" * 60)
+
+    report = generate_facilities(configs, args.start, args.end, workers=args.workers)
+    for facility in report.facilities:
+        status = "OK" if facility.is_complete else "NG"
+        print(
+            f"[{status}] {facility.name}: generated {facility.generated}, "
+            f"saved {facility.saved}, deleted {facility.deleted}, issues {len(facility.issues)}"
+        )
+    rows = report.issue_rows()
+    if rows:
+        print("-" * 60)
+        for row in rows:
+            parts = [f"{row['facility']}: [{row['code']}]"]
+            parts += [str(row[key]) for key in ("date", "time_slot") if row.get(key)]
+            print(" ".join([*parts, row["message"]]))
+
+    print("=" * 60)
+    print(f"Saved {report.saved} shifts across {len(report.facilities)} facilities")
+    return 0 if report.is_complete else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,12 @@ PyInstallerでビルドされたexeからStreamlitを起動するランチャー
 """
 import sys
 import os
+import multiprocessing
 from pathlib import Path
 
+# 並列シフト生成のワーカープロセスがexeから起動された場合に備える
+multiprocessing.freeze_support()
+
 # _MEIPASSパスを設定
 if getattr(sys, 'frozen', False):
     base_path = Path(sys._MEIPASS)
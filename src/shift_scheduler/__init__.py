@@ -1,5 +1,12 @@
 """Public API surface for the shift scheduler application."""
-from .availability import available_time_slots, describe_unavailability, is_employee_available
+from .areas import AreaRegistry, get_area_registry, set_area_registry
+from .availability import (
+    AvailabilityIndex,
+    available_time_slots,
+    describe_unavailability,
+    is_employee_available,
+)
+from .batch import BatchReport, FacilityConfig, FacilityResult, generate_facilities
 from .breaks import (
     auto_assign_and_save_breaks,
     generate_time_intervals,
@@ -16,29 +23,63 @@ from .database import (
     delete_employee,
     delete_shift,
     delete_shifts_by_date_range,
+    delete_area_rule,
+    save_generated_shifts,
+    use_database,
     get_absence,
     get_employee,
     get_employment_pattern,
     get_time_slot,
     init_database,
     list_absences_for_employee,
+    list_absences_in_range,
+    list_area_rules,
     list_break_schedules_by_date,
     list_employees,
     list_employment_patterns,
+    list_locked_shifts,
     list_shifts,
     list_time_slots,
+    load_area_registry,
     record_absence,
     remove_absence,
     reset_employment_patterns,
     reset_time_slots,
+    reset_area_rules,
+    save_area_rule,
     set_setting,
+    set_shift_locked,
+)
+from .cache import (
+    GenerationCache,
+    cached_generate_shifts,
+    generation_fingerprint,
+    get_generation_cache,
 )
+from .decomposition import generate_shifts_by_blocks
+from .feasibility import FeasibilityReport, check_feasibility
+from .local_search import improve_shifts
 from .optimizer import (
+    GenerationReport,
     ShiftGenerationError,
     ShiftGenerationIssue,
+    WorkLimits,
     calculate_skill_balance,
     generate_shifts,
+    generate_shifts_iter,
+    score_roster,
+)
+from .pareto import ParetoRoster, generate_pareto_front, roster_objectives
+from .roster_stats import RosterStatistics, RunningStats
+from .repair import RepairResult, WarmStart, load_warm_start, repair_shifts
+from .scenarios import (
+    Scenario,
+    ScenarioInputs,
+    ScenarioResult,
+    absence_days,
+    run_scenarios,
 )
+from .scoring import MODE_WEIGHTS, ScoringWeights
 from .utils import (
     export_to_excel,
     format_time,
@@ -50,9 +91,17 @@ from .utils import (
 )
 
 __all__ = [
+    "AreaRegistry",
+    "get_area_registry",
+    "set_area_registry",
+    "AvailabilityIndex",
     "available_time_slots",
     "describe_unavailability",
     "is_employee_available",
+    "BatchReport",
+    "FacilityConfig",
+    "FacilityResult",
+    "generate_facilities",
     "auto_assign_and_save_breaks",
     "generate_time_intervals",
     "get_break_schedules",
@@ -66,26 +115,64 @@ __all__ = [
     "delete_employee",
     "delete_shift",
     "delete_shifts_by_date_range",
+    "delete_area_rule",
+    "save_generated_shifts",
+    "use_database",
     "get_absence",
     "get_employee",
     "get_employment_pattern",
     "get_time_slot",
     "init_database",
     "list_absences_for_employee",
+    "list_absences_in_range",
+    "list_area_rules",
     "list_break_schedules_by_date",
     "list_employees",
     "list_employment_patterns",
+    "list_locked_shifts",
     "list_shifts",
     "list_time_slots",
+    "load_area_registry",
     "record_absence",
     "remove_absence",
     "reset_employment_patterns",
     "reset_time_slots",
+    "reset_area_rules",
+    "save_area_rule",
     "set_setting",
+    "set_shift_locked",
+    "GenerationCache",
+    "cached_generate_shifts",
+    "generation_fingerprint",
+    "get_generation_cache",
+    "FeasibilityReport",
+    "check_feasibility",
+    "improve_shifts",
     "calculate_skill_balance",
+    "score_roster",
     "generate_shifts",
+    "generate_shifts_iter",
+    "generate_shifts_by_blocks",
+    "GenerationReport",
+    "ParetoRoster",
+    "generate_pareto_front",
+    "roster_objectives",
     "ShiftGenerationError",
     "ShiftGenerationIssue",
+    "WorkLimits",
+    "MODE_WEIGHTS",
+    "ScoringWeights",
+    "RosterStatistics",
+    "RunningStats",
+    "RepairResult",
+    "repair_shifts",
+    "WarmStart",
+    "load_warm_start",
+    "Scenario",
+    "ScenarioInputs",
+    "ScenarioResult",
+    "absence_days",
+    "run_scenarios",
     "export_to_excel",
     "format_time",
     "generate_date_list",
@@ -0,0 +1,146 @@
+"""Area eligibility and skill rules compiled into lookup tables.
+
+Each :class:`~shift_scheduler.models.AreaRule` (one row of the
+``area_rules`` table) names the employee types allowed in an area and the
+``Employee`` skill attribute that scores its morning and afternoon slots,
+and optionally the employee types that may only work there alongside a
+lead type (the TYPE_D pairing rule of リハ室). :class:`AreaRegistry` compiles the rules once into ``area → employee type →
+skill getters`` tables, so eligibility and skill checks are dictionary
+lookups rather than comparisons of area and type names, and adding an area
+such as 検査室 is a data change.
+
+The optimiser consults the active registry (:func:`get_area_registry`),
+which holds :data:`DEFAULT_AREA_RULES` until :func:`set_area_registry`
+installs one, e.g. compiled from the database by
+:func:`~shift_scheduler.database.load_area_registry`.
+"""
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import Callable, Dict, FrozenSet, Iterable, List, Tuple
+
+from .models import AreaRule, Employee, TimeSlot
+
+SKILL_ATTRIBUTES = ("skill_reha", "skill_reception_am", "skill_reception_pm", "skill_general")
+
+DEFAULT_AREA_RULES: Tuple[AreaRule, ...] = (
+    AreaRule(
+        area="リハ室",
+        employee_types=("TYPE_A", "TYPE_C", "TYPE_D"),
+        skill_morning="skill_reha",
+        skill_afternoon="skill_reha",
+        lead_types=("TYPE_A", "TYPE_C"),
+        paired_types=("TYPE_D",),
+    ),
+    # 受付スキルには医事能力（保険登録、会計など）が含まれる
+    AreaRule(
+        area="受付",
+        employee_types=("TYPE_A", "TYPE_B"),
+        skill_morning="skill_reception_am",
+        skill_afternoon="skill_reception_pm",
+    ),
+)
+
+_Getter = Callable[[Employee], int]
+
+
+class AreaRegistry:
+    """Compiled :class:`~shift_scheduler.models.AreaRule` lookups.
+
+    Areas without a rule accept every employee and score the general skill
+    only, as before the registry existed.
+    """
+
+    def __init__(self, rules: Iterable[AreaRule]) -> None:
+        self.rules: Dict[str, AreaRule] = {}
+        # area → (morning getter, afternoon getter)
+        self._skills: Dict[str, Tuple[_Getter, _Getter]] = {}
+        # area → allowed employee type → the same getters
+        self._eligible: Dict[str, Dict[str, Tuple[_Getter, _Getter]]] = {}
+        # area → (lead types, paired types), for areas with a pairing rule
+        self._pairing: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        for rule in rules:
+            for attribute in (rule.skill_morning, rule.skill_afternoon):
+                if attribute not in SKILL_ATTRIBUTES:
+                    raise ValueError(f"{rule.area}: 不明なスキル項目です（{attribute}）")
+            if rule.paired_types:
+                if not rule.lead_types:
+                    raise ValueError(f"{rule.area}: ペア配置の相手となる職員タイプがありません")
+                self._pairing[rule.area] = (frozenset(rule.lead_types), frozenset(rule.paired_types))
+            getters = (attrgetter(rule.skill_morning), attrgetter(rule.skill_afternoon))
+            self.rules[rule.area] = rule
+            self._skills[rule.area] = getters
+            self._eligible[rule.area] = {employee_type: getters for employee_type in rule.employee_types}
+
+    def areas(self) -> List[str]:
+        """Registered area names."""
+        return list(self.rules)
+
+    def can_assign(self, employee: Employee, time_slot: TimeSlot) -> bool:
+        """Whether the employee's type is allowed in the slot's area with a non-zero skill."""
+        by_type = self._eligible.get(time_slot.area)
+        if by_type is None:
+            return True
+        getters = by_type.get(employee.employee_type)
+        if getters is None:
+            return False
+        morning, afternoon = getters
+        return morning(employee) > 0 or afternoon(employee) > 0
+
+    def has_pairing(self, area: str) -> bool:
+        """Whether ``area`` has a pairing rule."""
+        return area in self._pairing
+
+    def requires_pairing(self, employee: Employee, time_slot: TimeSlot) -> bool:
+        """Whether ``employee`` may only work ``time_slot`` alongside a lead."""
+        pairing = self._pairing.get(time_slot.area)
+        return pairing is not None and employee.employee_type in pairing[1]
+
+    def is_lead(self, employee: Employee, time_slot: TimeSlot) -> bool:
+        """Whether ``employee`` counts as the lead of a paired colleague in ``time_slot``."""
+        pairing = self._pairing.get(time_slot.area)
+        return pairing is not None and employee.employee_type in pairing[0]
+
+    def violates_pairing(self, employees: Iterable[Employee], time_slot: TimeSlot) -> bool:
+        """Whether ``employees`` of ``time_slot`` include paired staff but no lead."""
+        pairing = self._pairing.get(time_slot.area)
+        if pairing is None:
+            return False
+        lead_types, paired_types = pairing
+        types = {employee.employee_type for employee in employees}
+        return bool(paired_types & types) and not (lead_types & types)
+
+    def skill_score(self, employee: Employee, time_slot: TimeSlot) -> int:
+        """General skill plus the area's skill for the slot's period.
+
+        Slots of neither period score the mean of the morning and afternoon
+        skills.
+        """
+        general = employee.skill_general
+        getters = self._skills.get(time_slot.area)
+        if getters is None:
+            return general
+        morning, afternoon = getters
+        if time_slot.period == "morning":
+            return morning(employee) + general
+        if time_slot.period == "afternoon":
+            return afternoon(employee) + general
+        return (morning(employee) + afternoon(employee)) // 2 + general
+
+
+_registry = AreaRegistry(DEFAULT_AREA_RULES)
+
+
+def get_area_registry() -> AreaRegistry:
+    """The registry the optimiser currently uses."""
+    return _registry
+
+
+def set_area_registry(registry: AreaRegistry) -> None:
+    """Make ``registry`` the one the optimiser uses.
+
+    Also the initializer of the optimiser's worker processes, so spawned
+    workers use the same rules as the parent.
+    """
+    global _registry
+    _registry = registry
@@ -2,10 +2,16 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Iterable, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from .database import get_absence, get_employment_pattern
-from .models import Employee, TimeSlot
+from .database import (
+    get_absence,
+    get_employment_pattern,
+    list_absences_in_range,
+    list_employment_patterns,
+)
+from .models import Absence, Employee, EmploymentPattern, TimeSlot
 
 WEEKDAY_NAMES = ["月", "火", "水", "木", "金", "土", "日"]
 
@@ -14,6 +20,11 @@ def _parse_date(date_str: str) -> datetime:
     return datetime.strptime(date_str, "%Y-%m-%d")
 
 
+@lru_cache(maxsize=1024)
+def _weekday(date_str: str) -> int:
+    return _parse_date(date_str).weekday()
+
+
 def _check_basic_slot_availability(time_slot: TimeSlot, date_obj: datetime) -> Optional[str]:
     """Check basic slot availability (active status, weekday match, Sunday closure).
     
@@ -36,7 +47,11 @@ def _check_absence(employee: Employee, date_str: str, time_slot: TimeSlot) -> Op
     
     Returns None if no conflict, absence description if conflict.
     """
-    absence = get_absence(employee.id, date_str)
+    return _absence_conflict(get_absence(employee.id, date_str), time_slot)
+
+
+def _absence_conflict(absence: Optional[Absence], time_slot: TimeSlot) -> Optional[str]:
+    """Return the absence type if ``absence`` blocks ``time_slot``."""
     if not absence:
         return None
     
@@ -59,6 +74,11 @@ def _check_employment_pattern(employee: Employee, time_slot: TimeSlot) -> Option
         return None
     
     pattern = get_employment_pattern(employee.employment_pattern_id)
+    return _pattern_conflict(pattern, time_slot)
+
+
+def _pattern_conflict(pattern: Optional[EmploymentPattern], time_slot: TimeSlot) -> Optional[str]:
+    """Return an error code if ``pattern`` does not cover ``time_slot``."""
     if pattern is None:
         return "pattern_not_found"
     
@@ -173,3 +193,88 @@ def available_time_slots(
     """Return the subset of time slots an employee can work for a given date."""
 
     return [ts for ts in time_slots if is_employee_available(employee, date_str, ts)]
+
+
+class AvailabilityIndex:
+    """In-memory availability lookups for a single generation run.
+
+    Absences in the requested date range and every employment pattern are
+    bulk-loaded once, so the optimiser can evaluate employee × slot × day
+    combinations without opening a database connection per check.
+    """
+
+    def __init__(
+        self,
+        absences: Iterable[Absence],
+        patterns: Iterable[EmploymentPattern],
+    ) -> None:
+        self._absences: Dict[Tuple[int, str], List[Absence]] = {}
+        for absence in absences:
+            key = (absence.employee_id, absence.absence_date)
+            self._absences.setdefault(key, []).append(absence)
+        self._patterns: Dict[str, EmploymentPattern] = {p.id: p for p in patterns}
+        self._pattern_checks: Dict[Tuple[str, str, str, str], Optional[str]] = {}
+
+    @classmethod
+    def load(cls, start_date: str, end_date: str) -> "AvailabilityIndex":
+        """Build an index from the database for ``start_date``–``end_date``."""
+        return cls(list_absences_in_range(start_date, end_date), list_employment_patterns())
+
+    def absences(self, start_date: str, end_date: str) -> List[Absence]:
+        """Loaded absences dated ``start_date``–``end_date``."""
+        return [
+            absence
+            for (_, date_str), absences in self._absences.items()
+            if start_date <= date_str <= end_date
+            for absence in absences
+        ]
+
+    def patterns(self) -> List[EmploymentPattern]:
+        """Every loaded employment pattern."""
+        return list(self._patterns.values())
+
+    def _blocking_absence(self, employee: Employee, date_str: str, time_slot: TimeSlot) -> Optional[Absence]:
+        for absence in self._absences.get((employee.id, date_str), ()):
+            if _absence_conflict(absence, time_slot):
+                return absence
+        return None
+
+    def _pattern_check(self, employee: Employee, time_slot: TimeSlot) -> Optional[str]:
+        pattern_id = employee.employment_pattern_id
+        if not pattern_id:
+            return None
+        key = (pattern_id, time_slot.period, time_slot.start_time, time_slot.end_time)
+        if key not in self._pattern_checks:
+            pattern = self._patterns.get(pattern_id)
+            self._pattern_checks[key] = _pattern_conflict(pattern, time_slot)
+        return self._pattern_checks[key]
+
+    def is_available(self, employee: Employee, date_str: str, time_slot: TimeSlot) -> bool:
+        """In-memory equivalent of :func:`is_employee_available`."""
+        if not time_slot.is_active:
+            return False
+        weekday = _weekday(date_str)
+        if weekday == 6 or time_slot.day_of_week != weekday:
+            return False
+        if self._blocking_absence(employee, date_str, time_slot):
+            return False
+        return self._pattern_check(employee, time_slot) is None
+
+    def describe(self, employee: Employee, date_str: str, time_slot: TimeSlot) -> Optional[str]:
+        """In-memory equivalent of :func:`describe_unavailability`."""
+        basic_check = _check_basic_slot_availability(time_slot, _parse_date(date_str))
+        if basic_check:
+            return basic_check
+        if time_slot.day_of_week != _weekday(date_str):
+            day_label = WEEKDAY_NAMES[time_slot.day_of_week]
+            return f"{date_str}は{day_label}曜日の時間帯ではありません"
+
+        absence = self._blocking_absence(employee, date_str, time_slot)
+        if absence:
+            return _format_absence_reason(absence)
+
+        pattern_check = self._pattern_check(employee, time_slot)
+        if not pattern_check:
+            return None
+        pattern = self._patterns.get(employee.employment_pattern_id or "")
+        return _format_pattern_error(pattern_check, pattern)
@@ -0,0 +1,211 @@
+"""Roster generation for several facilities in one run.
+
+Each clinic keeps its own ``shift.db``. :func:`generate_facilities` runs
+the generation of the shift page for every database – load staff, slots,
+absences, locked shifts and area rules, generate, store – spread over up
+to ``workers`` processes, and returns one :class:`BatchReport` with the
+:class:`~shift_scheduler.optimizer.ShiftGenerationIssue` list of every
+facility.
+
+A facility's run always collects every issue. Its roster is written in a
+single transaction and only if no issue was found (unless
+``save_incomplete`` is set), so a site with a shortage keeps its stored
+shifts untouched. Breaks are not assigned.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .areas import get_area_registry, set_area_registry
+from .availability import AvailabilityIndex
+from .database import (
+    init_database,
+    list_employees,
+    list_locked_shifts,
+    list_time_slots,
+    load_area_registry,
+    save_generated_shifts,
+    use_database,
+)
+from .optimizer import (
+    GenerationReport,
+    ShiftGenerationError,
+    ShiftGenerationIssue,
+    WorkLimits,
+    generate_shifts,
+)
+from .repair import load_warm_start
+from .scoring import OptimisationMode
+
+
+@dataclass
+class FacilityConfig:
+    """One facility's database and generation settings.
+
+    ``warm_start`` keeps the stored shifts of the range and only fills the
+    open seats, as the shift page's 既存のシフトを残して空き枠だけ埋める;
+    otherwise the unlocked stored shifts of the range are replaced.
+    """
+
+    db_path: Union[str, Path]
+    name: Optional[str] = None
+    optimisation_mode: OptimisationMode = "balance"
+    warm_start: bool = False
+    limits: Optional[WorkLimits] = None
+    save_incomplete: bool = False
+
+    @property
+    def label(self) -> str:
+        return self.name or str(self.db_path)
+
+
+@dataclass
+class FacilityResult:
+    """Outcome of one facility.
+
+    ``error`` holds the message of any failure other than a generation
+    issue (database error, invalid area rules, ...); nothing was written
+    then.
+    """
+
+    name: str
+    db_path: str
+    generated: int = 0
+    deleted: int = 0
+    saved: int = 0
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.error is None and not self.issues
+
+
+@dataclass
+class BatchReport:
+    """Consolidated report of a :func:`generate_facilities` run."""
+
+    start_date: str
+    end_date: str
+    facilities: List[FacilityResult] = field(default_factory=list)
+
+    @property
+    def is_complete(self) -> bool:
+        return all(facility.is_complete for facility in self.facilities)
+
+    @property
+    def saved(self) -> int:
+        return sum(facility.saved for facility in self.facilities)
+
+    def issue_rows(self) -> List[Dict[str, Any]]:
+        """One row per issue (or database error) with its facility, e.g. for a table or CSV."""
+        rows: List[Dict[str, Any]] = []
+        for facility in self.facilities:
+            if facility.error is not None:
+                rows.append({"facility": facility.name, "code": "database_error", "message": facility.error})
+            for issue in facility.issues:
+                rows.append({
+                    "facility": facility.name,
+                    "code": issue.code,
+                    "message": issue.message,
+                    "date": issue.date,
+                    "time_slot": issue.time_slot_name,
+                    "shortage": issue.shortage,
+                })
+        return rows
+
+
+def _as_config(facility: Union[str, Path, FacilityConfig]) -> FacilityConfig:
+    return facility if isinstance(facility, FacilityConfig) else FacilityConfig(db_path=facility)
+
+
+def _run_facility(config: FacilityConfig, start_date: str, end_date: str) -> FacilityResult:
+    """Generate and store one facility's roster.
+
+    Never raises: generation issues go to ``issues`` and every other error
+    to ``error``, so one broken facility does not abort the batch.
+    """
+    result = FacilityResult(name=config.label, db_path=str(config.db_path))
+    if not Path(config.db_path).exists():
+        result.error = f"データベースが見つかりません: {config.db_path}"
+        return result
+
+    previous_registry = get_area_registry()
+    try:
+        with use_database(config.db_path):
+            init_database()
+            set_area_registry(load_area_registry())
+            employees = list_employees()
+            time_slots = list_time_slots()
+            locked = list_locked_shifts(start_date, end_date)
+            warm = (
+                load_warm_start(start_date, end_date, employees, time_slots)
+                if config.warm_start
+                else None
+            )
+            report = GenerationReport()
+            shifts = generate_shifts(
+                employees, time_slots, start_date, end_date,
+                optimisation_mode=config.optimisation_mode,
+                availability=AvailabilityIndex.load(start_date, end_date),
+                report=report,
+                initial_shifts=warm.initial_shifts if warm else (),
+                carry_over_work_count=warm.carry_over_work_count if warm else None,
+                locked=locked,
+                limits=config.limits,
+            )
+            result.issues = report.issues
+
+            stored = set(locked)
+            if warm:
+                stored |= {(s.date, s.time_slot_id, s.employee_id) for s in warm.initial_shifts}
+            new = [
+                assignment
+                for assignment in ((s.date, s.time_slot_id, s.employee_id) for s in shifts)
+                if assignment not in stored
+            ]
+            result.generated = len(new)
+            if report.is_complete or config.save_incomplete:
+                result.deleted, result.saved = save_generated_shifts(
+                    start_date, end_date, new, replace=not config.warm_start
+                )
+    except ShiftGenerationError as exc:
+        # Invalid inputs, e.g. a facility without staff or time slots.
+        result.issues = [exc.issue]
+    except Exception as exc:
+        # Anything else (database errors, invalid area rules, unreadable
+        # files) is this facility's error; the other facilities go on.
+        result.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        set_area_registry(previous_registry)
+    return result
+
+
+def generate_facilities(
+    facilities: Iterable[Union[str, Path, FacilityConfig]],
+    start_date: str,
+    end_date: str,
+    *,
+    workers: int = 1,
+) -> BatchReport:
+    """Generate ``start_date``–``end_date`` for every facility database.
+
+    ``facilities`` are database paths (default settings) or
+    :class:`FacilityConfig` objects. With ``workers > 1`` the facilities run
+    in that many processes. Results keep the input order.
+    """
+    configs = [_as_config(facility) for facility in facilities]
+    report = BatchReport(start_date=start_date, end_date=end_date)
+    if not configs:
+        return report
+    if workers <= 1:
+        report.facilities = [_run_facility(config, start_date, end_date) for config in configs]
+        return report
+    with ProcessPoolExecutor(max_workers=min(workers, len(configs))) as pool:
+        report.facilities = list(pool.map(
+            _run_facility, configs, [start_date] * len(configs), [end_date] * len(configs)
+        ))
+    return report
@@ -0,0 +1,239 @@
+"""Memoised generation results keyed by an input fingerprint.
+
+Streamlit reruns and repeated clicks on 生成 with unchanged inputs would
+otherwise re-solve the same roster. :func:`generation_fingerprint` hashes
+everything that determines the result – employees, time slots, the
+absences and employment patterns of the bulk-loaded
+:class:`~shift_scheduler.availability.AvailabilityIndex`, the active area
+rules, the date range and the generation options – and
+:class:`GenerationCache` maps that hash to the roster's
+``(date, time_slot_id, employee_id)`` assignments. Entries live in
+an in-memory LRU backed by JSON files under ``<data directory>/cache``.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from . import database
+from .areas import get_area_registry
+from .availability import AvailabilityIndex
+from .models import Employee, GeneratedShift, TimeSlot
+from .optimizer import _build_shift, generate_shifts
+
+Assignment = Tuple[str, str, int]
+
+# Options that change how a run is executed or reported, not its roster.
+_UNCACHEABLE_OPTIONS = ("report", "time_limit_s", "cancel")
+_EXECUTION_OPTIONS = ("availability", "workers", "on_progress", *_UNCACHEABLE_OPTIONS)
+
+# Keyword defaults of generate_shifts, so omitted and explicit defaults hash alike.
+_OPTION_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(generate_shifts).parameters.items()
+    if parameter.kind is parameter.KEYWORD_ONLY and name not in _EXECUTION_OPTIONS
+}
+
+
+def _assignment(shift: GeneratedShift) -> Assignment:
+    return shift.date, shift.time_slot_id, shift.employee_id
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form of option values, independent of ordering where it is irrelevant."""
+    if isinstance(value, GeneratedShift):
+        return list(_assignment(value))
+    if isinstance(value, dict):
+        return sorted([str(key), _canonical(item)] for key, item in value.items())
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def generation_fingerprint(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    availability: AvailabilityIndex,
+    **options: Any,
+) -> str:
+    """SHA-256 over the inputs that determine a generated roster.
+
+    ``options`` are the keyword arguments passed to
+    :func:`~shift_scheduler.optimizer.generate_shifts` (mode, starts, seed,
+    pinned and locked shifts, carried-over counts, ...). Omitted options
+    hash like their defaults, and options that only affect how the run is
+    executed or reported (workers, progress, report, time limit) are
+    ignored.
+    """
+    options = {
+        **_OPTION_DEFAULTS,
+        **{name: value for name, value in options.items() if name not in _EXECUTION_OPTIONS},
+    }
+    payload = {
+        "employees": sorted((employee.to_dict() for employee in employees), key=lambda e: e["id"]),
+        "time_slots": sorted((slot.to_dict() for slot in time_slots), key=lambda s: s["id"]),
+        "absences": sorted(
+            [absence.employee_id, absence.absence_date, absence.absence_type]
+            for absence in availability.absences(start_date, end_date)
+        ),
+        "patterns": sorted((pattern.to_dict() for pattern in availability.patterns()), key=lambda p: p["id"]),
+        "areas": sorted((rule.to_dict() for rule in get_area_registry().rules.values()), key=lambda r: r["area"]),
+        "range": [start_date, end_date],
+        "options": sorted([name, _canonical(value)] for name, value in options.items()),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """LRU of generated rosters with an on-disk backing.
+
+    ``directory`` defaults to ``cache`` next to the current
+    :data:`~shift_scheduler.database.DB_PATH`; pass ``persist=False`` for a
+    memory-only cache. The disk keeps up to ``max_disk_entries`` files and
+    drops the least recently used ones beyond that.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        *,
+        directory: Optional[Path] = None,
+        persist: bool = True,
+        max_disk_entries: int = 256,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.persist = persist
+        self._directory = directory
+        self._entries: "OrderedDict[str, List[Assignment]]" = OrderedDict()
+
+    @property
+    def directory(self) -> Path:
+        return self._directory or database.DB_PATH.parent / "cache"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _remember(self, key: str, assignments: List[Assignment]) -> None:
+        self._entries[key] = assignments
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[List[Assignment]]:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if not self.persist:
+            return None
+        path = self._path(key)
+        try:
+            rows = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        assignments = [(row[0], row[1], int(row[2])) for row in rows]
+        self._remember(key, assignments)
+        return assignments
+
+    def get(
+        self,
+        key: str,
+        employees: Sequence[Employee],
+        time_slots: Sequence[TimeSlot],
+    ) -> Optional[List[GeneratedShift]]:
+        """The cached roster for ``key`` built from ``employees``/``time_slots``, or ``None``."""
+        assignments = self._load(key)
+        if assignments is None:
+            return None
+        employees_by_id = {employee.id: employee for employee in employees}
+        slots_by_id = {slot.id: slot for slot in time_slots}
+        shifts: List[GeneratedShift] = []
+        for date_str, slot_id, employee_id in assignments:
+            if employee_id not in employees_by_id or slot_id not in slots_by_id:
+                return None
+            shifts.append(_build_shift(date_str, slots_by_id[slot_id], employees_by_id[employee_id]))
+        return shifts
+
+    def put(self, key: str, shifts: Iterable[GeneratedShift]) -> None:
+        """Store the assignments of ``shifts`` under ``key``."""
+        assignments = [_assignment(shift) for shift in shifts]
+        self._remember(key, assignments)
+        if not self.persist:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._path(key).write_text(json.dumps(assignments), encoding="utf-8")
+            self._prune_disk()
+        except OSError:
+            pass  # The disk copy is only an optimisation.
+
+    def _prune_disk(self) -> None:
+        files = sorted(self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for path in files[: max(0, len(files) - self.max_disk_entries)]:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk."""
+        self._entries.clear()
+        if self.persist and self.directory.exists():
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+
+_default_cache: Optional[GenerationCache] = None
+
+
+def get_generation_cache() -> GenerationCache:
+    """The process-wide cache shared by Streamlit reruns."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = GenerationCache()
+    return _default_cache
+
+
+def cached_generate_shifts(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    *,
+    cache: Optional[GenerationCache] = None,
+    availability: Optional[AvailabilityIndex] = None,
+    **options: Any,
+) -> List[GeneratedShift]:
+    """:func:`~shift_scheduler.optimizer.generate_shifts` memoised by input fingerprint.
+
+    Runs that collect a report, have a time limit or can be cancelled may
+    return partial rosters and always bypass the cache.
+    """
+    if availability is None:
+        availability = AvailabilityIndex.load(start_date, end_date)
+    if any(options.get(name) is not None for name in _UNCACHEABLE_OPTIONS):
+        return generate_shifts(
+            employees, time_slots, start_date, end_date, availability=availability, **options
+        )
+
+    if cache is None:
+        cache = get_generation_cache()
+    key = generation_fingerprint(
+        employees, time_slots, start_date, end_date, availability, **options
+    )
+    cached = cache.get(key, employees, time_slots)
+    if cached is not None:
+        return cached
+    shifts = generate_shifts(
+        employees, time_slots, start_date, end_date, availability=availability, **options
+    )
+    cache.put(key, shifts)
+    return shifts
@@ -13,8 +13,10 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from .areas import DEFAULT_AREA_RULES, SKILL_ATTRIBUTES, AreaRegistry
 from .models import (
     Absence,
+    AreaRule,
     BreakSchedule,
     Employee,
     EmploymentPattern,
@@ -24,6 +26,7 @@ from .models import (
 
 __all__ = [
     "DB_PATH",
+    "use_database",
     "get_connection",
     "init_database",
     "list_employees",
@@ -35,7 +38,12 @@ __all__ = [
     "get_employment_pattern",
     "list_time_slots",
     "get_time_slot",
+    "list_area_rules",
+    "save_area_rule",
+    "delete_area_rule",
+    "load_area_registry",
     "list_absences_for_employee",
+    "list_absences_in_range",
     "get_absence",
     "record_absence",
     "remove_absence",
@@ -43,11 +51,15 @@ __all__ = [
     "create_shift",
     "delete_shift",
     "delete_shifts_by_date_range",
+    "save_generated_shifts",
+    "list_locked_shifts",
+    "set_shift_locked",
     "list_break_schedules_by_date",
     "create_break_schedule",
     "delete_break_schedules_by_date_range",
     "reset_employment_patterns",
     "reset_time_slots",
+    "reset_area_rules",
     "get_setting",
     "set_setting",
 ]
@@ -143,6 +155,23 @@ else:
     DB_PATH = Path(__file__).resolve().parents[1] / "data" / "shift.db"
 
 
+@contextmanager
+def use_database(path: Path | str) -> Iterator[Path]:
+    """Point every database function at ``path`` until the block exits.
+
+    Swaps the module-level :data:`DB_PATH`, so it is meant for one facility
+    at a time per process, e.g. inside a batch worker.
+    """
+
+    global DB_PATH
+    previous = DB_PATH
+    DB_PATH = Path(path)
+    try:
+        yield DB_PATH
+    finally:
+        DB_PATH = previous
+
+
 def _ensure_parent_exists() -> None:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
@@ -258,12 +287,25 @@ CREATE TABLE IF NOT EXISTS time_slots (
 );
 """
 
+_AREA_RULE_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS area_rules (
+    area TEXT PRIMARY KEY,
+    employee_types TEXT NOT NULL,
+    skill_morning TEXT NOT NULL CHECK(skill_morning IN ({", ".join(f"'{name}'" for name in SKILL_ATTRIBUTES)})),
+    skill_afternoon TEXT NOT NULL CHECK(skill_afternoon IN ({", ".join(f"'{name}'" for name in SKILL_ATTRIBUTES)})),
+    lead_types TEXT NOT NULL DEFAULT '',
+    paired_types TEXT NOT NULL DEFAULT '',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
 _SHIFT_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS shifts (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     date DATE NOT NULL,
     time_slot_id TEXT NOT NULL REFERENCES time_slots(id),
     employee_id INTEGER NOT NULL REFERENCES employees(id),
+    is_locked BOOLEAN DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(date, time_slot_id, employee_id)
 );
@@ -302,6 +344,7 @@ def init_database() -> None:
                     _EMPLOYMENT_PATTERN_TABLE_SQL,
                     _EMPLOYEE_ABSENCE_TABLE_SQL,
                     _TIME_SLOT_TABLE_SQL,
+                    _AREA_RULE_TABLE_SQL,
                     _SHIFT_TABLE_SQL,
                     _BREAK_SCHEDULE_TABLE_SQL,
                     _SETTINGS_TABLE_SQL,
@@ -310,8 +353,18 @@ def init_database() -> None:
         )
         conn.commit()
 
+    _migrate_shift_lock_column()
     _seed_employment_patterns()
     _seed_time_slots()
+    _seed_area_rules()
+
+
+def _migrate_shift_lock_column() -> None:
+    """Add ``shifts.is_locked`` to databases created before it existed."""
+
+    columns = {row["name"] for row in _fetchall("PRAGMA table_info(shifts)")}
+    if "is_locked" not in columns:
+        _execute("ALTER TABLE shifts ADD COLUMN is_locked BOOLEAN DEFAULT 0")
 
 
 def _seed_employment_patterns() -> None:
@@ -381,6 +434,16 @@ def _seed_time_slots() -> None:
         conn.commit()
 
 
+def _seed_area_rules() -> None:
+    """Insert the default area rules if none exist."""
+
+    existing = _fetchone("SELECT COUNT(*) AS cnt FROM area_rules")
+    if existing and existing["cnt"]:
+        return
+    for rule in DEFAULT_AREA_RULES:
+        save_area_rule(rule)
+
+
 def reset_employment_patterns() -> None:
     """Remove and reseed all employment patterns."""
 
@@ -395,6 +458,13 @@ def reset_time_slots() -> None:
     _seed_time_slots()
 
 
+def reset_area_rules() -> None:
+    """Remove and reseed all area rules."""
+
+    _execute("DELETE FROM area_rules")
+    _seed_area_rules()
+
+
 def get_setting(key: str) -> Optional[str]:
     """Retrieve a setting value from the settings table."""
 
@@ -473,6 +543,17 @@ def _row_to_time_slot(row: sqlite3.Row) -> TimeSlot:
     )
 
 
+def _row_to_area_rule(row: sqlite3.Row) -> AreaRule:
+    return AreaRule(
+        area=row["area"],
+        employee_types=tuple(t for t in row["employee_types"].split(",") if t),
+        skill_morning=row["skill_morning"],
+        skill_afternoon=row["skill_afternoon"],
+        lead_types=tuple(t for t in row["lead_types"].split(",") if t),
+        paired_types=tuple(t for t in row["paired_types"].split(",") if t),
+    )
+
+
 def _row_to_break_schedule(row: sqlite3.Row) -> BreakSchedule:
     return BreakSchedule(
         id=row["id"],
@@ -617,6 +698,18 @@ def list_absences_for_employee(
     return [_row_to_absence(row) for row in _fetchall(sql, params)]
 
 
+def list_absences_in_range(start_date: str, end_date: str) -> List[Absence]:
+    rows = _fetchall(
+        """
+        SELECT * FROM employee_absences
+        WHERE absence_date BETWEEN ? AND ?
+        ORDER BY employee_id, absence_date
+        """,
+        [start_date, end_date],
+    )
+    return [_row_to_absence(row) for row in rows]
+
+
 def get_absence(employee_id: int, date: str) -> Optional[Absence]:
     row = _fetchone(
         "SELECT * FROM employee_absences WHERE employee_id = ? AND absence_date = ?",
@@ -654,6 +747,48 @@ def remove_absence(employee_id: int, date: str, absence_type: Optional[str] = No
     _execute(sql, params)
 
 
+def list_area_rules() -> List[AreaRule]:
+    rows = _fetchall("SELECT * FROM area_rules ORDER BY created_at, area")
+    return [_row_to_area_rule(row) for row in rows]
+
+
+def save_area_rule(rule: AreaRule) -> None:
+    """Insert or replace the rule of ``rule.area``."""
+
+    _execute(
+        """
+        INSERT INTO area_rules (
+            area, employee_types, skill_morning, skill_afternoon, lead_types, paired_types
+        )
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(area) DO UPDATE SET
+            employee_types = excluded.employee_types,
+            skill_morning = excluded.skill_morning,
+            skill_afternoon = excluded.skill_afternoon,
+            lead_types = excluded.lead_types,
+            paired_types = excluded.paired_types
+        """,
+        [
+            rule.area, ",".join(rule.employee_types), rule.skill_morning, rule.skill_afternoon,
+            ",".join(rule.lead_types), ",".join(rule.paired_types),
+        ],
+    )
+
+
+def delete_area_rule(area: str) -> bool:
+    with get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM area_rules WHERE area = ?", [area])
+        conn.commit()
+        return cur.rowcount > 0
+
+
+def load_area_registry() -> AreaRegistry:
+    """Compile the stored area rules."""
+
+    return AreaRegistry(list_area_rules())
+
+
 # ---------------------------------------------------------------------------
 # Shift operations
 # ---------------------------------------------------------------------------
@@ -666,8 +801,10 @@ def list_shifts(start_date: str, end_date: str) -> List[dict]:
             s.date,
             s.time_slot_id,
             s.employee_id,
+            s.is_locked,
             e.name AS employee_name,
             e.employee_type,
+            e.employment_type,
             e.employment_pattern_id,
             e.skill_reha,
             e.skill_reception_am,
@@ -682,13 +819,7 @@ def list_shifts(start_date: str, end_date: str) -> List[dict]:
             ts.skill_weight,
             ts.target_skill_score,
             ts.day_of_week,
-            (e.skill_general +
-             CASE ts.area
-                 WHEN 'リハ室' THEN e.skill_reha
-                 WHEN '受付' AND ts.period = 'morning' THEN e.skill_reception_am
-                 WHEN '受付' AND ts.period = 'afternoon' THEN e.skill_reception_pm
-                 ELSE e.skill_general
-             END) AS skill_score
+            ts.is_active
         FROM shifts AS s
         JOIN employees AS e ON e.id = s.employee_id
         JOIN time_slots AS ts ON ts.id = s.time_slot_id
@@ -698,6 +829,7 @@ def list_shifts(start_date: str, end_date: str) -> List[dict]:
         [start_date, end_date],
     )
 
+    registry = load_area_registry()
     result = []
     for row in rows:
         employee_payload = {
@@ -724,6 +856,18 @@ def list_shifts(start_date: str, end_date: str) -> List[dict]:
             "target_skill_score": row["target_skill_score"] or row["required_staff"] * 150,
             "day_of_week": row["day_of_week"],
         }
+        employee = Employee(employment_type=row["employment_type"], **employee_payload)
+        slot = TimeSlot(
+            id=row["time_slot_id"],
+            day_of_week=row["day_of_week"],
+            period=row["period"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            is_active=bool(row["is_active"]),
+            required_staff=row["required_staff"],
+            area=row["area"],
+            display_name=row["time_slot_name"],
+        )
         result.append(
             {
                 "id": row["id"],
@@ -731,10 +875,11 @@ def list_shifts(start_date: str, end_date: str) -> List[dict]:
                 "time_slot_id": row["time_slot_id"],
                 "employee_id": row["employee_id"],
                 "employee_name": row["employee_name"],
+                "is_locked": bool(row["is_locked"]),
                 "time_slot_name": row["time_slot_name"],
                 "start_time": row["start_time"],
                 "end_time": row["end_time"],
-                "skill_score": row["skill_score"],
+                "skill_score": registry.skill_score(employee, slot),
                 "employee": employee_payload,
                 "time_slot": slot_payload,
             }
@@ -764,14 +909,74 @@ def delete_shift(shift_id: int) -> bool:
         return cur.rowcount > 0
 
 
-def delete_shifts_by_date_range(start_date: str, end_date: str) -> int:
+def delete_shifts_by_date_range(start_date: str, end_date: str, *, keep_locked: bool = False) -> int:
+    sql = "DELETE FROM shifts WHERE date BETWEEN ? AND ?"
+    if keep_locked:
+        sql += " AND NOT is_locked"
     with get_connection() as conn:
         cur = conn.cursor()
-        cur.execute("DELETE FROM shifts WHERE date BETWEEN ? AND ?", [start_date, end_date])
+        cur.execute(sql, [start_date, end_date])
         conn.commit()
         return cur.rowcount
 
 
+def save_generated_shifts(
+    start_date: str,
+    end_date: str,
+    assignments: Iterable[Tuple[str, str, int]],
+    *,
+    replace: bool = True,
+) -> Tuple[int, int]:
+    """Store ``(date, time_slot_id, employee_id)`` assignments in one transaction.
+
+    With ``replace`` the unlocked shifts of the range are deleted first.
+    Either every change is written or, if any insert fails, none is.
+    Returns ``(deleted, inserted)``.
+    """
+
+    rows = [list(assignment) for assignment in assignments]
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            deleted = 0
+            if replace:
+                cur.execute(
+                    "DELETE FROM shifts WHERE date BETWEEN ? AND ? AND NOT is_locked",
+                    [start_date, end_date],
+                )
+                deleted = cur.rowcount
+            cur.executemany(
+                "INSERT INTO shifts (date, time_slot_id, employee_id) VALUES (?, ?, ?)", rows
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    return deleted, len(rows)
+
+
+def set_shift_locked(shift_id: int, locked: bool = True) -> bool:
+    with get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("UPDATE shifts SET is_locked = ? WHERE id = ?", [int(locked), shift_id])
+        conn.commit()
+        return cur.rowcount > 0
+
+
+def list_locked_shifts(start_date: str, end_date: str) -> List[Tuple[str, str, int]]:
+    """Return locked assignments as ``(date, time_slot_id, employee_id)`` tuples."""
+
+    rows = _fetchall(
+        """
+        SELECT date, time_slot_id, employee_id FROM shifts
+        WHERE is_locked AND date BETWEEN ? AND ?
+        ORDER BY date, time_slot_id, employee_id
+        """,
+        [start_date, end_date],
+    )
+    return [(row["date"], row["time_slot_id"], row["employee_id"]) for row in rows]
+
+
 # ---------------------------------------------------------------------------
 # Break schedules
 # ---------------------------------------------------------------------------
@@ -0,0 +1,399 @@
+"""Block decomposition of long horizons.
+
+:func:`~shift_scheduler.optimizer.generate_shifts` walks the horizon one day
+after another, so a half-year roster is solved strictly sequentially.
+:func:`generate_shifts_by_blocks` splits the range into blocks of
+``block_days`` days (weekly by default), solves the blocks independently in
+worker processes and joins them again:
+
+* before solving, every employee gets a horizon target – an even share of
+  the open seats on top of carried-over and pinned work, capped by the
+  half-days they can work – split over the blocks in proportion to their
+  availability in each block. A block starts its work counts at minus that
+  block's target, so the least-worked rule steers towards the targets, and
+  breaks ties in its own seeded order;
+* after solving, a reconciliation pass hands assignments from the most to
+  the least worked employees until their totals differ by at most one or no
+  valid hand-over is left, then tries random swaps, which keep every work
+  count, to even out the skill totals the hand-overs disturbed.
+
+With ``limits`` every block is built under the work limits, but a run of
+working days or a week spanning two blocks is only seen once they are
+joined: shifts that break a limit there are handed to the employee leaving
+the lowest objective, and dropped and reported as unstaffed if nobody can
+take them. The reconciliation pass never breaks a limit.
+"""
+from __future__ import annotations
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .areas import get_area_registry, set_area_registry
+from .availability import AvailabilityIndex
+from .local_search import _RosterSearch
+from .models import Employee, GeneratedShift, TimeSlot
+from .optimizer import (
+    GenerationReport,
+    ShiftGenerationError,
+    ShiftGenerationIssue,
+    WorkLimits,
+    _create_insufficient_staff_error,
+    _locked_shifts,
+    _merge_pinned,
+    _run_start,
+    _SkillMatrix,
+    _start_rng,
+    _validate_shift_inputs,
+    _WorkLimitCounters,
+)
+from .scoring import OptimisationMode
+from .utils import generate_date_list
+
+Block = Tuple[str, str]
+
+
+def _split_blocks(start_date: str, end_date: str, block_days: int) -> List[Block]:
+    """Split ``start_date``–``end_date`` into consecutive ``block_days``-day ranges."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    blocks: List[Block] = []
+    while start <= end:
+        block_end = min(start + timedelta(days=block_days - 1), end)
+        blocks.append((start.strftime("%Y-%m-%d"), block_end.strftime("%Y-%m-%d")))
+        start = block_end + timedelta(days=1)
+    return blocks
+
+
+def _block_capacity(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    blocks: Sequence[Block],
+    availability: AvailabilityIndex,
+) -> Dict[int, List[int]]:
+    """Half-days (date, period) each employee could work in each block."""
+    skills = _SkillMatrix(employees, time_slots)
+    slots_by_day: Dict[int, List[TimeSlot]] = {}
+    for slot in time_slots:
+        slots_by_day.setdefault(slot.day_of_week, []).append(slot)
+
+    capacity = {employee.id: [0] * len(blocks) for employee in employees}
+    for index, (block_start, block_end) in enumerate(blocks):
+        for date_str in generate_date_list(block_start, block_end):
+            daily_slots = slots_by_day.get(datetime.strptime(date_str, "%Y-%m-%d").weekday(), [])
+            for employee in employees:
+                periods = {
+                    slot.period for slot in daily_slots
+                    if skills.can_assign(employee, slot)
+                    and availability.is_available(employee, date_str, slot)
+                }
+                capacity[employee.id][index] += len(periods)
+    return capacity
+
+
+def _horizon_targets(seats: int, base: Dict[int, float], capacity: Dict[int, int]) -> Dict[int, float]:
+    """Water-fill ``seats`` so ``base + target`` is as level as ``capacity`` allows."""
+
+    def filled(level: float) -> Dict[int, float]:
+        return {
+            emp_id: min(max(level - base[emp_id], 0.0), capacity[emp_id]) for emp_id in base
+        }
+
+    if seats <= 0 or not base:
+        return {emp_id: 0.0 for emp_id in base}
+    low, high = min(base.values()), max(base.values()) + seats
+    for _ in range(60):
+        level = (low + high) / 2
+        if sum(filled(level).values()) < seats:
+            low = level
+        else:
+            high = level
+    return filled(high)
+
+
+def _block_seeds(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    blocks: Sequence[Block],
+    availability: AvailabilityIndex,
+    pinned: Sequence[GeneratedShift],
+    carry_over: Dict[int, int],
+) -> List[Dict[int, int]]:
+    """Initial work counts of every block: minus its target and pinned shifts."""
+    capacity = _block_capacity(employees, time_slots, blocks, availability)
+    seats = 0
+    for block_start, block_end in blocks:
+        for date_str in generate_date_list(block_start, block_end):
+            weekday = datetime.strptime(date_str, "%Y-%m-%d").weekday()
+            seats += sum(slot.required_staff for slot in time_slots if slot.day_of_week == weekday)
+
+    pinned_by_block = [{employee.id: 0 for employee in employees} for _ in blocks]
+    for shift in pinned:
+        for index, (block_start, block_end) in enumerate(blocks):
+            if block_start <= shift.date <= block_end and shift.employee_id in pinned_by_block[index]:
+                pinned_by_block[index][shift.employee_id] += 1
+
+    base = {
+        employee.id: carry_over.get(employee.id, 0) + sum(b[employee.id] for b in pinned_by_block)
+        for employee in employees
+    }
+    targets = _horizon_targets(
+        seats - len(pinned), base, {emp_id: sum(caps) for emp_id, caps in capacity.items()}
+    )
+
+    # Round the cumulative shares with a per-employee phase so the blocks
+    # in which someone gets one seat more or less are staggered.
+    seeds: List[Dict[int, int]] = [{} for _ in blocks]
+    for rank, employee in enumerate(employees):
+        phase = rank / len(employees)
+        total = sum(capacity[employee.id])
+        cumulative, previous = 0.0, math.floor(phase)
+        for index in range(len(blocks)):
+            if total:
+                cumulative += targets[employee.id] * capacity[employee.id][index] / total
+            quota = math.floor(cumulative + phase)
+            seeds[index][employee.id] = -(quota - previous + pinned_by_block[index][employee.id])
+            previous = quota
+    return seeds
+
+
+@dataclass
+class _BlockOutcome:
+    """Result of one block, small enough to ship back from a worker."""
+
+    index: int
+    shifts: List[GeneratedShift] = field(default_factory=list)
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+    error: Optional[ShiftGenerationIssue] = None
+
+
+def _solve_block(payload: Tuple) -> _BlockOutcome:
+    """Process-pool entry point: solve block ``payload[-1]``."""
+    (employees, time_slots, block_start, block_end, mode, availability, collect,
+     initial_shifts, seeds, limits, seed, index) = payload
+    report = GenerationReport() if collect else None
+    outcome = _BlockOutcome(index=index)
+    try:
+        outcome.shifts = _run_start(
+            employees, time_slots, block_start, block_end, mode, availability, report,
+            _start_rng(seed, index), initial_shifts, seeds, limits=limits,
+        )
+    except ShiftGenerationError as exc:
+        outcome.error = exc.issue
+        return outcome
+    outcome.issues = report.issues if report is not None else []
+    return outcome
+
+
+def _solve_blocks(payloads: List[Tuple], workers: int) -> List[_BlockOutcome]:
+    if workers <= 1:
+        return [_solve_block(payload) for payload in payloads]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(payloads)),
+        initializer=set_area_registry,
+        initargs=(get_area_registry(),),
+    ) as pool:
+        return list(pool.map(_solve_block, payloads))
+
+
+def _reconcile(
+    search: _RosterSearch,
+    employees: Sequence[Employee],
+    carry_over: Dict[int, int],
+    swaps: int,
+    rng: random.Random,
+) -> None:
+    """Level the work counts across blocks, then polish the skill totals.
+
+    Each hand-over picks, among the donor's movable shifts the taker may
+    take, the one leaving the lowest objective. Every hand-over narrows a
+    gap of at least two, so the loop terminates.
+    """
+    by_id = {employee.id: employee for employee in employees}
+    while True:
+        totals = {emp_id: search.stats.work_count.get(emp_id, 0) + carry_over.get(emp_id, 0) for emp_id in by_id}
+        ranked = sorted(totals, key=lambda emp_id: totals[emp_id])
+        transfer = _best_transfer(search, ranked, totals, by_id)
+        if transfer is None:
+            break
+        search.reassign(*transfer)
+    if search.movable:
+        for _ in range(swaps):
+            search.try_swap(rng)
+
+
+def _best_transfer(
+    search: _RosterSearch,
+    ranked: List[int],
+    totals: Dict[int, int],
+    by_id: Dict[int, Employee],
+) -> Optional[Tuple[int, Employee]]:
+    for donor in reversed(ranked):
+        donated = [i for i in search.movable if search.shifts[i].employee_id == donor]
+        for taker in ranked:
+            if totals[donor] - totals[taker] <= 1:
+                break
+            options = [
+                (value, index) for index in donated
+                if (value := search.objective_if(index, by_id[taker])) is not None
+            ]
+            if options:
+                return min(options)[1], by_id[taker]
+    return None
+
+
+def _hand_over_breaches(search: _RosterSearch, employees: Sequence[Employee]) -> None:
+    """Hand each shift over a work limit to the taker leaving the lowest objective.
+
+    Every breach is tried once, so the loop terminates; a hand-over that
+    ends a run of working days may settle later breaches of the donor.
+    """
+    tried: Set[int] = set()
+    while True:
+        pending = [index for index, _ in search.limit_breaches() if index not in tried]
+        if not pending:
+            return
+        index = pending[0]
+        tried.add(index)
+        options = [
+            (value, rank) for rank, employee in enumerate(employees)
+            if employee.id != search.shifts[index].employee_id
+            and (value := search.objective_if(index, employee)) is not None
+        ]
+        if options:
+            search.reassign(index, employees[min(options)[1]])
+
+
+def _drop_breaches(
+    search: _RosterSearch,
+    employees: Sequence[Employee],
+    limits: Optional[WorkLimits],
+    availability: AvailabilityIndex,
+    report: Optional[GenerationReport],
+) -> List[GeneratedShift]:
+    """The roster without the shifts still over a work limit.
+
+    Pinned shifts are booked first, then the others in date order, dropping
+    each one that would break a limit, as the day-by-day construction
+    would. Each ``(date, slot)`` losing a shift becomes an
+    ``insufficient_staff`` issue listing the limits as rejection reasons:
+    raised (the first in date order) without ``report``, collected otherwise.
+    """
+    if limits is None or not search.limit_breaches():
+        return list(search.shifts)
+    counters = _WorkLimitCounters(limits, employees, availability.patterns())
+    movable = set(search.movable)
+    for index, shift in enumerate(search.shifts):
+        if index not in movable:
+            counters.book(shift.employee_id, shift.date, shift.time_slot)
+    dropped: Set[int] = set()
+    logs: Dict[Tuple[str, str], Dict[str, List[str]]] = {}
+    for index in sorted(movable, key=lambda i: (search.shifts[i].date, search.shifts[i].employee_id)):
+        shift = search.shifts[index]
+        reason = counters.violation(shift.employee_id, shift.date, shift.time_slot)
+        if reason is None:
+            counters.book(shift.employee_id, shift.date, shift.time_slot)
+            continue
+        dropped.add(index)
+        logs.setdefault((shift.date, shift.time_slot_id), {}).setdefault(reason, []).append(
+            shift.employee_name
+        )
+    issues = []
+    for key, rejection_log in sorted(logs.items()):
+        members = search.members[key]
+        staffed = sum(1 for index in members if index not in dropped)
+        issues.append(_create_insufficient_staff_error(
+            key[0], search.shifts[members[0]].time_slot, [], rejection_log, staffed
+        ))
+    if issues and report is None:
+        raise ShiftGenerationError(issues[0])
+    if report is not None:
+        report.issues.extend(issues)
+    return [shift for index, shift in enumerate(search.shifts) if index not in dropped]
+
+
+def generate_shifts_by_blocks(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    *,
+    optimisation_mode: OptimisationMode = "balance",
+    availability: Optional[AvailabilityIndex] = None,
+    report: Optional[GenerationReport] = None,
+    block_days: int = 7,
+    workers: int = 1,
+    initial_shifts: Sequence[GeneratedShift] = (),
+    carry_over_work_count: Optional[Dict[int, int]] = None,
+    locked: Iterable[Tuple[str, str, int]] = (),
+    reconcile: bool = True,
+    reconcile_swaps: int = 20000,
+    fairness_weight: float = 10.0,
+    limits: Optional[WorkLimits] = None,
+    seed: Optional[int] = None,
+) -> List[GeneratedShift]:
+    """Generate ``start_date``–``end_date`` as independent ``block_days`` blocks.
+
+    The blocks are solved in up to ``workers`` processes, seeded with
+    per-employee targets, and joined by the reconciliation pass described in
+    the module docstring (``reconcile=False`` skips it, ``reconcile_swaps``
+    bounds its swap attempts). Ties between equally
+    ranked candidates are broken in a different ``seed``-ed order per block
+    (block 0 keeps the employee order), otherwise every week would hand its
+    spare seats to the same people. The swaps draw from their own generator
+    derived from ``seed``, so the default ``seed=None`` is repeatable too. Pinned
+    ``initial_shifts`` and ``locked`` assignments are never moved.
+    ``fairness_weight`` weighs the work-count spread against the skill
+    spread when the pass picks which shift to hand over or swap.
+    ``limits`` enforces :class:`~shift_scheduler.optimizer.WorkLimits` in
+    every block and across the block boundaries.
+
+    Errors follow :func:`~shift_scheduler.optimizer.generate_shifts`: the
+    first block in date order that cannot be staffed raises, or with
+    ``report`` every block's issues are collected in date order.
+    """
+    _validate_shift_inputs(employees, time_slots, start_date, end_date)
+    if block_days < 1:
+        raise ShiftGenerationError(
+            ShiftGenerationIssue(
+                code="invalid_block_days", message="ブロックの日数は1日以上を指定してください。"
+            )
+        )
+    if availability is None:
+        availability = AvailabilityIndex.load(start_date, end_date)
+    if locked:
+        initial_shifts = _merge_pinned(initial_shifts, _locked_shifts(locked, employees, time_slots))
+    pinned = [shift for shift in initial_shifts if start_date <= shift.date <= end_date]
+    carry_over = carry_over_work_count or {}
+
+    blocks = _split_blocks(start_date, end_date, block_days)
+    seeds = _block_seeds(employees, time_slots, blocks, availability, pinned, carry_over)
+    payloads = [
+        (list(employees), list(time_slots), block_start, block_end, optimisation_mode,
+         availability, report is not None,
+         [shift for shift in pinned if block_start <= shift.date <= block_end],
+         seeds[index], limits, seed, index)
+        for index, (block_start, block_end) in enumerate(blocks)
+    ]
+    outcomes = _solve_blocks(payloads, workers)
+    for outcome in outcomes:
+        if outcome.error is not None:
+            raise ShiftGenerationError(outcome.error)
+    if report is not None:
+        for outcome in outcomes:
+            report.issues.extend(outcome.issues)
+
+    shifts = [shift for outcome in outcomes for shift in outcome.shifts]
+    if not shifts or (not reconcile and limits is None):
+        return shifts
+    search = _RosterSearch(
+        shifts, employees, time_slots, availability, fairness_weight, pinned, limits
+    )
+    _hand_over_breaches(search, employees)
+    if reconcile:
+        rng = random.Random(f"{seed}:reconcile")
+        _reconcile(search, employees, carry_over, reconcile_swaps, rng)
+    return _drop_breaches(search, employees, limits, availability, report)
@@ -0,0 +1,225 @@
+"""Branch-and-bound solver for a single day of the roster.
+
+The ``exact`` optimisation mode hands every day to :func:`solve_day` as a
+list of :class:`SlotProblem` objects: the open seats of each slot, its
+skill target and the candidates that passed the availability filter. The
+day cost is
+
+* for every slot, the absolute deviation of its skill total (pinned staff
+  included) from the slot's target, plus
+* ``fairness_weight`` times the growth of the sum of squared work counts,
+  i.e. ``2 * (work + k) + 1`` for an employee's ``k``-th seat of the day.
+
+Minimising the sum of squares for a fixed number of seats minimises the
+variance of the work counts, so the second term is the work-count spread.
+
+The search assigns slots in order and enumerates each slot's selections
+cheapest first. It prunes with an admissible bound: every remaining slot
+solved on its own, ignoring same-day conflicts and at ``k = 0``. Candidates
+that agree on work count, pairing role, their skill score in this slot and
+the later slots they can still take without a conflict with their booked
+seats, and their scores there, are interchangeable (dominance by
+symmetry), so selections are enumerated over these classes rather than
+over individuals. When the node budget runs out the best day found is
+returned together with the smallest bound of the unexplored nodes, which
+proves how far from optimal it can be.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """An employee who may take a seat of one slot."""
+
+    key: int
+    score: float
+    work: float
+    lead: bool = False
+    paired: bool = False
+
+
+@dataclass
+class SlotProblem:
+    """Open seats of one slot on the day being solved."""
+
+    seats: int
+    target: float
+    interval: Tuple[int, int]
+    candidates: List[Candidate]
+    base_score: float = 0.0
+    pairing: bool = False
+    has_lead: bool = False
+    has_paired: bool = False
+
+
+@dataclass
+class DaySolution:
+    """Best selection per slot (candidate keys), its cost and a proven lower bound."""
+
+    selections: List[Tuple[int, ...]] = field(default_factory=list)
+    cost: float = 0.0
+    lower_bound: float = 0.0
+
+    @property
+    def gap(self) -> float:
+        """Relative distance to the lower bound; ``0.0`` means proven optimal."""
+        if self.cost <= _EPSILON:
+            return 0.0
+        return max(0.0, (self.cost - self.lower_bound) / self.cost)
+
+
+def _overlaps(first: Tuple[int, int], second: Tuple[int, int]) -> bool:
+    return not (first[1] <= second[0] or second[1] <= first[0])
+
+
+class _DaySearch:
+    def __init__(self, slots: Sequence[SlotProblem], fairness_weight: float, node_limit: int) -> None:
+        self.slots = list(slots)
+        self.fairness_weight = fairness_weight
+        self.nodes = node_limit
+        self.best: Optional[DaySolution] = None
+        self.open_bound = float("inf")
+        # Skill scores of every candidate per later slot, for the class signatures.
+        self.later_scores: List[Dict[int, Tuple[Tuple[int, float], ...]]] = []
+        for index in range(len(self.slots)):
+            scores: Dict[int, List[Tuple[int, float]]] = {}
+            for later in range(index + 1, len(self.slots)):
+                for candidate in self.slots[later].candidates:
+                    scores.setdefault(candidate.key, []).append((later, candidate.score))
+            self.later_scores.append({key: tuple(value) for key, value in scores.items()})
+
+    def _violates_pairing(self, slot: SlotProblem, chosen: Sequence[Candidate]) -> bool:
+        if not slot.pairing:
+            return False
+        paired = slot.has_paired or any(c.paired for c in chosen)
+        return paired and not (slot.has_lead or any(c.lead for c in chosen))
+
+    def _options(
+        self,
+        index: int,
+        booked: Dict[int, List[Tuple[int, int]]],
+    ) -> List[Tuple[float, Tuple[Candidate, ...]]]:
+        """Valid selections for slot ``index`` as ``(cost, candidates)``, cheapest first."""
+        slot = self.slots[index]
+        classes: Dict[tuple, List[Candidate]] = {}
+        for candidate in slot.candidates:
+            intervals = booked.get(candidate.key, ())
+            if any(_overlaps(slot.interval, other) for other in intervals):
+                continue
+            # Which later slots remain open depends on the booked intervals,
+            # not only on their number.
+            later = tuple(
+                (later_index, score)
+                for later_index, score in self.later_scores[index].get(candidate.key, ())
+                if not any(_overlaps(self.slots[later_index].interval, other) for other in intervals)
+            )
+            signature = (
+                candidate.score,
+                candidate.work + len(intervals),
+                candidate.lead,
+                candidate.paired,
+                later,
+            )
+            classes.setdefault(signature, []).append(candidate)
+
+        groups = list(classes.values())
+        options: List[Tuple[float, Tuple[Candidate, ...]]] = []
+        for counts in _compositions(slot.seats, [len(group) for group in groups]):
+            chosen = tuple(
+                member for group, count in zip(groups, counts) for member in group[:count]
+            )
+            if self._violates_pairing(slot, chosen):
+                continue
+            options.append((self._cost(slot, chosen, booked), chosen))
+        options.sort(key=lambda option: option[0])
+        return options
+
+    def _cost(
+        self,
+        slot: SlotProblem,
+        chosen: Sequence[Candidate],
+        booked: Dict[int, List[Tuple[int, int]]],
+    ) -> float:
+        total = slot.base_score + sum(c.score for c in chosen)
+        fairness = sum(2 * (c.work + len(booked.get(c.key, ()))) + 1 for c in chosen)
+        return abs(total - slot.target) + self.fairness_weight * fairness
+
+    def solve(self) -> Optional[DaySolution]:
+        bounds = []
+        for index in range(len(self.slots)):
+            options = self._options(index, {})
+            if not options:
+                return None
+            bounds.append(options[0][0])
+        self.suffix = [sum(bounds[index:]) for index in range(len(bounds) + 1)]
+        self._search(0, 0.0, {}, [])
+        if self.best is not None:
+            self.best.lower_bound = min(self.best.cost, self.open_bound)
+        return self.best
+
+    def _search(
+        self,
+        index: int,
+        cost: float,
+        booked: Dict[int, List[Tuple[int, int]]],
+        selections: List[Tuple[int, ...]],
+    ) -> None:
+        if self.best is not None and cost + self.suffix[index] >= self.best.cost - _EPSILON:
+            return
+        if index == len(self.slots):
+            self.best = DaySolution(selections=list(selections), cost=cost)
+            return
+        slot = self.slots[index]
+        for option_cost, chosen in self._options(index, booked):
+            bound = cost + option_cost + self.suffix[index + 1]
+            if self.best is not None and bound >= self.best.cost - _EPSILON:
+                break
+            if self.nodes <= 0:
+                # Out of budget: this and every dearer option stay unexplored.
+                self.open_bound = min(self.open_bound, bound)
+                break
+            self.nodes -= 1
+            for candidate in chosen:
+                booked.setdefault(candidate.key, []).append(slot.interval)
+            selections.append(tuple(c.key for c in chosen))
+            self._search(index + 1, cost + option_cost, booked, selections)
+            selections.pop()
+            for candidate in chosen:
+                booked[candidate.key].pop()
+
+
+def _compositions(total: int, limits: Sequence[int]) -> List[Tuple[int, ...]]:
+    """Every way to pick ``total`` items with at most ``limits[i]`` from group ``i``."""
+    if total == 0:
+        return [tuple(0 for _ in limits)]
+    if not limits or sum(limits) < total:
+        return []
+    head, rest = limits[0], limits[1:]
+    result = []
+    for count in range(min(head, total), -1, -1):
+        for tail in _compositions(total - count, rest):
+            result.append((count, *tail))
+    return result
+
+
+def solve_day(
+    slots: Sequence[SlotProblem],
+    *,
+    fairness_weight: float = 10.0,
+    node_limit: int = 20000,
+) -> Optional[DaySolution]:
+    """Return the cheapest feasible selection for ``slots``, or ``None`` if none is found.
+
+    ``selections[i]`` holds the candidate keys chosen for ``slots[i]``. With
+    ``node_limit`` selections tried the search stops early; ``lower_bound``
+    then reflects the unexplored part of the tree, and ``None`` may also mean
+    the budget ran out before any complete selection.
+    """
+    if not slots:
+        return DaySolution()
+    return _DaySearch(slots, fairness_weight, node_limit).solve()
@@ -0,0 +1,233 @@
+"""Max-flow feasibility analysis run before greedy shift generation.
+
+Each day is modelled as a flow network::
+
+    source → (employee, overlap group) → time slot → sink
+
+Source edges have capacity 1 so an employee covers at most one of a set of
+mutually overlapping slots, slot → sink edges carry ``required_staff`` and
+employee → slot edges exist only where the employee is eligible for the
+area and available on that date. TYPE_D staff in rehab slots are routed
+through an intermediate node capped at ``required_staff - 1`` so every
+saturated rehab slot contains at least one TYPE_A/C lead.
+
+Days are independent until the greedy passes balance work counts, so the
+network is solved per date. A day whose maximum flow is below its total
+demand is proven to be impossible to staff, whatever the selection mode;
+the missing flow is the minimum shortage when every overlap group is a
+clique and a lower bound otherwise.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, List, Optional, Sequence
+
+from .availability import AvailabilityIndex
+from .models import Employee, TimeSlot
+from .optimizer import (
+    ShiftGenerationIssue,
+    _can_assign_to_area,
+    _requires_pairing,
+    check_time_overlap,
+)
+
+_SOURCE = ("source",)
+_SINK = ("sink",)
+
+
+@dataclass
+class FeasibilityReport:
+    """Outcome of :func:`check_feasibility` for a whole horizon."""
+
+    required: int = 0
+    assignable: int = 0
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+
+    @property
+    def is_feasible(self) -> bool:
+        """``True`` when every slot on every date can be staffed."""
+        return not self.issues
+
+    @property
+    def shortage(self) -> int:
+        """Lower bound on the missing assignments across the horizon.
+
+        Exact when every overlap group is a clique.
+        """
+        return self.required - self.assignable
+
+
+class _FlowNetwork:
+    """Residual graph with Edmonds–Karp augmentation."""
+
+    def __init__(self) -> None:
+        self._capacity: Dict[Hashable, Dict[Hashable, int]] = {}
+
+    def add_edge(self, tail: Hashable, head: Hashable, capacity: int) -> None:
+        if capacity <= 0:
+            return
+        edges = self._capacity.setdefault(tail, {})
+        edges[head] = edges.get(head, 0) + capacity
+        self._capacity.setdefault(head, {}).setdefault(tail, 0)
+
+    def residual(self, tail: Hashable, head: Hashable) -> int:
+        return self._capacity.get(tail, {}).get(head, 0)
+
+    def _augmenting_path(self, source: Hashable, sink: Hashable) -> Optional[Dict[Hashable, Hashable]]:
+        parents: Dict[Hashable, Hashable] = {source: source}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for head, capacity in self._capacity.get(node, {}).items():
+                if capacity > 0 and head not in parents:
+                    parents[head] = node
+                    if head == sink:
+                        return parents
+                    queue.append(head)
+        return None
+
+    def max_flow(self, source: Hashable, sink: Hashable) -> int:
+        total = 0
+        while True:
+            parents = self._augmenting_path(source, sink)
+            if parents is None:
+                return total
+            path = []
+            node = sink
+            while node != source:
+                path.append((parents[node], node))
+                node = parents[node]
+            amount = min(self.residual(tail, head) for tail, head in path)
+            for tail, head in path:
+                self._capacity[tail][head] -= amount
+                self._capacity[head][tail] += amount
+            total += amount
+
+
+def _overlap_groups(slots: Sequence[TimeSlot]) -> Dict[str, int]:
+    """Map slot ids to groups of mutually overlapping slots.
+
+    Connected components of the overlap graph are used when they are
+    cliques. Otherwise each slot gets its own group, which only relaxes the
+    model, so an infeasibility verdict stays a proof.
+    """
+    components: List[List[TimeSlot]] = []
+    for slot in slots:
+        touching = [c for c in components if any(check_time_overlap(slot, o) for o in c)]
+        merged = [slot] + [other for component in touching for other in component]
+        components = [c for c in components if c not in touching] + [merged]
+
+    groups: List[List[TimeSlot]] = []
+    for component in components:
+        is_clique = all(
+            check_time_overlap(a, b) for i, a in enumerate(component) for b in component[i + 1:]
+        )
+        groups.extend([component] if is_clique else [[slot] for slot in component])
+    return {slot.id: index for index, group in enumerate(groups) for slot in group}
+
+
+def _build_day_network(
+    employees: Sequence[Employee],
+    slots: Sequence[TimeSlot],
+    date_str: str,
+    availability: AvailabilityIndex,
+) -> tuple[_FlowNetwork, Dict[str, List[str]]]:
+    network = _FlowNetwork()
+    candidates: Dict[str, List[str]] = {slot.id: [] for slot in slots}
+    group_of = _overlap_groups(slots)
+
+    for slot in slots:
+        network.add_edge(("slot", slot.id), _SINK, slot.required_staff)
+        network.add_edge(("paired", slot.id), ("slot", slot.id), slot.required_staff - 1)
+
+    for employee in employees:
+        for slot in slots:
+            if not _can_assign_to_area(employee, slot):
+                continue
+            if not availability.is_available(employee, date_str, slot):
+                continue
+            node = ("employee", employee.id, group_of[slot.id])
+            if network.residual(_SOURCE, node) == 0:
+                network.add_edge(_SOURCE, node, 1)
+            kind = "paired" if _requires_pairing(employee, slot) else "slot"
+            network.add_edge(node, (kind, slot.id), 1)
+            candidates[slot.id].append(employee.name)
+    return network, candidates
+
+
+def _shortage_issue(
+    date_str: str,
+    slot: TimeSlot,
+    staffed: int,
+    candidates: List[str],
+) -> ShiftGenerationIssue:
+    return ShiftGenerationIssue(
+        code="infeasible",
+        message=(
+            f"{date_str} {slot.display_name}は、どのように割り当てても"
+            f"必要人数{slot.required_staff}名を確保できません。"
+        ),
+        date=date_str,
+        time_slot_id=slot.id,
+        time_slot_name=slot.display_name,
+        required=slot.required_staff,
+        available=staffed,
+        shortage=slot.required_staff - staffed,
+        available_employees=candidates,
+    )
+
+
+def _check_day(
+    employees: Sequence[Employee],
+    slots: Sequence[TimeSlot],
+    date_str: str,
+    availability: AvailabilityIndex,
+    report: FeasibilityReport,
+) -> None:
+    network, candidates = _build_day_network(employees, slots, date_str, availability)
+    report.required += sum(slot.required_staff for slot in slots)
+    report.assignable += network.max_flow(_SOURCE, _SINK)
+
+    for slot in slots:
+        staffed = slot.required_staff - network.residual(("slot", slot.id), _SINK)
+        if staffed < slot.required_staff:
+            report.issues.append(_shortage_issue(date_str, slot, staffed, candidates[slot.id]))
+
+
+def check_feasibility(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    *,
+    availability: Optional[AvailabilityIndex] = None,
+) -> FeasibilityReport:
+    """Prove whether every slot in ``start_date``–``end_date`` can be staffed.
+
+    The reported shortage is the exact minimum number of missing assignments
+    when every overlap group is a clique. Otherwise the overlapping slots are
+    relaxed into groups of their own (see :func:`_overlap_groups`) and the
+    shortage is only a lower bound: a positive one still proves the horizon
+    infeasible, but more seats may stay empty. Issues name one set of slots
+    realising the bound; slots sharing the same scarce employees may be
+    listed instead of one another.
+    """
+    if availability is None:
+        availability = AvailabilityIndex.load(start_date, end_date)
+
+    slots_by_day: Dict[int, List[TimeSlot]] = {}
+    for slot in time_slots:
+        if slot.is_active and slot.required_staff > 0:
+            slots_by_day.setdefault(slot.day_of_week, []).append(slot)
+
+    report = FeasibilityReport()
+    current = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    while current <= end:
+        daily_slots = slots_by_day.get(current.weekday(), [])
+        if daily_slots:
+            _check_day(employees, daily_slots, current.strftime("%Y-%m-%d"), availability, report)
+        current += timedelta(days=1)
+    return report
@@ -0,0 +1,267 @@
+"""Local-search improvement phase applied after greedy construction.
+
+The greedy selection modes never revisit a decision. :func:`improve_shifts`
+takes a finished roster and repeatedly tries two neighbourhoods:
+
+* **move** – hand one assignment to another eligible, available employee;
+* **swap** – exchange the employees of two assignments (same or different
+  days).
+
+Each candidate is applied to the running
+:class:`~shift_scheduler.roster_stats.RosterStatistics` of the roster, kept if
+it lowers :func:`~shift_scheduler.optimizer.score_roster` and reverted
+otherwise, so one evaluation costs O(1) regardless of the horizon length.
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .availability import AvailabilityIndex
+from .models import Employee, GeneratedShift, TimeSlot
+from .optimizer import (
+    ShiftOccupancy,
+    WorkLimits,
+    _build_shift,
+    _can_assign_to_area,
+    _violates_pairing,
+    _WorkLimitCounters,
+)
+from .roster_stats import RosterStatistics
+
+SlotKey = Tuple[str, str]
+
+_EPSILON = 1e-9
+
+
+class _RosterSearch:
+    """Mutable roster with O(1) objective updates for move/swap neighbourhoods."""
+
+    def __init__(
+        self,
+        shifts: Sequence[GeneratedShift],
+        employees: Sequence[Employee],
+        time_slots: Sequence[TimeSlot],
+        availability: AvailabilityIndex,
+        fairness_weight: float,
+        pinned: Iterable[GeneratedShift] = (),
+        limits: Optional[WorkLimits] = None,
+    ) -> None:
+        self.shifts: List[GeneratedShift] = list(shifts)
+        fixed = {(s.date, s.time_slot_id, s.employee_id) for s in pinned}
+        self.movable = [
+            index for index, s in enumerate(self.shifts)
+            if (s.date, s.time_slot_id, s.employee_id) not in fixed
+        ]
+        self.availability = availability
+        self.fairness_weight = fairness_weight
+        self.eligible: Dict[str, List[Employee]] = {
+            slot.id: [e for e in employees if _can_assign_to_area(e, slot)] for slot in time_slots
+        }
+        self.members: Dict[SlotKey, List[int]] = {}
+        self.occupancy = ShiftOccupancy()
+        self.limits = (
+            _WorkLimitCounters(limits, employees, availability.patterns())
+            if limits is not None else None
+        )
+        for index, shift in enumerate(self.shifts):
+            self.members.setdefault((shift.date, shift.time_slot_id), []).append(index)
+            self._book(shift)
+        self.stats = RosterStatistics(employees, self.shifts)
+
+    def objective(self) -> float:
+        return self.stats.score(self.fairness_weight)
+
+    def _book(self, shift: GeneratedShift) -> None:
+        self.occupancy.book(shift.date, shift.employee_id, shift.time_slot)
+        if self.limits is not None:
+            self.limits.book(shift.employee_id, shift.date, shift.time_slot)
+
+    def _release(self, shift: GeneratedShift) -> None:
+        self.occupancy.release(shift.date, shift.employee_id, shift.time_slot)
+        if self.limits is not None:
+            self.limits.release(shift.employee_id, shift.date, shift.time_slot)
+
+    def _assign(self, index: int, employee: Employee) -> GeneratedShift:
+        """Replace the employee of ``shifts[index]`` without validation."""
+        old = self.shifts[index]
+        new = _build_shift(old.date, old.time_slot, employee)
+        self._release(old)
+        self._book(new)
+        self.stats.reassign(old, new)
+        self.shifts[index] = new
+        return old
+
+    def _in_slot(self, employee_id: int, shift: GeneratedShift) -> bool:
+        indices = self.members[(shift.date, shift.time_slot_id)]
+        return any(self.shifts[i].employee_id == employee_id for i in indices)
+
+    def _can_take(self, employee: Employee, shift: GeneratedShift) -> bool:
+        if not _can_assign_to_area(employee, shift.time_slot):
+            return False
+        if self._in_slot(employee.id, shift):
+            return False
+        if self.occupancy.conflicts(shift.date, employee.id, shift.time_slot):
+            return False
+        if self.limits is not None and self.limits.violation(employee.id, shift.date, shift.time_slot):
+            return False
+        return self.availability.is_available(employee, shift.date, shift.time_slot)
+
+    def _pairing_broken(self, *indices: int) -> bool:
+        for index in indices:
+            shift = self.shifts[index]
+            members = self.members[(shift.date, shift.time_slot_id)]
+            if _violates_pairing([self.shifts[i].employee for i in members], shift.time_slot):
+                return True
+        return False
+
+    def reassign(self, index: int, employee: Employee) -> bool:
+        """Hand ``shifts[index]`` to ``employee`` if every hard rule still holds."""
+        shift = self.shifts[index]
+        if not self._can_take(employee, shift):
+            return False
+        old = self._assign(index, employee)
+        if self._pairing_broken(index):
+            self._assign(index, old.employee)
+            return False
+        return True
+
+    def objective_if(self, index: int, employee: Employee) -> Optional[float]:
+        """Objective if ``shifts[index]`` went to ``employee``, or ``None`` if not allowed.
+
+        The roster is left unchanged.
+        """
+        old = self.shifts[index]
+        if not self.reassign(index, employee):
+            return None
+        value = self.objective()
+        self._assign(index, old.employee)
+        return value
+
+    def limit_breaches(self) -> List[Tuple[int, str]]:
+        """Movable shifts that break a work limit with their reasons, by date.
+
+        An employee-day is rebooked shift by shift. Only its first shift is
+        checked against the consecutive days, so when that one breaks a
+        limit the whole day does; later shifts may add a weekly-hours
+        breach of their own. Empty without ``limits``.
+        """
+        if self.limits is None:
+            return []
+        movable = set(self.movable)
+        by_day: Dict[Tuple[str, int], List[int]] = {}
+        for index, shift in enumerate(self.shifts):
+            by_day.setdefault((shift.date, shift.employee_id), []).append(index)
+        breaches: List[Tuple[int, str]] = []
+        for key in sorted(by_day):
+            indices = by_day[key]
+            for index in indices:
+                self._release(self.shifts[index])
+            day_reason: Optional[str] = None
+            for position, index in enumerate(indices):
+                shift = self.shifts[index]
+                reason = day_reason or self.limits.violation(
+                    shift.employee_id, shift.date, shift.time_slot
+                )
+                if position == 0:
+                    day_reason = reason
+                if reason is not None and index in movable:
+                    breaches.append((index, reason))
+                self._book(shift)
+        return breaches
+
+    def try_move(self, rng: random.Random) -> bool:
+        index = rng.choice(self.movable)
+        shift = self.shifts[index]
+        pool = self.eligible.get(shift.time_slot_id)
+        if not pool:
+            return False
+        candidate = rng.choice(pool)
+        if candidate.id == shift.employee_id or not self._can_take(candidate, shift):
+            return False
+
+        before = self.objective()
+        old = self._assign(index, candidate)
+        if self._pairing_broken(index) or self.objective() >= before - _EPSILON:
+            self._assign(index, old.employee)
+            return False
+        return True
+
+    def _can_swap(self, first: GeneratedShift, second: GeneratedShift) -> bool:
+        # Release both bookings so same-day swaps between overlapping slots
+        # are not rejected as conflicts with the employee's own shift, and
+        # the limit counters do not count the shift being handed over.
+        self._release(first)
+        self._release(second)
+        allowed = self._can_take(second.employee, first) and self._can_take(first.employee, second)
+        self._book(first)
+        self._book(second)
+        return allowed
+
+    def _swap(self, i: int, j: int) -> None:
+        first, second = self.shifts[i], self.shifts[j]
+        self._assign(i, second.employee)
+        self._assign(j, first.employee)
+
+    def try_swap(self, rng: random.Random) -> bool:
+        i, j = rng.choice(self.movable), rng.choice(self.movable)
+        first, second = self.shifts[i], self.shifts[j]
+        if first.employee_id == second.employee_id:
+            return False
+        if (first.date, first.time_slot_id) == (second.date, second.time_slot_id):
+            return False
+        if not self._can_swap(first, second):
+            return False
+
+        before = self.objective()
+        self._swap(i, j)
+        if self._pairing_broken(i, j) or self.objective() >= before - _EPSILON:
+            self._swap(i, j)
+            return False
+        return True
+
+
+def improve_shifts(
+    shifts: Sequence[GeneratedShift],
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    *,
+    availability: Optional[AvailabilityIndex] = None,
+    time_budget_s: float = 1.0,
+    max_iterations: Optional[int] = None,
+    fairness_weight: float = 10.0,
+    seed: Optional[int] = None,
+    pinned: Iterable[GeneratedShift] = (),
+    limits: Optional[WorkLimits] = None,
+) -> List[GeneratedShift]:
+    """Improve a roster with move/swap local search within ``time_budget_s``.
+
+    Only strictly improving neighbours are accepted and every accepted
+    neighbour keeps area eligibility, availability, the no-double-booking
+    rule and the TYPE_D pairing rule intact, and with ``limits`` no move
+    breaks a :class:`~shift_scheduler.optimizer.WorkLimits` rule the
+    roster did not already break. Assignments matching ``pinned`` are never
+    moved. The input is not modified.
+    """
+    if not shifts:
+        return list(shifts)
+    if availability is None:
+        dates = sorted(shift.date for shift in shifts)
+        availability = AvailabilityIndex.load(dates[0], dates[-1])
+
+    search = _RosterSearch(
+        shifts, employees, time_slots, availability, fairness_weight, pinned, limits
+    )
+    if not search.movable:
+        return search.shifts
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_budget_s
+    iteration = 0
+    while time.perf_counter() < deadline:
+        if max_iterations is not None and iteration >= max_iterations:
+            break
+        neighbour = search.try_swap if rng.random() < 0.5 else search.try_move
+        neighbour(rng)
+        iteration += 1
+    return search.shifts
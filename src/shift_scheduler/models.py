@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 
 @dataclass(slots=True)
@@ -56,6 +56,25 @@ class Absence:
         return asdict(self)
 
 
+@dataclass(slots=True)
+class AreaRule:
+    """Represents who may work in an area and which skill scores it.
+
+    ``paired_types`` may only work a slot of the area alongside one of the
+    ``lead_types`` (e.g. part-timers next to a full-time colleague).
+    """
+
+    area: str
+    employee_types: Tuple[str, ...]
+    skill_morning: str
+    skill_afternoon: str
+    lead_types: Tuple[str, ...] = ()
+    paired_types: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
 @dataclass(slots=True)
 class TimeSlot:
     """Represents a fixed operational time slot."""
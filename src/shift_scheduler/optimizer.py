@@ -1,12 +1,24 @@
 """Heuristic shift optimisation aligned with the V3.0 specification."""
 from __future__ import annotations
 
+import heapq
+import random
+import time
+from bisect import bisect_left, insort
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Sequence
+from datetime import date, datetime, timedelta
+from itertools import combinations
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .availability import describe_unavailability, is_employee_available
-from .models import Employee, GeneratedShift, TimeSlot
+import numpy as np
+
+from .areas import get_area_registry, set_area_registry
+from .availability import AvailabilityIndex
+from .exact import Candidate, SlotProblem, solve_day
+from .models import Employee, EmploymentPattern, GeneratedShift, TimeSlot
+from .roster_stats import RosterStatistics
+from .scoring import OptimisationMode, ScoringWeights, resolve_weights
 
 
 @dataclass
@@ -34,6 +46,62 @@ class ShiftGenerationIssue:
     rejections: List[RejectionSummary] = field(default_factory=list)
 
 
+@dataclass
+class GenerationReport:
+    """Collects every issue found by a collect-all generation run.
+
+    Passing a report to :func:`generate_shifts` keeps generation going after
+    a slot cannot be filled, so a single pass surfaces every shortage across
+    the horizon alongside the partial roster.
+
+    ``stopped`` is ``"timeout"`` or ``"cancelled"`` when the run ended early
+    and returned the best roster found so far.
+
+    ``optimality_gap`` is set by ``optimisation_mode="exact"``: the relative
+    distance between the roster's day costs and their proven lower bounds,
+    ``0.0`` when every day was solved to optimality. ``heuristic_days``
+    lists the dates the exact search left to the ``"balance"`` heuristic
+    (no selection within the node budget, an infeasible day or a solution
+    breaking the work limits); the gap is then ``None``, since those days
+    have no bound.
+    """
+
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+    stopped: Optional[str] = None
+    optimality_gap: Optional[float] = None
+    heuristic_days: List[str] = field(default_factory=list)
+
+    @property
+    def is_complete(self) -> bool:
+        """``True`` when the run produced a full roster without any issue."""
+        return not self.issues and self.stopped is None
+
+
+# ``on_progress(fraction, best_score)`` callback of :func:`generate_shifts`.
+ProgressCallback = Callable[[float, Optional[float]], None]
+
+
+# Upper bound on candidate selections tried when a day is re-solved by backtracking.
+_BACKTRACK_NODE_LIMIT = 5000
+
+# Node budget per day and work-spread weight of the exact branch-and-bound.
+_EXACT_NODE_LIMIT = 20000
+_EXACT_FAIRNESS_WEIGHT = 10.0
+
+# Seconds between deadline checks while waiting for multi-start workers.
+_POLL_INTERVAL_S = 0.1
+
+
+def _requires_pairing(employee: Employee, time_slot: TimeSlot) -> bool:
+    """Return ``True`` if ``employee`` may only work ``time_slot`` alongside a lead."""
+    return get_area_registry().requires_pairing(employee, time_slot)
+
+
+def _violates_pairing(employees: Sequence[Employee], time_slot: TimeSlot) -> bool:
+    """Return ``True`` if paired staff (TYPE_D in リハ室) have no lead colleague."""
+    return get_area_registry().violates_pairing(employees, time_slot)
+
+
 class ShiftGenerationError(Exception):
     """Exception raised when shift generation cannot produce a valid roster."""
 
@@ -47,20 +115,179 @@ def _time_to_minutes(value: str) -> int:
     return hours * 60 + minutes
 
 
+def _slot_interval(slot: TimeSlot) -> Tuple[int, int]:
+    """Return the slot as a ``(start, end)`` minute interval, wrapping past midnight."""
+    start = _time_to_minutes(slot.start_time)
+    end = _time_to_minutes(slot.end_time)
+    if end < start:
+        end += 24 * 60
+    return start, end
+
+
 def check_time_overlap(slot_a: TimeSlot, slot_b: TimeSlot) -> bool:
     """Return ``True`` if the supplied time slots overlap."""
 
-    start_a = _time_to_minutes(slot_a.start_time)
-    end_a = _time_to_minutes(slot_a.end_time)
-    start_b = _time_to_minutes(slot_b.start_time)
-    end_b = _time_to_minutes(slot_b.end_time)
+    start_a, end_a = _slot_interval(slot_a)
+    start_b, end_b = _slot_interval(slot_b)
+    return not (end_a <= start_b or end_b <= start_a)
 
-    if end_a < start_a:
-        end_a += 24 * 60
-    if end_b < start_b:
-        end_b += 24 * 60
 
-    return not (end_a <= start_b or end_b <= start_a)
+class ShiftOccupancy:
+    """Booked minute intervals per ``(date, employee_id)``.
+
+    Intervals for one employee-day never overlap, so keeping them sorted by
+    start time lets an overlap check inspect a single neighbour via bisection
+    instead of scanning the whole accumulated schedule.
+    """
+
+    def __init__(self) -> None:
+        self._booked: Dict[Tuple[str, int], List[Tuple[int, int]]] = {}
+
+    def conflicts(self, date_str: str, employee_id: int, slot: TimeSlot) -> bool:
+        """Return ``True`` if ``slot`` overlaps a booking for the employee on ``date_str``."""
+        intervals = self._booked.get((date_str, employee_id))
+        if not intervals:
+            return False
+        start, end = _slot_interval(slot)
+        index = bisect_left(intervals, (end,))
+        return index > 0 and intervals[index - 1][1] > start
+
+    def book(self, date_str: str, employee_id: int, slot: TimeSlot) -> None:
+        insort(self._booked.setdefault((date_str, employee_id), []), _slot_interval(slot))
+
+    def release(self, date_str: str, employee_id: int, slot: TimeSlot) -> None:
+        intervals = self._booked.get((date_str, employee_id), [])
+        interval = _slot_interval(slot)
+        if interval in intervals:
+            intervals.remove(interval)
+
+    def is_working(self, date_str: str, employee_id: int) -> bool:
+        """Return ``True`` if the employee has any booking on ``date_str``."""
+        return bool(self._booked.get((date_str, employee_id)))
+
+    def streak(self, date_str: str, employee_id: int, limit: int) -> int:
+        """Days in a row, at most ``limit``, the employee works up to the day before ``date_str``."""
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+        count = 0
+        while count < limit:
+            day -= timedelta(days=1)
+            if not self.is_working(day.strftime("%Y-%m-%d"), employee_id):
+                break
+            count += 1
+        return count
+
+
+@dataclass(frozen=True)
+class WorkLimits:
+    """Labour limits enforced while a roster is built.
+
+    ``max_consecutive_days`` caps the days an employee works in a row.
+    Weekly hours run Monday to Sunday; a worked day counts its booked slot
+    time, at most the ``work_hours`` of the employee's employment pattern
+    (the break of a full day is not working time). The week is capped at
+    ``work_hours × weekly_workdays``, or at ``default_weekly_hours`` for
+    employees without a pattern. ``None`` switches a limit off.
+
+    Only shifts of the run count: days worked before ``start_date`` are not
+    known to the generator.
+    """
+
+    max_consecutive_days: Optional[int] = 6
+    weekly_workdays: Optional[float] = 5.0
+    default_weekly_hours: Optional[float] = 40.0
+
+
+def _day_ordinal(date_str: str) -> int:
+    return date.fromisoformat(date_str).toordinal()
+
+
+class _WorkLimitCounters:
+    """Rolling per-employee counters behind :class:`WorkLimits`.
+
+    Booked minutes per employee-day and counted minutes per employee-week
+    change in O(1) with every booking and release, so checking a candidate
+    never rescans the schedule. The consecutive-days check looks at no more
+    than ``max_consecutive_days`` neighbouring days on either side, which
+    keeps it correct for pinned shifts ahead of the day being built.
+    """
+
+    def __init__(
+        self,
+        limits: WorkLimits,
+        employees: Sequence[Employee],
+        patterns: Iterable[EmploymentPattern],
+    ) -> None:
+        self.limits = limits
+        by_id = {pattern.id: pattern for pattern in patterns}
+        self._daily_cap: Dict[int, Optional[int]] = {}
+        self._weekly_cap: Dict[int, Optional[float]] = {}
+        for employee in employees:
+            pattern = by_id.get(employee.employment_pattern_id or "")
+            if pattern is None:
+                self._daily_cap[employee.id] = None
+                weekly_hours = limits.default_weekly_hours
+            else:
+                self._daily_cap[employee.id] = round(pattern.work_hours * 60)
+                weekly_hours = (
+                    None if limits.weekly_workdays is None
+                    else pattern.work_hours * limits.weekly_workdays
+                )
+            self._weekly_cap[employee.id] = None if weekly_hours is None else weekly_hours * 60
+        self._day_minutes: Dict[Tuple[int, int], int] = {}
+        self._week_minutes: Dict[Tuple[int, int], int] = {}
+
+    def _counted(self, employee_id: int, minutes: int) -> int:
+        cap = self._daily_cap.get(employee_id)
+        return minutes if cap is None else min(minutes, cap)
+
+    def _adjust(self, employee_id: int, date_str: str, slot: TimeSlot, sign: int) -> None:
+        day = _day_ordinal(date_str)
+        start, end = _slot_interval(slot)
+        key = (employee_id, day)
+        old = self._day_minutes.get(key, 0)
+        new = old + sign * (end - start)
+        if new > 0:
+            self._day_minutes[key] = new
+        else:
+            self._day_minutes.pop(key, None)
+        # Ordinal 1 (0001-01-01) is a Monday.
+        week = (employee_id, day - (day - 1) % 7)
+        self._week_minutes[week] = (
+            self._week_minutes.get(week, 0)
+            + self._counted(employee_id, new) - self._counted(employee_id, old)
+        )
+
+    def book(self, employee_id: int, date_str: str, slot: TimeSlot) -> None:
+        self._adjust(employee_id, date_str, slot, 1)
+
+    def release(self, employee_id: int, date_str: str, slot: TimeSlot) -> None:
+        self._adjust(employee_id, date_str, slot, -1)
+
+    def _run(self, employee_id: int, day: int, step: int, limit: int) -> int:
+        count = 0
+        while count < limit and (employee_id, day + step * (count + 1)) in self._day_minutes:
+            count += 1
+        return count
+
+    def violation(self, employee_id: int, date_str: str, slot: TimeSlot) -> Optional[str]:
+        """Reason booking ``slot`` on ``date_str`` would break a limit, else ``None``."""
+        day = _day_ordinal(date_str)
+        key = (employee_id, day)
+        limit = self.limits.max_consecutive_days
+        if limit is not None and key not in self._day_minutes:
+            run = 1 + self._run(employee_id, day, -1, limit) + self._run(employee_id, day, 1, limit)
+            if run > limit:
+                return f"連続勤務の上限（{limit}日）を超えます"
+
+        cap = self._weekly_cap.get(employee_id)
+        if cap is not None:
+            start, end = _slot_interval(slot)
+            old = self._day_minutes.get(key, 0)
+            week = self._week_minutes.get((employee_id, day - (day - 1) % 7), 0)
+            week += self._counted(employee_id, old + end - start) - self._counted(employee_id, old)
+            if week > cap:
+                return f"週の労働時間の上限（{cap / 60:g}時間）を超えます"
+        return None
 
 
 def calculate_skill_score(employee: Employee, time_slot: TimeSlot) -> int:
@@ -68,125 +295,215 @@ def calculate_skill_score(employee: Employee, time_slot: TimeSlot) -> int:
     
     受付業務では医事能力（保険登録、会計など）を優先的に評価する。
     各時間帯のスキルスコアを均等化することで、日によるサービス品質の
-    偏りを防止する。
+    偏りを防止する。エリアごとの評価項目はエリア設定（:mod:`.areas`）に従う。
     """
-    general = employee.skill_general
-    if time_slot.area == "リハ室":
-        return employee.skill_reha + general
-    if time_slot.area == "受付":
-        # 受付スキルには医事能力（保険登録、会計など）が含まれる
-        if time_slot.period == "morning":
-            return employee.skill_reception_am + general
-        if time_slot.period == "afternoon":
-            return employee.skill_reception_pm + general
-        return ((employee.skill_reception_am + employee.skill_reception_pm) // 2) + general
-    return general
+    return get_area_registry().skill_score(employee, time_slot)
 
 
 def _can_assign_to_area(employee: Employee, time_slot: TimeSlot) -> bool:
-    if time_slot.area == "リハ室":
-        if employee.employee_type not in {"TYPE_A", "TYPE_C", "TYPE_D"}:
-            return False
-        return employee.skill_reha > 0
+    return get_area_registry().can_assign(employee, time_slot)
 
-    if time_slot.area == "受付":
-        if employee.employee_type not in {"TYPE_A", "TYPE_B"}:
-            return False
-        return employee.skill_reception_am > 0 or employee.skill_reception_pm > 0
 
-    return True
+class _SkillMatrix:
+    """Employee × time slot skill scores and area eligibility for one run.
 
+    Built once from the active area registry so selectors slice columns
+    instead of re-scoring every candidate on every pick.
+    """
 
-def _select_by_workday_count(candidates: Sequence[Employee], count: int, work_count: Dict[int, int]) -> List[Employee]:
-    """Select employees with minimum work days."""
-    selected: List[Employee] = []
-    remaining = list(candidates)
-    
-    for _ in range(count):
-        if not remaining:
-            break
-        min_work = min(work_count[e.id] for e in remaining)
-        pool = [e for e in remaining if work_count[e.id] == min_work]
-        chosen = pool[0]
-        selected.append(chosen)
-        remaining.remove(chosen)
-    
-    return selected
+    def __init__(self, employees: Sequence[Employee], time_slots: Sequence[TimeSlot]) -> None:
+        self._row = {employee.id: index for index, employee in enumerate(employees)}
+        self._col = {slot.id: index for index, slot in enumerate(time_slots)}
+        shape = (len(employees), len(time_slots))
+        registry = get_area_registry()
+        self.scores = np.array(
+            [[registry.skill_score(e, s) for s in time_slots] for e in employees], dtype=float
+        ).reshape(shape)
+        self.eligible = np.array(
+            [[registry.can_assign(e, s) for s in time_slots] for e in employees], dtype=bool
+        ).reshape(shape)
+
+    def covers(self, employee: Employee, slot: TimeSlot) -> bool:
+        return employee.id in self._row and slot.id in self._col
+
+    def can_assign(self, employee: Employee, slot: TimeSlot) -> bool:
+        if not self.covers(employee, slot):
+            return _can_assign_to_area(employee, slot)
+        return bool(self.eligible[self._row[employee.id], self._col[slot.id]])
+
+    def column(self, candidates: Sequence[Employee], slot: TimeSlot) -> np.ndarray:
+        """Skill scores of ``candidates`` for ``slot``, in candidate order."""
+        if slot.id in self._col and all(e.id in self._row for e in candidates):
+            rows = [self._row[e.id] for e in candidates]
+            return self.scores[rows, self._col[slot.id]]
+        return np.array([calculate_skill_score(e, slot) for e in candidates], dtype=float)
+
+
+# Days looked back for the consecutive-day term of the scoring engine.
+_STREAK_LOOKBACK = 14
+
+
+@dataclass
+class _SelectionContext:
+    """Day-level inputs of the score terms beyond work count and skill."""
 
+    date_str: str
+    occupancy: ShiftOccupancy
+    morning_workers: Sequence[int] = ()
 
-def _select_by_skill_score(
+
+class _CandidateArrays:
+    """Vectorised view of one slot's candidates for the scoring engine.
+
+    ``open`` masks candidates not yet picked. Every pick is an ``argmin``
+    over a masked score vector, which returns the first minimum and
+    therefore keeps the candidate-order tie-breaking of the original loops.
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[Employee],
+        work_count: Dict[int, int],
+        time_slot: Optional[TimeSlot],
+        already_selected: Sequence[Employee],
+        skills: Optional[_SkillMatrix] = None,
+    ) -> None:
+        self.candidates = list(candidates)
+        self.time_slot = time_slot
+        self.work = np.array([work_count[e.id] for e in self.candidates], dtype=float)
+        self.open = np.ones(len(self.candidates), dtype=bool)
+        if time_slot is None:
+            self.lead = np.ones(len(self.candidates), dtype=bool)
+            self.has_lead = True
+            return
+        self.lead = np.array([not _requires_pairing(e, time_slot) for e in self.candidates], dtype=bool)
+        self.has_lead = any(not _requires_pairing(e, time_slot) for e in already_selected)
+        self._skills = skills
+        self._scores: Optional[np.ndarray] = None
+
+    @property
+    def scores(self) -> np.ndarray:
+        """Candidate skill scores, looked up on first use (``days`` never needs them)."""
+        if self._scores is None:
+            skills = self._skills if self._skills is not None else _SkillMatrix((), ())
+            self._scores = skills.column(self.candidates, self.time_slot)
+        return self._scores
+
+    def exhausted(self) -> bool:
+        return not self.open.any()
+
+    def needs_lead(self, seats_left: int) -> bool:
+        """Whether the pick must be a TYPE_A/C lead: a rehab slot's last seat
+        while no lead has been chosen (when any lead is left)."""
+        if self.has_lead or seats_left != 1:
+            return False
+        if not get_area_registry().has_pairing(self.time_slot.area):
+            return False
+        return bool((self.open & self.lead).any())
+
+    def eligible(self, seats_left: int) -> np.ndarray:
+        """Open candidates, restricted to leads when :meth:`needs_lead`."""
+        if self.needs_lead(seats_left):
+            return self.open & self.lead
+        return self.open
+
+    def static_scores(
+        self, weights: ScoringWeights, context: Optional[_SelectionContext]
+    ) -> np.ndarray:
+        """Score terms that do not change while the slot is filled."""
+        base = weights.work * self.work
+        if context is None:
+            return base
+        if weights.consecutive_days:
+            streaks = [
+                context.occupancy.streak(context.date_str, e.id, _STREAK_LOOKBACK)
+                for e in self.candidates
+            ]
+            base = base + weights.consecutive_days * np.array(streaks, dtype=float)
+        if weights.continuity and self.time_slot is not None and self.time_slot.period == "afternoon":
+            continuing = np.array([e.id in context.morning_workers for e in self.candidates], dtype=bool)
+            base = base - weights.continuity * continuing
+        return base
+
+    def best(self, mask: np.ndarray, scores: np.ndarray) -> int:
+        return int(np.argmin(np.where(mask, scores, np.inf)))
+
+    def take(self, index: int) -> Employee:
+        self.open[index] = False
+        self.has_lead = self.has_lead or bool(self.lead[index])
+        return self.candidates[index]
+
+
+def _slot_target(time_slot: TimeSlot) -> float:
+    return time_slot.target_skill_score or (time_slot.required_staff * 150)
+
+
+def _per_person_target(time_slot: TimeSlot, current_score: float, count: int, selected: int) -> float:
+    target = _slot_target(time_slot)
+    return (target - current_score) / max(1, count - selected)
+
+
+def _select_by_weights(
     candidates: Sequence[Employee],
     count: int,
     work_count: Dict[int, int],
     time_slot: TimeSlot,
-    current_selected: List[Employee],
+    weights: ScoringWeights,
+    already_selected: Sequence[Employee] = (),
+    skills: Optional[_SkillMatrix] = None,
+    context: Optional[_SelectionContext] = None,
+    skill_weight: float = 1.0,
 ) -> List[Employee]:
-    """スキル能力の平均化を優先する選択アルゴリズム。
-    
-    各時間帯において、配置される職員のスキル能力を均等化する。
-    特に受付業務では医事能力（保険登録、会計など）を優先する。
-    
-    目標値に近いスキルスコアを持つ職員を選択することで、
-    日によって能力が偏らないよう、各時間帯の職員スキルレベルを均一化する。
+    """スコアリングエンジンによる選択アルゴリズム。
+
+    重みから候補ごとのスコアを組み立て、最小スコアの職員を1人ずつ選ぶ。
+    スキル差の項には ``skill_weight``（時間帯ごとの重み）を掛ける。
+    勤務回数・連続勤務・午前からの継続は枠を埋める間に変わらないため一度だけ計算し、
+    目標スキルとの差は1人選ぶごとに残りの枠の1人あたり目標で計算し直す。
+    TYPE_Dのみにならないよう、リハ室の最後の枠はTYPE_A/Cに制限する。
     """
-    selected: List[Employee] = list(current_selected)
-    remaining = list(candidates)
-    
-    for _ in range(count - len(selected)):
-        if not remaining:
+    arrays = _CandidateArrays(candidates, work_count, time_slot, already_selected, skills)
+    base = arrays.static_scores(weights, context)
+    skill_factor = weights.skill_deviation * skill_weight
+    if not skill_factor:
+        return _select_by_static_scores(arrays, base, count)
+    selected: List[Employee] = []
+    current_score = 0.0
+
+    for _ in range(count):
+        if arrays.exhausted():
             break
-        
-        target = time_slot.target_skill_score or (time_slot.required_staff * 150)
-        current_score = sum(calculate_skill_score(e, time_slot) for e in selected)
-        remaining_slots = max(1, count - len(selected))
-        per_person_target = (target - current_score) / remaining_slots
-        
-        # 目標スコアに最も近い職員を選択（医事能力を優先評価）
-        chosen = min(
-            remaining,
-            key=lambda e: abs(calculate_skill_score(e, time_slot) - per_person_target),
-        )
-        selected.append(chosen)
-        remaining.remove(chosen)
-    
+        mask = arrays.eligible(count - len(selected))
+        per_person_target = _per_person_target(time_slot, current_score, count, len(selected))
+        scores = base + skill_factor * np.abs(arrays.scores - per_person_target)
+        index = arrays.best(mask, scores)
+        current_score += arrays.scores[index]
+        selected.append(arrays.take(index))
+
     return selected
 
 
-def _select_by_balance(
-    candidates: Sequence[Employee],
-    count: int,
-    work_count: Dict[int, int],
-    time_slot: TimeSlot,
-) -> List[Employee]:
-    """勤務回数とスキル能力のバランスを考慮した選択アルゴリズム。
-    
-    最小勤務回数の職員の中から、スキル能力の平均化を考慮して選択する。
-    特に受付業務では医事能力（保険登録、会計など）を優先評価する。
+def _select_by_static_scores(arrays: _CandidateArrays, scores: np.ndarray, count: int) -> List[Employee]:
+    """Pick ``count`` candidates by scores that do not change between picks.
+
+    Heaps keyed on ``(score, candidate index)`` – the index keeps the
+    candidate-order tie-breaking of ``argmin`` – give O(n + k log n) per
+    slot. A second heap holds only the leads for a rehab slot's last seat;
+    a candidate taken through one heap is skipped when it surfaces in the
+    other (lazy deletion).
     """
+    everyone = [(float(score), index) for index, score in enumerate(scores)]
+    leads = [entry for entry in everyone if arrays.lead[entry[1]]]
+    heapq.heapify(everyone)
+    heapq.heapify(leads)
     selected: List[Employee] = []
-    remaining = list(candidates)
-    
-    for _ in range(count):
-        if not remaining:
+    for seats_left in range(count, 0, -1):
+        heap = leads if arrays.needs_lead(seats_left) else everyone
+        while heap and not arrays.open[heap[0][1]]:
+            heapq.heappop(heap)
+        if not heap:
             break
-        
-        # 最小勤務回数の職員を抽出
-        min_work = min(work_count[e.id] for e in remaining)
-        pool = [e for e in remaining if work_count[e.id] == min_work]
-        
-        # その中からスキルバランスが良い職員を選択（能力の平均化）
-        target = time_slot.target_skill_score or (time_slot.required_staff * 150)
-        current_score = sum(calculate_skill_score(e, time_slot) for e in selected)
-        remaining_slots = max(1, count - len(selected))
-        per_person_target = (target - current_score) / remaining_slots
-        
-        chosen = min(
-            pool,
-            key=lambda e: abs(calculate_skill_score(e, time_slot) - per_person_target),
-        )
-        selected.append(chosen)
-        remaining.remove(chosen)
-    
+        selected.append(arrays.take(heapq.heappop(heap)[1]))
     return selected
 
 
@@ -195,17 +512,26 @@ def _select_employees_for_slot(
     time_slot: TimeSlot,
     count: int,
     work_count: Dict[int, int],
-    mode: str,
+    mode: OptimisationMode,
+    already_selected: Sequence[Employee] = (),
+    skills: Optional[_SkillMatrix] = None,
+    context: Optional[_SelectionContext] = None,
 ) -> List[Employee]:
+    """Pick ``count`` of ``candidates`` with the weights of ``mode``.
+
+    ``mode`` is ``"days"``, ``"skill"``, ``"balance"`` or custom
+    :class:`~shift_scheduler.scoring.ScoringWeights`. Only custom weights
+    apply the slot's ``skill_weight``: in the built-in modes a positive
+    weight cannot change the picks, and a weight of 0 would drop their skill
+    term altogether.
+    """
     if len(candidates) < count:
         return []
-
-    if mode == "days":
-        return _select_by_workday_count(candidates, count, work_count)
-    elif mode == "skill":
-        return _select_by_skill_score(candidates, count, work_count, time_slot, [])
-    else:  # balance
-        return _select_by_balance(candidates, count, work_count, time_slot)
+    skill_weight = time_slot.skill_weight if isinstance(mode, ScoringWeights) else 1.0
+    return _select_by_weights(
+        candidates, count, work_count, time_slot, resolve_weights(mode),
+        already_selected, skills, context, skill_weight,
+    )
 
 
 def _evaluate_part_time_rule(
@@ -225,17 +551,14 @@ def _evaluate_part_time_rule(
 
     for slot_id, slot_shifts in grouped.items():
         slot = shift_lookup.get(slot_id, slot_shifts[0].time_slot)
-        if slot.area != "リハ室":
-            continue
-
-        types = {s.employee.employee_type for s in slot_shifts}
-        if "TYPE_D" in types and not ({"TYPE_A", "TYPE_C"} & types):
+        if _violates_pairing([s.employee for s in slot_shifts], slot):
             employees = [s.employee_name for s in slot_shifts]
+            rule = get_area_registry().rules[slot.area]
             issue = ShiftGenerationIssue(
                 code="part_time_rule",
                 message=(
-                    "リハ室の時間帯でTYPE_D職員のみが割り当てられています。"
-                    "TYPE_AまたはTYPE_Cを同じ時間帯に配置してください。"
+                    f"{slot.area}の時間帯で{'/'.join(rule.paired_types)}職員のみが割り当てられています。"
+                    f"{'または'.join(rule.lead_types)}を同じ時間帯に配置してください。"
                 ),
                 date=slot_shifts[0].date,
                 time_slot_id=slot_id,
@@ -249,6 +572,75 @@ def _evaluate_part_time_rule(
     return None
 
 
+@dataclass
+class _GenerationState:
+    """Mutable bookkeeping shared by the slots of one generation run."""
+
+    availability: AvailabilityIndex
+    work_count: Dict[int, int]
+    schedule: List[GeneratedShift] = field(default_factory=list)
+    occupancy: ShiftOccupancy = field(default_factory=ShiftOccupancy)
+    report: Optional[GenerationReport] = None
+    rng: Optional[random.Random] = None
+    skills: Optional[_SkillMatrix] = None
+    pinned: Dict[Tuple[str, str], List[GeneratedShift]] = field(default_factory=dict)
+    pinned_by_date: Dict[str, List[GeneratedShift]] = field(default_factory=dict)
+    exact_cost: float = 0.0
+    exact_bound: float = 0.0
+    heuristic_days: List[str] = field(default_factory=list)
+    candidates: Optional["_SlotCandidates"] = None
+    limits: Optional[_WorkLimitCounters] = None
+    stats: RosterStatistics = field(default_factory=RosterStatistics)
+
+    def fail(self, issue: ShiftGenerationIssue) -> None:
+        """Raise ``issue`` or, in collect-all mode, record it and carry on."""
+        if self.report is None:
+            raise ShiftGenerationError(issue)
+        self.report.issues.append(issue)
+
+    def commit(self, shifts: Sequence[GeneratedShift]) -> None:
+        """Record ``shifts`` in the schedule, occupancy map, counters and statistics."""
+        for shift in shifts:
+            self.schedule.append(shift)
+            self.stats.add(shift)
+            self.occupancy.book(shift.date, shift.employee_id, shift.time_slot)
+            self.work_count[shift.employee_id] = self.work_count.get(shift.employee_id, 0) + 1
+            if self.limits is not None:
+                self.limits.book(shift.employee_id, shift.date, shift.time_slot)
+
+    def rollback(self, checkpoint: int) -> None:
+        """Undo every shift committed after ``len(schedule) == checkpoint``."""
+        while len(self.schedule) > checkpoint:
+            shift = self.schedule.pop()
+            self.stats.remove(shift)
+            self.occupancy.release(shift.date, shift.employee_id, shift.time_slot)
+            self.work_count[shift.employee_id] -= 1
+            if self.limits is not None:
+                self.limits.release(shift.employee_id, shift.date, shift.time_slot)
+
+    def pin(self, shifts: Sequence[GeneratedShift]) -> None:
+        """Commit fixed ``shifts`` and count them against their slots' seats."""
+        self.commit(shifts)
+        for shift in shifts:
+            self.pinned.setdefault((shift.date, shift.time_slot_id), []).append(shift)
+            self.pinned_by_date.setdefault(shift.date, []).append(shift)
+
+    def pinned_members(self, date_str: str, slot: TimeSlot) -> List[Employee]:
+        return [shift.employee for shift in self.pinned.get((date_str, slot.id), ())]
+
+    def open_seats(self, date_str: str, slot: TimeSlot) -> int:
+        """Seats of ``slot`` on ``date_str`` not already taken by pinned shifts."""
+        return max(0, slot.required_staff - len(self.pinned.get((date_str, slot.id), ())))
+
+    def optimality_gap(self) -> Optional[float]:
+        """Relative gap of the days so far, ``None`` once one was solved heuristically."""
+        if self.heuristic_days:
+            return None
+        if self.exact_cost <= 0:
+            return 0.0
+        return max(0.0, (self.exact_cost - self.exact_bound) / self.exact_cost)
+
+
 def _validate_shift_inputs(employees: Sequence[Employee], time_slots: Sequence[TimeSlot], start_date: str, end_date: str) -> None:
     """Validate inputs for shift generation."""
     if not employees:
@@ -275,7 +667,7 @@ def _filter_available_employees(
     employees: Sequence[Employee],
     date_str: str,
     slot: TimeSlot,
-    schedule: List[GeneratedShift],
+    state: _GenerationState,
 ) -> tuple[List[Employee], Dict[str, List[str]]]:
     """Filter employees available for a specific slot.
     
@@ -284,35 +676,86 @@ def _filter_available_employees(
     available: List[Employee] = []
     rejection_log: Dict[str, List[str]] = {}
     
-    for employee in employees:
-        if not _can_assign_to_area(employee, slot):
-            rejection_log.setdefault("担当エリアの要件を満たしていません", []).append(employee.name)
+    if state.candidates is not None:
+        static = state.candidates.get(employees, date_str, slot)
+    else:
+        static = _static_rejections(employees, date_str, slot, state.availability, state.skills)
+    for employee, area_reason, availability_reason in static:
+        if area_reason is not None:
+            rejection_log.setdefault(area_reason, []).append(employee.name)
             continue
         
         # Avoid double booking
-        conflict = any(
-            s.employee_id == employee.id and s.date == date_str and check_time_overlap(slot, s.time_slot)
-            for s in schedule
-        )
-        if conflict:
+        if state.occupancy.conflicts(date_str, employee.id, slot):
             rejection_log.setdefault("同日の別時間帯と重複しています", []).append(employee.name)
             continue
         
-        if not is_employee_available(employee, date_str, slot):
-            reason = describe_unavailability(employee, date_str, slot) or "勤務不可の設定があります"
-            rejection_log.setdefault(reason, []).append(employee.name)
+        if availability_reason is not None:
+            rejection_log.setdefault(availability_reason, []).append(employee.name)
             continue
         
+        if state.limits is not None:
+            limit_reason = state.limits.violation(employee.id, date_str, slot)
+            if limit_reason is not None:
+                rejection_log.setdefault(limit_reason, []).append(employee.name)
+                continue
+        
         available.append(employee)
     
     return available, rejection_log
 
 
+_StaticRejection = Tuple[Employee, Optional[str], Optional[str]]
+
+
+def _static_rejections(
+    employees: Sequence[Employee],
+    date_str: str,
+    slot: TimeSlot,
+    availability: AvailabilityIndex,
+    skills: Optional[_SkillMatrix],
+) -> List[_StaticRejection]:
+    """Area and availability rejection reasons (``None`` if passed) per employee.
+
+    Unlike double booking these do not depend on the schedule being built.
+    """
+    can_assign = skills.can_assign if skills is not None else _can_assign_to_area
+    rows: List[_StaticRejection] = []
+    for employee in employees:
+        if not can_assign(employee, slot):
+            rows.append((employee, "担当エリアの要件を満たしていません", None))
+        elif not availability.is_available(employee, date_str, slot):
+            reason = availability.describe(employee, date_str, slot) or "勤務不可の設定があります"
+            rows.append((employee, None, reason))
+        else:
+            rows.append((employee, None, None))
+    return rows
+
+
+class _SlotCandidates:
+    """Memo of :func:`_static_rejections` per (date, slot), shareable between runs
+    over the same employees, availability and skill matrix."""
+
+    def __init__(self, availability: AvailabilityIndex, skills: Optional[_SkillMatrix]) -> None:
+        self.availability = availability
+        self.skills = skills
+        self._memo: Dict[Tuple[str, str], List[_StaticRejection]] = {}
+
+    def get(self, employees: Sequence[Employee], date_str: str, slot: TimeSlot) -> List[_StaticRejection]:
+        key = (date_str, slot.id)
+        rows = self._memo.get(key)
+        if rows is None:
+            rows = _static_rejections(employees, date_str, slot, self.availability, self.skills)
+            self._memo[key] = rows
+        return rows
+
+
 def _create_insufficient_staff_error(
     date_str: str,
     slot: TimeSlot,
     available: List[Employee],
     rejection_log: Dict[str, List[str]],
+    pinned: int = 0,
 ) -> ShiftGenerationIssue:
     """Create error for insufficient staff situation."""
     rejections = [
@@ -335,13 +778,20 @@ def _create_insufficient_staff_error(
         time_slot_id=slot.id,
         time_slot_name=slot.display_name,
         required=slot.required_staff,
-        available=len(available),
-        shortage=slot.required_staff - len(available),
+        available=pinned + len(available),
+        shortage=slot.required_staff - pinned - len(available),
         available_employees=[emp.name for emp in available],
         rejections=rejections,
     )
 
 
+def _lacks_lead(candidates: Sequence[Employee], slot: TimeSlot) -> bool:
+    """Return ``True`` if ``candidates`` for a rehab slot include no TYPE_A/C lead."""
+    if not get_area_registry().has_pairing(slot.area):
+        return False
+    return all(_requires_pairing(e, slot) for e in candidates)
+
+
 def _assign_employees_to_slot(
     available: List[Employee],
     slot: TimeSlot,
@@ -349,9 +799,23 @@ def _assign_employees_to_slot(
     optimisation_mode: str,
     work_count: Dict[int, int],
     morning_workers: List[int],
+    required: Optional[int] = None,
+    skills: Optional[_SkillMatrix] = None,
+    pinned: Sequence[Employee] = (),
+    occupancy: Optional[ShiftOccupancy] = None,
 ) -> List[Employee]:
-    """Assign employees to a time slot, preferring full-day workers for afternoon slots."""
-    required = slot.required_staff
+    """Assign employees to a time slot, preferring full-day workers for afternoon slots.
+
+    ``pinned`` employees already hold seats in the slot; ``required`` then
+    counts only the open seats, and the pinned staff count towards the
+    TYPE_D pairing rule. ``occupancy`` enables the consecutive-day and
+    continuity terms of the scoring weights.
+    """
+    if required is None:
+        required = slot.required_staff
+    context = (
+        _SelectionContext(date_str, occupancy, morning_workers) if occupancy is not None else None
+    )
     selected: List[Employee] = []
     
     # For afternoon slots, prefer employees who worked in the morning
@@ -359,14 +823,21 @@ def _assign_employees_to_slot(
         afternoon_capable = [e for e in available if e.id in morning_workers]
         if afternoon_capable:
             needed = min(len(afternoon_capable), required)
-            selected = _select_employees_for_slot(afternoon_capable, slot, needed, work_count, optimisation_mode)
+            if _lacks_lead([*pinned, *afternoon_capable], slot):
+                # Leave the last seat to the fill phase so a lead can take it
+                needed = min(needed, required - 1)
+            selected = _select_employees_for_slot(
+                afternoon_capable, slot, needed, work_count, optimisation_mode, pinned, skills,
+                context,
+            )
     
     # Fill remaining slots
     if len(selected) < required:
         remaining_available = [e for e in available if e not in selected]
         additional_needed = required - len(selected)
         additional = _select_employees_for_slot(
-            remaining_available, slot, additional_needed, work_count, optimisation_mode
+            remaining_available, slot, additional_needed, work_count, optimisation_mode,
+            [*pinned, *selected], skills, context,
         )
         selected.extend(additional)
     
@@ -377,24 +848,31 @@ def _process_time_slot(
     slot: TimeSlot,
     date_str: str,
     employees: Sequence[Employee],
-    schedule: List[GeneratedShift],
-    work_count: Dict[int, int],
+    state: _GenerationState,
     optimisation_mode: str,
     morning_workers: List[int],
 ) -> List[GeneratedShift]:
     """Process a single time slot and return generated shifts."""
-    available, rejection_log = _filter_available_employees(employees, date_str, slot, schedule)
+    seats = state.open_seats(date_str, slot)
+    if seats == 0:
+        return []
+    pinned = state.pinned_members(date_str, slot)
+    available, rejection_log = _filter_available_employees(employees, date_str, slot, state)
+    if state.rng is not None:
+        # Selectors break ties by candidate order; shuffling re-seeds the ties.
+        state.rng.shuffle(available)
     
-    if len(available) < slot.required_staff:
-        raise ShiftGenerationError(
-            _create_insufficient_staff_error(date_str, slot, available, rejection_log)
+    if len(available) < seats:
+        state.fail(
+            _create_insufficient_staff_error(date_str, slot, available, rejection_log, len(pinned))
         )
     
     selected = _assign_employees_to_slot(
-        available, slot, date_str, optimisation_mode, work_count, morning_workers
+        available, slot, date_str, optimisation_mode, state.work_count, morning_workers,
+        min(seats, len(available)), state.skills, pinned, state.occupancy,
     )
     
-    if len(selected) < slot.required_staff:
+    if len(selected) < min(seats, len(available)):
         issue = ShiftGenerationIssue(
             code="selection_failed",
             message=(
@@ -406,53 +884,51 @@ def _process_time_slot(
             time_slot_name=slot.display_name,
             required=slot.required_staff,
             available=len(available),
-            shortage=slot.required_staff - len(selected),
+            shortage=seats - len(selected),
             available_employees=[emp.name for emp in available],
         )
-        raise ShiftGenerationError(issue)
-    
-    shifts = []
-    for employee in selected:
-        shift = GeneratedShift(
-            date=date_str,
-            time_slot_id=slot.id,
-            employee_id=employee.id,
-            employee_name=employee.name,
-            time_slot_name=slot.display_name,
-            start_time=slot.start_time,
-            end_time=slot.end_time,
-            skill_score=calculate_skill_score(employee, slot),
-            employee=employee,
-            time_slot=slot,
-        )
-        shifts.append(shift)
-        work_count[employee.id] += 1
+        state.fail(issue)
     
-    return shifts
+    return [_build_shift(date_str, slot, employee) for employee in selected]
 
 
-def _process_daily_slots(
+def _build_shift(date_str: str, slot: TimeSlot, employee: Employee) -> GeneratedShift:
+    return GeneratedShift(
+        date=date_str,
+        time_slot_id=slot.id,
+        employee_id=employee.id,
+        employee_name=employee.name,
+        time_slot_name=slot.display_name,
+        start_time=slot.start_time,
+        end_time=slot.end_time,
+        skill_score=calculate_skill_score(employee, slot),
+        employee=employee,
+        time_slot=slot,
+    )
+
+
+def _greedy_day(
     date_str: str,
     daily_slots: List[TimeSlot],
     employees: Sequence[Employee],
-    schedule: List[GeneratedShift],
-    work_count: Dict[int, int],
+    state: _GenerationState,
     optimisation_mode: str,
     time_slots: Sequence[TimeSlot],
 ) -> List[GeneratedShift]:
-    """Process all slots for a single day and return generated shifts."""
+    """Fill the day's slots in a single greedy pass."""
     morning_slots = [s for s in daily_slots if s.period == "morning"]
     afternoon_slots = [s for s in daily_slots if s.period == "afternoon"]
     
     morning_workers_by_area: Dict[str, List[int]] = {}
+    for shift in state.pinned_by_date.get(date_str, ()):
+        if shift.time_slot.period == "morning":
+            morning_workers_by_area.setdefault(shift.time_slot.area, []).append(shift.employee_id)
     daily_assignments: List[GeneratedShift] = []
 
     # Process morning slots
     for slot in morning_slots:
-        shifts = _process_time_slot(
-            slot, date_str, employees, schedule, work_count, optimisation_mode, []
-        )
-        schedule.extend(shifts)
+        shifts = _process_time_slot(slot, date_str, employees, state, optimisation_mode, [])
+        state.commit(shifts)
         daily_assignments.extend(shifts)
         # Track morning workers by area
         for shift in shifts:
@@ -462,82 +938,758 @@ def _process_daily_slots(
     for slot in afternoon_slots:
         morning_workers = morning_workers_by_area.get(slot.area, [])
         shifts = _process_time_slot(
-            slot, date_str, employees, schedule, work_count, optimisation_mode, morning_workers
+            slot, date_str, employees, state, optimisation_mode, morning_workers
         )
-        schedule.extend(shifts)
+        state.commit(shifts)
         daily_assignments.extend(shifts)
 
     # Validate part-time rule for the day
     if daily_assignments:
         violation = _evaluate_part_time_rule(daily_assignments, time_slots)
         if violation:
-            raise ShiftGenerationError(violation)
+            state.fail(violation)
     
     return daily_assignments
 
 
-def generate_shifts(
+class _Deadline:
+    """Wall-clock limit and cancellation token of an anytime run.
+
+    ``cancel`` is anything with an ``is_set()`` method, e.g. a
+    :class:`threading.Event`. Worker processes only receive the absolute
+    time limit; cancellation is honoured by the parent between starts.
+    """
+
+    def __init__(self, at: Optional[float] = None, cancel=None) -> None:
+        self.at = at
+        self.cancel = cancel
+        self.reason: Optional[str] = None
+
+    def expired(self) -> bool:
+        if self.reason is None:
+            if self.cancel is not None and self.cancel.is_set():
+                self.reason = "cancelled"
+            elif self.at is not None and time.time() >= self.at:
+                self.reason = "timeout"
+        return self.reason is not None
+
+    def for_worker(self) -> "_Deadline":
+        return _Deadline(self.at)
+
+
+class _SearchBudget:
+    """Counts down the candidate selections a backtracking search may try."""
+
+    def __init__(self, nodes: int) -> None:
+        self.nodes = nodes
+
+    def spend(self) -> bool:
+        self.nodes -= 1
+        return self.nodes >= 0
+
+
+def _morning_workers(day_shifts: Sequence[GeneratedShift], area: str) -> List[int]:
+    return [s.employee_id for s in day_shifts if s.time_slot.period == "morning" and s.time_slot.area == area]
+
+
+def _candidate_selections(
+    available: List[Employee],
+    slot: TimeSlot,
+    date_str: str,
+    state: _GenerationState,
+    optimisation_mode: str,
+    morning_workers: List[int],
+) -> Iterator[Tuple[Employee, ...]]:
+    """Yield the greedy choice first, then every other selection by work count."""
+    seats = state.open_seats(date_str, slot)
+    greedy = tuple(
+        _assign_employees_to_slot(
+            available, slot, date_str, optimisation_mode, state.work_count, morning_workers,
+            seats, state.skills, state.pinned_members(date_str, slot), state.occupancy,
+        )
+    )
+    if len(greedy) == seats:
+        yield greedy
+    greedy_ids = {e.id for e in greedy}
+    ranked = sorted(available, key=lambda e: (state.work_count[e.id], e.id not in morning_workers))
+    for selection in combinations(ranked, seats):
+        if {e.id for e in selection} != greedy_ids:
+            yield selection
+
+
+def _remaining_slots_feasible(
+    date_str: str,
+    slots: Sequence[TimeSlot],
+    employees: Sequence[Employee],
+    state: _GenerationState,
+) -> bool:
+    """Forward check: every open slot, and every group of slots sharing the
+    same hours, still has enough distinct candidates."""
+    groups: Dict[Tuple[int, int], Tuple[set, int]] = {}
+    for slot in slots:
+        seats = state.open_seats(date_str, slot)
+        if seats == 0:
+            continue
+        available, _ = _filter_available_employees(employees, date_str, slot, state)
+        if len(available) < seats:
+            return False
+        if _lacks_lead([*state.pinned_members(date_str, slot), *available], slot):
+            return False
+        pool, demand = groups.get(_slot_interval(slot), (set(), 0))
+        pool.update(e.id for e in available)
+        groups[_slot_interval(slot)] = (pool, demand + seats)
+    return all(len(pool) >= demand for pool, demand in groups.values())
+
+
+def _backtrack_day(
+    date_str: str,
+    slots: Sequence[TimeSlot],
+    employees: Sequence[Employee],
+    state: _GenerationState,
+    optimisation_mode: str,
+    day_shifts: List[GeneratedShift],
+    budget: _SearchBudget,
+) -> Optional[List[GeneratedShift]]:
+    """Depth-first search over the day's slots with forward checking."""
+    if not slots:
+        return day_shifts
+    slot, remaining = slots[0], slots[1:]
+    if state.open_seats(date_str, slot) == 0:
+        return _backtrack_day(
+            date_str, remaining, employees, state, optimisation_mode, day_shifts, budget
+        )
+    pinned = state.pinned_members(date_str, slot)
+    available, _ = _filter_available_employees(employees, date_str, slot, state)
+    morning_workers = _morning_workers(
+        [*state.pinned_by_date.get(date_str, ()), *day_shifts], slot.area
+    )
+
+    for selection in _candidate_selections(
+        available, slot, date_str, state, optimisation_mode, morning_workers
+    ):
+        if not budget.spend():
+            return None
+        if _violates_pairing([*pinned, *selection], slot):
+            continue
+        shifts = [_build_shift(date_str, slot, employee) for employee in selection]
+        checkpoint = len(state.schedule)
+        state.commit(shifts)
+        if _remaining_slots_feasible(date_str, remaining, employees, state):
+            found = _backtrack_day(
+                date_str, remaining, employees, state, optimisation_mode,
+                day_shifts + shifts, budget,
+            )
+            if found is not None:
+                return found
+        state.rollback(checkpoint)
+    return None
+
+
+def _exact_day(
+    date_str: str,
+    daily_slots: List[TimeSlot],
+    employees: Sequence[Employee],
+    state: _GenerationState,
+) -> Optional[List[GeneratedShift]]:
+    """Solve the day with :func:`~shift_scheduler.exact.solve_day`.
+
+    Returns the committed shifts, or ``None`` if no selection satisfying
+    every slot was found within the node budget, leaving the day to the
+    heuristic path and its reporting.
+    The work limits are checked per seat; a solution that only breaks them
+    in combination (e.g. two slots of the same day past the weekly hours)
+    is dropped the same way.
+    """
+    ordered = [s for s in daily_slots if s.period == "morning"] + [
+        s for s in daily_slots if s.period != "morning"
+    ]
+    registry = get_area_registry()
+    slots: List[TimeSlot] = []
+    problems: List[SlotProblem] = []
+    for slot in ordered:
+        seats = state.open_seats(date_str, slot)
+        if seats == 0:
+            continue
+        pinned = state.pinned_members(date_str, slot)
+        available, _ = _filter_available_employees(employees, date_str, slot, state)
+        scores = state.skills.column(available, slot)
+        candidates = [
+            Candidate(
+                key=employee.id,
+                score=float(score),
+                work=state.work_count.get(employee.id, 0),
+                lead=registry.is_lead(employee, slot),
+                paired=_requires_pairing(employee, slot),
+            )
+            for employee, score in zip(available, scores)
+        ]
+        slots.append(slot)
+        problems.append(SlotProblem(
+            seats=seats,
+            target=_slot_target(slot),
+            interval=_slot_interval(slot),
+            candidates=candidates,
+            base_score=float(state.skills.column(pinned, slot).sum()),
+            pairing=registry.has_pairing(slot.area),
+            has_lead=any(registry.is_lead(e, slot) for e in pinned),
+            has_paired=any(_requires_pairing(e, slot) for e in pinned),
+        ))
+
+    solution = solve_day(
+        problems, fairness_weight=_EXACT_FAIRNESS_WEIGHT, node_limit=_EXACT_NODE_LIMIT
+    )
+    if solution is None:
+        return None
+    by_id = {employee.id: employee for employee in employees}
+    shifts = [
+        _build_shift(date_str, slot, by_id[emp_id])
+        for slot, selection in zip(slots, solution.selections)
+        for emp_id in selection
+    ]
+    checkpoint = len(state.schedule)
+    for shift in shifts:
+        if state.limits is not None and state.limits.violation(shift.employee_id, date_str, shift.time_slot):
+            state.rollback(checkpoint)
+            return None
+        state.commit([shift])
+    state.exact_cost += solution.cost
+    state.exact_bound += solution.lower_bound
+    return shifts
+
+
+def _process_daily_slots(
+    date_str: str,
+    daily_slots: List[TimeSlot],
+    employees: Sequence[Employee],
+    state: _GenerationState,
+    optimisation_mode: str,
+    time_slots: Sequence[TimeSlot],
+) -> List[GeneratedShift]:
+    """Process all slots for a single day and return generated shifts.
+
+    When the greedy pass dead-ends (a later slot is starved or the TYPE_D
+    pairing rule fails), the day is re-solved by bounded backtracking before
+    the failure is reported. ``"exact"`` solves the day by branch-and-bound
+    and only falls back to the ``"balance"`` heuristic, recording the date,
+    when it finds no selection.
+    """
+    if optimisation_mode == "exact":
+        shifts = _exact_day(date_str, daily_slots, employees, state)
+        if shifts is not None:
+            return shifts
+        state.heuristic_days.append(date_str)
+        optimisation_mode = "balance"
+    checkpoint = len(state.schedule)
+    report, state.report = state.report, None
+    try:
+        return _greedy_day(date_str, daily_slots, employees, state, optimisation_mode, time_slots)
+    except ShiftGenerationError:
+        state.rollback(checkpoint)
+        ordered = [s for s in daily_slots if s.period == "morning"] + [
+            s for s in daily_slots if s.period != "morning"
+        ]
+        found = _backtrack_day(
+            date_str, ordered, employees, state, optimisation_mode, [],
+            _SearchBudget(_BACKTRACK_NODE_LIMIT),
+        )
+        if found is not None:
+            return found
+        if report is None:
+            raise
+    finally:
+        state.report = report
+    return _greedy_day(date_str, daily_slots, employees, state, optimisation_mode, time_slots)
+
+
+def _start_rng(seed: Optional[int], start: int) -> Optional[random.Random]:
+    """Tie-break generator for multi-start run ``start``; start 0 stays deterministic."""
+    if start == 0:
+        return None
+    return random.Random(f"{seed}:{start}")
+
+
+def _locked_shifts(
+    locked: Iterable[Tuple[str, str, int]],
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+) -> List[GeneratedShift]:
+    """Resolve locked ``(date, time_slot_id, employee_id)`` tuples into shifts."""
+    employees_by_id = {employee.id: employee for employee in employees}
+    slots_by_id = {slot.id: slot for slot in time_slots}
+    shifts: List[GeneratedShift] = []
+    for date_str, slot_id, employee_id in locked:
+        employee = employees_by_id.get(employee_id)
+        slot = slots_by_id.get(slot_id)
+        if employee is None or slot is None:
+            raise ShiftGenerationError(
+                ShiftGenerationIssue(
+                    code="invalid_lock",
+                    message=f"{date_str}の固定シフトに存在しない職員または時間帯が指定されています。",
+                    date=date_str,
+                    time_slot_id=slot_id,
+                )
+            )
+        shifts.append(_build_shift(date_str, slot, employee))
+    return shifts
+
+
+def _merge_pinned(*groups: Sequence[GeneratedShift]) -> List[GeneratedShift]:
+    seen = set()
+    merged: List[GeneratedShift] = []
+    for shift in (shift for group in groups for shift in group):
+        key = (shift.date, shift.time_slot_id, shift.employee_id)
+        if key not in seen:
+            seen.add(key)
+            merged.append(shift)
+    return merged
+
+
+def _new_state(
     employees: Sequence[Employee],
     time_slots: Sequence[TimeSlot],
     start_date: str,
     end_date: str,
-    *,
-    optimisation_mode: str = "balance",
-) -> List[GeneratedShift]:
-    _validate_shift_inputs(employees, time_slots, start_date, end_date)
+    availability: AvailabilityIndex,
+    report: Optional[GenerationReport],
+    rng: Optional[random.Random] = None,
+    initial_shifts: Sequence[GeneratedShift] = (),
+    carry_over_work_count: Optional[Dict[int, int]] = None,
+    candidates: Optional[_SlotCandidates] = None,
+    limits: Optional[WorkLimits] = None,
+) -> _GenerationState:
+    """Build the state of one run with the in-range ``initial_shifts`` pinned.
+
+    ``candidates`` shares the skill matrix and the schedule-independent
+    candidate filtering with other runs over the same inputs. ``limits``
+    sets up the work limit counters; pinned shifts count towards them.
+    """
+    carry_over = carry_over_work_count or {}
+    if candidates is None:
+        candidates = _SlotCandidates(availability, _SkillMatrix(employees, time_slots))
+    state = _GenerationState(
+        availability=availability,
+        work_count={emp.id: carry_over.get(emp.id, 0) for emp in employees},
+        report=report,
+        rng=rng,
+        skills=candidates.skills,
+        candidates=candidates,
+        limits=(
+            _WorkLimitCounters(limits, employees, availability.patterns())
+            if limits is not None else None
+        ),
+        stats=RosterStatistics(employees),
+    )
+    state.pin([shift for shift in initial_shifts if start_date <= shift.date <= end_date])
+    return state
+
 
+def _iter_days(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    optimisation_mode: str,
+    state: _GenerationState,
+    deadline: Optional[_Deadline] = None,
+) -> Iterator[Tuple[str, List[GeneratedShift]]]:
+    """Solve the horizon day by day, yielding each date with its shifts.
+
+    A day's shifts include the pinned shifts of that date. ``deadline`` is
+    checked before each day; once it expires no further days are solved.
+    In ``"exact"`` mode the optimality gap of the solved days is recorded
+    on the state's report at the end.
+    """
     start = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
 
-    schedule: List[GeneratedShift] = []
-    work_count: Dict[int, int] = {emp.id: 0 for emp in employees}
-
     all_slots_by_day: Dict[int, List[TimeSlot]] = {}
     for slot in time_slots:
         all_slots_by_day.setdefault(slot.day_of_week, []).append(slot)
 
     current = start
     while current <= end:
+        if deadline is not None and deadline.expired():
+            break
         date_str = current.strftime("%Y-%m-%d")
         weekday = current.weekday()
         daily_slots = all_slots_by_day.get(weekday, [])
 
-        _process_daily_slots(
-            date_str, daily_slots, employees, schedule, work_count, optimisation_mode, time_slots
+        day_shifts = _process_daily_slots(
+            date_str, daily_slots, employees, state, optimisation_mode, time_slots
         )
+        yield date_str, [*state.pinned_by_date.get(date_str, ()), *day_shifts]
 
         current += timedelta(days=1)
 
-    return schedule
+    if optimisation_mode == "exact" and state.report is not None:
+        state.report.optimality_gap = state.optimality_gap()
+        state.report.heuristic_days = list(state.heuristic_days)
+
+
+def _run_start(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    optimisation_mode: str,
+    availability: AvailabilityIndex,
+    report: Optional[GenerationReport],
+    rng: Optional[random.Random],
+    initial_shifts: Sequence[GeneratedShift] = (),
+    carry_over_work_count: Optional[Dict[int, int]] = None,
+    deadline: Optional[_Deadline] = None,
+    on_day: Optional[Callable[[float, RosterStatistics], None]] = None,
+    candidates: Optional[_SlotCandidates] = None,
+    limits: Optional[WorkLimits] = None,
+) -> List[GeneratedShift]:
+    """Run one greedy construction over the whole horizon.
+
+    ``deadline`` is checked before each day; once it expires the days built
+    so far are returned. ``on_day`` receives the fraction of days done and
+    the running statistics of the schedule after every day. ``candidates``
+    and ``limits`` are passed on to :func:`_new_state`.
+    """
+    return _build_start(
+        employees, time_slots, start_date, end_date, optimisation_mode, availability,
+        report, rng, initial_shifts, carry_over_work_count, deadline, on_day,
+        candidates, limits,
+    ).schedule
+
+
+def _build_start(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    optimisation_mode: str,
+    availability: AvailabilityIndex,
+    report: Optional[GenerationReport],
+    rng: Optional[random.Random],
+    initial_shifts: Sequence[GeneratedShift] = (),
+    carry_over_work_count: Optional[Dict[int, int]] = None,
+    deadline: Optional[_Deadline] = None,
+    on_day: Optional[Callable[[float, RosterStatistics], None]] = None,
+    candidates: Optional[_SlotCandidates] = None,
+    limits: Optional[WorkLimits] = None,
+) -> _GenerationState:
+    """:func:`_run_start` returning the whole state, statistics included."""
+    state = _new_state(
+        employees, time_slots, start_date, end_date, availability, report, rng,
+        initial_shifts, carry_over_work_count, candidates, limits,
+    )
+    total_days = (
+        datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")
+    ).days + 1
+    days = _iter_days(
+        employees, time_slots, start_date, end_date, optimisation_mode, state, deadline
+    )
+    for done, _ in enumerate(days, 1):
+        if on_day is not None:
+            on_day(done / total_days, state.stats)
+
+    return state
+
+
+@dataclass
+class _StartOutcome:
+    """Result of one multi-start run, small enough to ship back from a worker."""
+
+    start: int
+    shifts: List[GeneratedShift] = field(default_factory=list)
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+    error: Optional[ShiftGenerationIssue] = None
+    score: float = 0.0
+    complete: bool = True
+
+    def rank(self) -> Tuple[bool, int, float, int]:
+        return not self.complete, len(self.issues), self.score, self.start
+
+
+def _solve_start(
+    payload: Tuple,
+    on_day: Optional[Callable[[float, RosterStatistics], None]] = None,
+) -> _StartOutcome:
+    """Process-pool entry point: run start ``payload[-1]`` and score it."""
+    (employees, time_slots, start_date, end_date, mode, availability, collect,
+     initial_shifts, carry_over, seed, deadline, limits, start) = payload
+    report = GenerationReport() if collect else None
+    outcome = _StartOutcome(start=start)
+    try:
+        state = _build_start(
+            employees, time_slots, start_date, end_date, mode, availability, report,
+            _start_rng(seed, start), initial_shifts, carry_over, deadline, on_day,
+            limits=limits,
+        )
+    except ShiftGenerationError as exc:
+        outcome.error = exc.issue
+        return outcome
+    outcome.shifts = state.schedule
+    outcome.issues = report.issues if report is not None else []
+    outcome.score = state.stats.score()
+    outcome.complete = deadline.reason is None
+    return outcome
+
+
+class _StartProgress:
+    """Turns day and start completions into ``on_progress`` calls."""
+
+    def __init__(self, starts: int, on_progress: Optional[ProgressCallback]) -> None:
+        self.starts = starts
+        self.on_progress = on_progress
+        self.done = 0
+        self.best: Optional[float] = None
+
+    def on_day(self, fraction: float, stats: RosterStatistics) -> None:
+        if self.on_progress is not None:
+            self.on_progress((self.done + fraction) / self.starts, self.best)
+
+    def finished(self, outcome: _StartOutcome) -> None:
+        self.done += 1
+        if outcome.error is None and outcome.complete:
+            self.best = outcome.score if self.best is None else min(self.best, outcome.score)
+        if self.on_progress is not None:
+            self.on_progress(self.done / self.starts, self.best)
+
+
+def _best_of_starts(
+    payloads: List[Tuple],
+    workers: int,
+    deadline: _Deadline,
+    progress: _StartProgress,
+) -> List[_StartOutcome]:
+    """Run the starts until all finish or ``deadline`` expires, in start order."""
+    outcomes: List[_StartOutcome] = []
+    if workers <= 1:
+        for payload in payloads:
+            if deadline.expired():
+                break
+            outcomes.append(_solve_start(payload, progress.on_day))
+            progress.finished(outcomes[-1])
+        return outcomes
+
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(payloads)),
+        initializer=set_area_registry,
+        initargs=(get_area_registry(),),
+    )
+    pending = {pool.submit(_solve_start, payload) for payload in payloads}
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=_POLL_INTERVAL_S, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes.append(future.result())
+                progress.finished(outcomes[-1])
+            if pending and deadline.expired():
+                break
+    finally:
+        # Starts still running honour the time limit themselves; do not wait on them.
+        pool.shutdown(wait=not pending, cancel_futures=True)
+    return sorted(outcomes, key=lambda outcome: outcome.start)
+
+
+def generate_shifts(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    *,
+    optimisation_mode: OptimisationMode = "balance",
+    availability: Optional[AvailabilityIndex] = None,
+    report: Optional[GenerationReport] = None,
+    n_starts: int = 1,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    initial_shifts: Sequence[GeneratedShift] = (),
+    carry_over_work_count: Optional[Dict[int, int]] = None,
+    locked: Iterable[Tuple[str, str, int]] = (),
+    time_limit_s: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel=None,
+    limits: Optional[WorkLimits] = None,
+) -> List[GeneratedShift]:
+    """Generate a roster for ``start_date``–``end_date``.
+
+    ``availability`` may be supplied to reuse pre-loaded absences and
+    employment patterns; otherwise they are bulk-loaded once for the range.
+
+    By default the first slot that cannot be filled raises
+    :class:`ShiftGenerationError`. When ``report`` is given, every issue is
+    appended to it instead and the (possibly partial) roster is returned.
+
+    With ``n_starts > 1`` the construction is repeated with ties between
+    equally ranked candidates broken in a different seeded order per start
+    (start 0 keeps the deterministic employee order), spread over up to
+    ``workers`` processes. The roster with the fewest issues and then the
+    lowest :func:`score_roster` wins; the error of start 0 is raised only
+    when every start fails.
+
+    Warm start: ``initial_shifts`` inside the range are kept as pinned
+    assignments (they occupy their employees and seats, and only the
+    remaining open seats are filled) and are included in the returned
+    roster. ``carry_over_work_count`` seeds the per-employee work counts,
+    e.g. with the previous period's totals, so fairness spans periods.
+
+    ``locked`` ``(date, time_slot_id, employee_id)`` tuples are pinned the
+    same way, e.g. a trainee hand-placed next to a mentor.
+
+    Anytime use: generation stops once ``time_limit_s`` seconds have passed
+    or ``cancel.is_set()`` returns ``True`` (checked between days) and
+    returns the best roster found so far — the best finished start, or
+    else the days built before the stop. ``report.stopped`` then records
+    why. ``on_progress(fraction, best_score)`` is called after every day
+    of a single start and after every finished start, with the lowest
+    :func:`score_roster` so far (``None`` until a start has finished).
+
+    ``optimisation_mode`` is ``"balance"``, ``"skill"``, ``"days"``,
+    ``"exact"`` or custom :class:`~shift_scheduler.scoring.ScoringWeights`
+    for the per-candidate score of the greedy selection.
+
+    ``optimisation_mode="exact"`` solves every day by branch-and-bound over
+    the slots' skill deviations from their targets and the work-count
+    spread (see :mod:`shift_scheduler.exact`); it is deterministic, so
+    ``n_starts`` is ignored, and ``report.optimality_gap`` receives the
+    proven gap. Meant for small instances: each day stops after a fixed
+    node budget with the best selection found, and a day without any is
+    built by ``"balance"`` and listed in ``report.heuristic_days``.
+
+    ``limits`` enforces :class:`WorkLimits` (consecutive days, weekly
+    hours) as hard rules: a candidate who would break one is rejected like
+    an unavailable one, with the limit as the reason.
+    """
+    _validate_shift_inputs(employees, time_slots, start_date, end_date)
+    if availability is None:
+        availability = AvailabilityIndex.load(start_date, end_date)
+    if locked:
+        initial_shifts = _merge_pinned(initial_shifts, _locked_shifts(locked, employees, time_slots))
+    deadline = _Deadline(None if time_limit_s is None else time.time() + time_limit_s, cancel)
+
+    if n_starts <= 1 or optimisation_mode == "exact":
+        on_day = None
+        if on_progress is not None:
+            def on_day(fraction: float, stats: RosterStatistics) -> None:
+                on_progress(fraction, stats.score())
+        shifts = _run_start(
+            employees, time_slots, start_date, end_date, optimisation_mode,
+            availability, report, None, initial_shifts, carry_over_work_count,
+            deadline, on_day, limits=limits,
+        )
+        if report is not None:
+            report.stopped = deadline.reason
+        return shifts
+
+    worker_deadline = deadline if workers <= 1 else deadline.for_worker()
+    payloads = [
+        (list(employees), list(time_slots), start_date, end_date, optimisation_mode,
+         availability, report is not None, list(initial_shifts), carry_over_work_count,
+         seed, worker_deadline, limits, start)
+        for start in range(n_starts)
+    ]
+    outcomes = _best_of_starts(payloads, workers, deadline, _StartProgress(n_starts, on_progress))
+    if report is not None:
+        # A worker may hit the time limit just before the parent notices it.
+        cut_short = not all(outcome.complete for outcome in outcomes)
+        report.stopped = deadline.reason or ("timeout" if cut_short else None)
+    succeeded = [outcome for outcome in outcomes if outcome.error is None]
+    if not outcomes:
+        return []
+    if not succeeded:
+        raise ShiftGenerationError(outcomes[0].error)
+
+    best = min(succeeded, key=_StartOutcome.rank)
+    if report is not None:
+        report.issues.extend(best.issues)
+    return best.shifts
+
+
+def _stream_days(
+    days: Iterator[Tuple[str, List[GeneratedShift]]],
+    report: Optional[GenerationReport],
+    deadline: _Deadline,
+) -> Iterator[List[GeneratedShift]]:
+    for _, day_shifts in days:
+        yield day_shifts
+    if report is not None:
+        report.stopped = deadline.reason
+
+
+def generate_shifts_iter(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    *,
+    optimisation_mode: OptimisationMode = "balance",
+    availability: Optional[AvailabilityIndex] = None,
+    report: Optional[GenerationReport] = None,
+    initial_shifts: Sequence[GeneratedShift] = (),
+    carry_over_work_count: Optional[Dict[int, int]] = None,
+    locked: Iterable[Tuple[str, str, int]] = (),
+    time_limit_s: Optional[float] = None,
+    cancel=None,
+    limits: Optional[WorkLimits] = None,
+) -> Iterator[List[GeneratedShift]]:
+    """Yield the roster of ``start_date``–``end_date`` one day at a time.
+
+    Each item is the list of shifts of the next date (empty on days without
+    slots, pinned shifts included), produced as soon as that day is solved,
+    so callers can persist or render day N while day N+1 is computed. The
+    arguments mean the same as for :func:`generate_shifts` with a single
+    start; inputs are validated immediately, while a
+    :class:`ShiftGenerationError` is raised from the iteration of the day
+    that cannot be staffed.
+    """
+    _validate_shift_inputs(employees, time_slots, start_date, end_date)
+    if availability is None:
+        availability = AvailabilityIndex.load(start_date, end_date)
+    if locked:
+        initial_shifts = _merge_pinned(initial_shifts, _locked_shifts(locked, employees, time_slots))
+    deadline = _Deadline(None if time_limit_s is None else time.time() + time_limit_s, cancel)
+    state = _new_state(
+        employees, time_slots, start_date, end_date, availability, report,
+        initial_shifts=initial_shifts, carry_over_work_count=carry_over_work_count,
+        limits=limits,
+    )
+    days = _iter_days(
+        employees, time_slots, start_date, end_date, optimisation_mode, state, deadline
+    )
+    return _stream_days(days, report, deadline)
 
 
 def calculate_skill_balance(shifts: Sequence[GeneratedShift], time_slots: Sequence[TimeSlot]) -> Dict[str, float]:
     """スキルバランスの統計を計算する。
     
-    各時間帯のスキル合計を計算し、その平均値と標準偏差を算出する。
+    日付×時間帯ごとのスキル合計を計算し、その平均値と標準偏差を算出する。
     標準偏差が小さいほど、日によるスキル能力の偏りが少なく、
     安定したサービス品質が提供できることを示す。
+    生成中は同じ値を ``RosterStatistics.skill_balance()`` で逐次参照できる。
     """
-    if not shifts:
-        return {"avg_skill": 0.0, "std_skill": 0.0, "min_skill": 0.0, "max_skill": 0.0}
+    return RosterStatistics(shifts=shifts).skill_balance()
+
 
-    slot_totals: Dict[str, int] = {}
+def score_roster(
+    shifts: Sequence[GeneratedShift],
+    employees: Sequence[Employee],
+    *,
+    fairness_weight: float = 10.0,
+) -> float:
+    """Combined quality score of a roster; lower is better.
+
+    The score is the standard deviation of the skill totals of every
+    ``(date, time slot)`` plus ``fairness_weight`` times the standard
+    deviation of the employees' work counts.
+    """
+    slot_totals: Dict[Tuple[str, str], int] = {}
+    work_count: Dict[int, int] = {emp.id: 0 for emp in employees}
     for shift in shifts:
-        slot_totals.setdefault(shift.time_slot_id, 0)
-        slot_totals[shift.time_slot_id] += shift.skill_score
-
-    if not slot_totals:
-        return {"avg_skill": 0.0, "std_skill": 0.0, "min_skill": 0.0, "max_skill": 0.0}
-
-    scores = list(slot_totals.values())
-    average = sum(scores) / len(scores)
-    variance = sum((score - average) ** 2 for score in scores) / len(scores)
-    std_dev = variance ** 0.5
-
-    return {
-        "avg_skill": average,
-        "std_skill": std_dev,
-        "min_skill": float(min(scores)),
-        "max_skill": float(max(scores)),
-        "balance_score": (std_dev / average) if average > 0 else 0.0,
-    }
+        key = (shift.date, shift.time_slot_id)
+        slot_totals[key] = slot_totals.get(key, 0) + shift.skill_score
+        work_count[shift.employee_id] = work_count.get(shift.employee_id, 0) + 1
+    return _std(slot_totals.values()) + fairness_weight * _std(work_count.values())
+
+
+def _std(values: Iterable[float]) -> float:
+    values = list(values)
+    if not values:
+        return 0.0
+    average = sum(values) / len(values)
+    return (sum((value - average) ** 2 for value in values) / len(values)) ** 0.5
@@ -0,0 +1,198 @@
+"""Pareto front of rosters over skill evenness and work fairness.
+
+The ``balance``, ``skill`` and ``days`` modes are fixed points on one
+trade-off. :func:`generate_pareto_front` computes a set of rosters no other
+roster in the set beats on both objectives:
+
+* ``skill_std``: the standard deviation of the ``(date, time slot)`` skill
+  totals, and
+* ``work_std``: the standard deviation of the employees' work counts,
+
+i.e. the two terms of :func:`~shift_scheduler.optimizer.score_roster`.
+
+One call builds the three mode rosters, which share the loaded
+availability, the skill matrix and the schedule-independent candidate
+filtering of each ``(date, slot)``. The ``balance`` roster is then walked
+along the front by a single move/swap local search whose fairness weight
+is lowered step by step, each step continuing from the previous one's
+roster; every step contributes a roster.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .availability import AvailabilityIndex
+from .local_search import _RosterSearch
+from .models import Employee, GeneratedShift, TimeSlot
+from .optimizer import (
+    GenerationReport,
+    ShiftGenerationError,
+    ShiftGenerationIssue,
+    WorkLimits,
+    _locked_shifts,
+    _merge_pinned,
+    _run_start,
+    _SkillMatrix,
+    _SlotCandidates,
+    _validate_shift_inputs,
+)
+from .roster_stats import RosterStatistics
+
+_MODES = ("days", "balance", "skill")
+
+
+@dataclass
+class ParetoRoster:
+    """One roster of the front with its two objectives (lower is better).
+
+    ``label`` names the mode that built it, or ``balance→w`` for the local
+    search step with fairness weight ``w``.
+    """
+
+    label: str
+    shifts: List[GeneratedShift]
+    skill_std: float
+    work_std: float
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+
+
+def roster_objectives(
+    shifts: Sequence[GeneratedShift],
+    employees: Sequence[Employee],
+) -> Tuple[float, float]:
+    """``(skill_std, work_std)`` of a roster, the two terms of its score."""
+    stats = RosterStatistics(employees, shifts)
+    return stats.skill.std, stats.work.std
+
+
+def _non_dominated(rosters: List[ParetoRoster]) -> List[ParetoRoster]:
+    """Rosters not beaten on both objectives, by ascending ``skill_std``.
+
+    Only the rosters with the fewest issues compete; among equal objectives
+    the first one is kept.
+    """
+    fewest = min(len(roster.issues) for roster in rosters)
+    ranked = sorted(
+        (roster for roster in rosters if len(roster.issues) == fewest),
+        key=lambda roster: (roster.skill_std, roster.work_std),
+    )
+    front: List[ParetoRoster] = []
+    for roster in ranked:
+        if not front or roster.work_std < front[-1].work_std:
+            front.append(roster)
+    return front
+
+
+def _walk_front(
+    base: ParetoRoster,
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    availability: AvailabilityIndex,
+    pinned: Sequence[GeneratedShift],
+    fairness_weights: Iterable[float],
+    iterations: int,
+    seed: Optional[int],
+    limits: Optional[WorkLimits] = None,
+) -> List[ParetoRoster]:
+    """Local search steps from ``base`` with falling fairness weights.
+
+    The steps draw from a generator derived from ``seed``, so ``seed=None``
+    gives the same front on every call.
+    """
+    weights = sorted(set(fairness_weights), reverse=True)
+    if not weights or iterations <= 0:
+        return []
+    search = _RosterSearch(
+        base.shifts, employees, time_slots, availability, weights[0], pinned, limits
+    )
+    if not search.movable:
+        return []
+    rng = random.Random(f"{seed}:front")
+    rosters: List[ParetoRoster] = []
+    for weight in weights:
+        search.fairness_weight = weight
+        for _ in range(iterations):
+            neighbour = search.try_swap if rng.random() < 0.5 else search.try_move
+            neighbour(rng)
+        shifts = list(search.shifts)
+        skill_std, work_std = roster_objectives(shifts, employees)
+        rosters.append(ParetoRoster(
+            label=f"balance→{weight:g}", shifts=shifts, skill_std=skill_std,
+            work_std=work_std, issues=list(base.issues),
+        ))
+    return rosters
+
+
+def generate_pareto_front(
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    start_date: str,
+    end_date: str,
+    *,
+    availability: Optional[AvailabilityIndex] = None,
+    report: Optional[GenerationReport] = None,
+    fairness_weights: Iterable[float] = (10, 3, 1, 0.3, 0.1),
+    iterations: int = 3000,
+    seed: Optional[int] = None,
+    initial_shifts: Sequence[GeneratedShift] = (),
+    carry_over_work_count: Optional[Dict[int, int]] = None,
+    locked: Iterable[Tuple[str, str, int]] = (),
+    limits: Optional[WorkLimits] = None,
+) -> List[ParetoRoster]:
+    """Generate the non-dominated rosters of the skill-vs-fairness trade-off.
+
+    ``fairness_weights`` are the weights of the local search steps and
+    ``iterations`` the move/swap attempts per step (``0`` keeps only the
+    three mode rosters). Pinned ``initial_shifts`` and ``locked``
+    assignments are honoured, and never moved by the search, and
+    ``carry_over_work_count`` seeds the constructions as in
+    :func:`~shift_scheduler.optimizer.generate_shifts`. ``limits`` holds
+    for the mode rosters and every move and swap of the search.
+
+    A mode that cannot staff some slot is left out; the error of the first
+    mode is raised only when every mode fails. With ``report`` the runs
+    collect their issues instead, only the rosters with the fewest issues
+    compete, and the first front roster's issues are appended to
+    ``report``.
+    """
+    _validate_shift_inputs(employees, time_slots, start_date, end_date)
+    if availability is None:
+        availability = AvailabilityIndex.load(start_date, end_date)
+    if locked:
+        initial_shifts = _merge_pinned(initial_shifts, _locked_shifts(locked, employees, time_slots))
+    pinned = [shift for shift in initial_shifts if start_date <= shift.date <= end_date]
+    candidates = _SlotCandidates(availability, _SkillMatrix(employees, time_slots))
+
+    rosters: List[ParetoRoster] = []
+    first_error: Optional[ShiftGenerationError] = None
+    for mode in _MODES:
+        run_report = GenerationReport() if report is not None else None
+        try:
+            shifts = _run_start(
+                employees, time_slots, start_date, end_date, mode, availability, run_report,
+                None, pinned, carry_over_work_count, candidates=candidates, limits=limits,
+            )
+        except ShiftGenerationError as exc:
+            first_error = first_error or exc
+            continue
+        skill_std, work_std = roster_objectives(shifts, employees)
+        rosters.append(ParetoRoster(
+            label=mode, shifts=shifts, skill_std=skill_std, work_std=work_std,
+            issues=run_report.issues if run_report is not None else [],
+        ))
+
+    if not rosters:
+        raise first_error
+    for base in rosters:
+        if base.label == "balance" and base.shifts:
+            rosters.extend(_walk_front(
+                base, employees, time_slots, availability, pinned,
+                fairness_weights, iterations, seed, limits,
+            ))
+            break
+    front = _non_dominated(rosters)
+    if report is not None:
+        report.issues.extend(front[0].issues)
+    return front
@@ -0,0 +1,226 @@
+"""Incremental work on top of a stored roster.
+
+Regenerating a whole period reshuffles every employee's month just because
+one person called in sick. :func:`repair_shifts` instead loads the stored
+roster, drops only the assignments of the changed employees that are no
+longer available, refills exactly those seats with the remaining roster
+held fixed and persists the difference.
+
+:func:`load_warm_start` loads the stored roster and the previous closing
+period's work counts so :func:`~shift_scheduler.optimizer.generate_shifts`
+can keep existing assignments and fill only the open seats.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .availability import AvailabilityIndex
+from .database import create_shift, delete_shift, list_employees, list_shifts, list_time_slots
+from .models import Employee, GeneratedShift, TimeSlot
+from .optimizer import (
+    GenerationReport,
+    ShiftGenerationIssue,
+    WorkLimits,
+    _build_shift,
+    _filter_available_employees,
+    _GenerationState,
+    _select_employees_for_slot,
+    _SelectionContext,
+    _SkillMatrix,
+    _WorkLimitCounters,
+)
+from .scoring import OptimisationMode
+from .utils import get_month_range
+
+SlotKey = Tuple[str, str]
+
+
+@dataclass
+class RepairResult:
+    """Difference applied by :func:`repair_shifts`."""
+
+    removed: List[dict] = field(default_factory=list)
+    added: List[GeneratedShift] = field(default_factory=list)
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+
+    @property
+    def is_complete(self) -> bool:
+        """``True`` when every vacated seat was refilled."""
+        return not self.issues
+
+
+def _vacated_seats(
+    stored: Sequence[dict],
+    employees: Dict[int, Employee],
+    slots: Dict[str, TimeSlot],
+    changed: Iterable[int],
+    state: _GenerationState,
+) -> Tuple[List[dict], Dict[SlotKey, List[Employee]]]:
+    """Split ``stored`` into dropped rows and the kept members of each slot.
+
+    Kept assignments are committed to ``state`` so occupancy and work counts
+    reflect the fixed part of the roster.
+    """
+    changed = set(changed)
+    removed: List[dict] = []
+    kept: Dict[SlotKey, List[Employee]] = {}
+    for row in stored:
+        employee = employees.get(row["employee_id"])
+        slot = slots.get(row["time_slot_id"])
+        if slot is None:
+            continue
+        key = (row["date"], slot.id)
+        if row["employee_id"] in changed and (
+            employee is None or not state.availability.is_available(employee, row["date"], slot)
+        ):
+            removed.append(row)
+            kept.setdefault(key, [])
+            continue
+        if employee is not None:
+            state.commit([_build_shift(row["date"], slot, employee)])
+            kept.setdefault(key, []).append(employee)
+    return removed, kept
+
+
+def _shortage_issue(date_str: str, slot: TimeSlot, open_seats: int, available: List[Employee]) -> ShiftGenerationIssue:
+    return ShiftGenerationIssue(
+        code="insufficient_staff",
+        message=f"{date_str} {slot.display_name}の欠員{open_seats}名を補充できませんでした。",
+        date=date_str,
+        time_slot_id=slot.id,
+        time_slot_name=slot.display_name,
+        required=open_seats,
+        available=len(available),
+        shortage=open_seats - len(available),
+        available_employees=[emp.name for emp in available],
+    )
+
+
+def _refill_slot(
+    date_str: str,
+    slot: TimeSlot,
+    members: List[Employee],
+    employees: Sequence[Employee],
+    state: _GenerationState,
+    optimisation_mode: OptimisationMode,
+) -> List[GeneratedShift]:
+    open_seats = slot.required_staff - len(members)
+    if open_seats <= 0:
+        return []
+    available, _ = _filter_available_employees(employees, date_str, slot, state)
+    if len(available) < open_seats:
+        state.fail(_shortage_issue(date_str, slot, open_seats, available))
+    selected = _select_employees_for_slot(
+        available, slot, min(open_seats, len(available)), state.work_count,
+        optimisation_mode, members, state.skills, _SelectionContext(date_str, state.occupancy),
+    )
+    shifts = [_build_shift(date_str, slot, employee) for employee in selected]
+    state.commit(shifts)
+    return shifts
+
+
+def _slot_order(key: SlotKey, slots: Dict[str, TimeSlot]) -> Tuple[str, int, str]:
+    slot = slots[key[1]]
+    return key[0], 0 if slot.period == "morning" else 1, slot.start_time
+
+
+def repair_shifts(
+    start_date: str,
+    end_date: str,
+    changed_employee_ids: Iterable[int],
+    *,
+    optimisation_mode: OptimisationMode = "balance",
+    availability: Optional[AvailabilityIndex] = None,
+    limits: Optional[WorkLimits] = None,
+    persist: bool = True,
+) -> RepairResult:
+    """Reassign only the seats of ``changed_employee_ids`` that became unavailable.
+
+    Every other stored assignment in ``start_date``–``end_date`` stays
+    fixed and seeds the occupancy map and work counts used to pick the
+    replacements. With ``persist`` the removed rows are deleted and the
+    replacements inserted; nothing else in the database is touched. Seats
+    that cannot be refilled are returned as issues instead of raising.
+    With ``limits`` no replacement breaks a
+    :class:`~shift_scheduler.optimizer.WorkLimits` rule; only shifts stored
+    in ``start_date``–``end_date`` count towards them.
+    """
+    if availability is None:
+        availability = AvailabilityIndex.load(start_date, end_date)
+    employees = list_employees()
+    time_slots = list_time_slots()
+    employees_by_id = {employee.id: employee for employee in employees}
+    slots_by_id = {slot.id: slot for slot in time_slots}
+
+    state = _GenerationState(
+        availability=availability,
+        work_count={employee.id: 0 for employee in employees},
+        report=GenerationReport(),
+        skills=_SkillMatrix(employees, time_slots),
+        limits=(
+            _WorkLimitCounters(limits, employees, availability.patterns())
+            if limits is not None else None
+        ),
+    )
+    removed, kept = _vacated_seats(
+        list_shifts(start_date, end_date), employees_by_id, slots_by_id,
+        changed_employee_ids, state,
+    )
+
+    result = RepairResult(removed=removed, issues=state.report.issues)
+    vacated = {(row["date"], row["time_slot_id"]) for row in removed}
+    for key in sorted(vacated, key=lambda k: _slot_order(k, slots_by_id)):
+        result.added.extend(
+            _refill_slot(key[0], slots_by_id[key[1]], kept[key], employees, state, optimisation_mode)
+        )
+
+    if persist:
+        for row in removed:
+            delete_shift(row["id"])
+        for shift in result.added:
+            create_shift(shift.date, shift.time_slot_id, shift.employee_id)
+    return result
+
+
+@dataclass
+class WarmStart:
+    """Stored state that :func:`generate_shifts` can resume from."""
+
+    initial_shifts: List[GeneratedShift] = field(default_factory=list)
+    carry_over_work_count: Dict[int, int] = field(default_factory=dict)
+
+
+def _previous_period(start_date: str, closing_day: int = 20) -> Tuple[str, str]:
+    """Return the closing period before ``start_date``, ending the day before it."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    year, month = (start.year, start.month - 1) if start.month > 1 else (start.year - 1, 12)
+    period_start, _ = get_month_range(year, month, closing_day)
+    return period_start, (start - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def load_warm_start(
+    start_date: str,
+    end_date: str,
+    employees: Sequence[Employee],
+    time_slots: Sequence[TimeSlot],
+    *,
+    closing_day: int = 20,
+) -> WarmStart:
+    """Load the stored roster of the range and the previous period's work counts."""
+    employees_by_id = {employee.id: employee for employee in employees}
+    slots_by_id = {slot.id: slot for slot in time_slots}
+    warm = WarmStart(carry_over_work_count={employee.id: 0 for employee in employees})
+    for row in list_shifts(start_date, end_date):
+        employee = employees_by_id.get(row["employee_id"])
+        slot = slots_by_id.get(row["time_slot_id"])
+        if employee is not None and slot is not None:
+            warm.initial_shifts.append(_build_shift(row["date"], slot, employee))
+
+    previous_start, previous_end = _previous_period(start_date, closing_day)
+    if previous_start <= previous_end:
+        for row in list_shifts(previous_start, previous_end):
+            if row["employee_id"] in warm.carry_over_work_count:
+                warm.carry_over_work_count[row["employee_id"]] += 1
+    return warm
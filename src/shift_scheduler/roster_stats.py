@@ -0,0 +1,150 @@
+"""Running statistics of a roster, updated one assignment at a time.
+
+:class:`RosterStatistics` keeps the skill total of every ``(date, time
+slot)`` and the work count of every employee, each population summarised
+by a :class:`RunningStats` (Welford's mean and variance). Adding,
+removing or re-assigning a shift updates both in O(1), so the generation
+state, the local search and the multi-start comparison read
+:func:`~shift_scheduler.optimizer.score_roster` and the
+:func:`~shift_scheduler.optimizer.calculate_skill_balance` figures without
+walking the roster.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Tuple
+
+from .models import Employee, GeneratedShift
+
+SlotKey = Tuple[str, str]
+
+
+class RunningStats:
+    """Welford mean and population variance of a changing set of values."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        if self.count <= 1:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+            return
+        old_mean = self.mean
+        self.count -= 1
+        self.mean = (old_mean * (self.count + 1) - value) / self.count
+        if self.count == 1:
+            # A single value has no spread; drop the rounding left in ``_m2``.
+            self._m2 = 0.0
+        else:
+            self._m2 -= (value - old_mean) * (value - self.mean)
+
+    def replace(self, old: float, new: float) -> None:
+        """Change one member of the set from ``old`` to ``new``."""
+        old_mean = self.mean
+        self.mean += (new - old) / self.count
+        self._m2 += (new - old) * (new - self.mean + old - old_mean)
+
+    @property
+    def variance(self) -> float:
+        return max(self._m2 / self.count, 0.0) if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+
+class RosterStatistics:
+    """Per ``(date, slot)`` skill totals and per-employee work counts with running moments.
+
+    ``employees`` start with a work count of zero, as in
+    :func:`~shift_scheduler.optimizer.score_roster`; work carried over from
+    earlier periods is not included. A ``(date, slot)`` leaves the skill
+    population when its last shift is removed.
+    """
+
+    def __init__(
+        self,
+        employees: Iterable[Employee] = (),
+        shifts: Iterable[GeneratedShift] = (),
+    ) -> None:
+        self.slot_totals: Dict[SlotKey, int] = {}
+        self.work_count: Dict[int, int] = {}
+        self.skill = RunningStats()
+        self.work = RunningStats()
+        self._slot_size: Dict[SlotKey, int] = {}
+        for employee in employees:
+            if employee.id not in self.work_count:
+                self.work_count[employee.id] = 0
+                self.work.add(0)
+        for shift in shifts:
+            self.add(shift)
+
+    def _adjust_slot(self, key: SlotKey, delta: int) -> None:
+        old = self.slot_totals[key]
+        self.slot_totals[key] = old + delta
+        self.skill.replace(old, old + delta)
+
+    def _adjust_work(self, employee_id: int, delta: int) -> None:
+        old = self.work_count.get(employee_id)
+        if old is None:
+            self.work_count[employee_id] = delta
+            self.work.add(delta)
+            return
+        self.work_count[employee_id] = old + delta
+        self.work.replace(old, old + delta)
+
+    def add(self, shift: GeneratedShift) -> None:
+        key = (shift.date, shift.time_slot_id)
+        if key in self.slot_totals:
+            self._adjust_slot(key, shift.skill_score)
+            self._slot_size[key] += 1
+        else:
+            self.slot_totals[key] = shift.skill_score
+            self._slot_size[key] = 1
+            self.skill.add(shift.skill_score)
+        self._adjust_work(shift.employee_id, 1)
+
+    def remove(self, shift: GeneratedShift) -> None:
+        key = (shift.date, shift.time_slot_id)
+        self._slot_size[key] -= 1
+        if self._slot_size[key]:
+            self._adjust_slot(key, -shift.skill_score)
+        else:
+            self.skill.remove(self.slot_totals.pop(key))
+            del self._slot_size[key]
+        self._adjust_work(shift.employee_id, -1)
+
+    def reassign(self, old: GeneratedShift, new: GeneratedShift) -> None:
+        """Replace ``old`` by ``new`` of the same ``(date, slot)``."""
+        self._adjust_slot((old.date, old.time_slot_id), new.skill_score - old.skill_score)
+        self._adjust_work(old.employee_id, -1)
+        self._adjust_work(new.employee_id, 1)
+
+    def score(self, fairness_weight: float = 10.0) -> float:
+        """The :func:`~shift_scheduler.optimizer.score_roster` of the roster."""
+        return self.skill.std + fairness_weight * self.work.std
+
+    def skill_balance(self) -> Dict[str, float]:
+        """The :func:`~shift_scheduler.optimizer.calculate_skill_balance` figures.
+
+        ``min_skill`` and ``max_skill`` scan the ``(date, slot)`` totals.
+        """
+        if not self.slot_totals:
+            return {"avg_skill": 0.0, "std_skill": 0.0, "min_skill": 0.0, "max_skill": 0.0}
+        average = self.skill.mean
+        return {
+            "avg_skill": average,
+            "std_skill": self.skill.std,
+            "min_skill": float(min(self.slot_totals.values())),
+            "max_skill": float(max(self.slot_totals.values())),
+            "balance_score": (self.skill.std / average) if average > 0 else 0.0,
+        }
@@ -0,0 +1,215 @@
+"""What-if scenarios evaluated in memory.
+
+:meth:`ScenarioInputs.load` bulk-loads a period's employees (active or
+not), time slots, absences, employment patterns and locked shifts once.
+A :class:`Scenario` layers overrides on top of them – extra absences,
+``required_staff`` per time slot and employee activation – and
+:func:`run_scenarios` generates a roster for every scenario, optionally in
+worker processes, and returns the
+:func:`~shift_scheduler.optimizer.calculate_skill_balance` metrics of each.
+
+Nothing is written to the database: the overrides only change copies of
+the loaded inputs.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .areas import get_area_registry, set_area_registry
+from .availability import AvailabilityIndex
+from .database import list_employees, list_locked_shifts, list_time_slots
+from .models import Absence, Employee, GeneratedShift, TimeSlot
+from .optimizer import (
+    GenerationReport,
+    ShiftGenerationError,
+    ShiftGenerationIssue,
+    WorkLimits,
+    calculate_skill_balance,
+    generate_shifts,
+)
+from .scoring import OptimisationMode
+
+
+def absence_days(
+    employee_id: int,
+    start_date: str,
+    end_date: Optional[str] = None,
+    *,
+    absence_type: str = "full_day",
+    reason: Optional[str] = None,
+) -> List[Absence]:
+    """Unsaved absences of ``employee_id`` for every day of ``start_date``–``end_date``."""
+    day = datetime.strptime(start_date, "%Y-%m-%d")
+    last = datetime.strptime(end_date or start_date, "%Y-%m-%d")
+    absences: List[Absence] = []
+    while day <= last:
+        absences.append(Absence(
+            id=0, employee_id=employee_id, absence_date=day.strftime("%Y-%m-%d"),
+            absence_type=absence_type, reason=reason,
+        ))
+        day += timedelta(days=1)
+    return absences
+
+
+@dataclass
+class Scenario:
+    """Overrides of one what-if question.
+
+    ``absences`` are added to the stored ones (see :func:`absence_days`),
+    ``required_staff`` maps time slot IDs to a new head count and ``active``
+    maps employee IDs to an activation flag. A scenario without overrides
+    is the stored situation, e.g. the baseline of a comparison.
+    """
+
+    name: str
+    absences: List[Absence] = field(default_factory=list)
+    required_staff: Dict[str, int] = field(default_factory=dict)
+    active: Dict[int, bool] = field(default_factory=dict)
+
+
+@dataclass
+class ScenarioInputs:
+    """Generation inputs of a period, loaded once and shared by every scenario."""
+
+    start_date: str
+    end_date: str
+    employees: List[Employee]
+    time_slots: List[TimeSlot]
+    availability: AvailabilityIndex
+    locked: List[Tuple[str, str, int]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, start_date: str, end_date: str) -> "ScenarioInputs":
+        """Read the inputs of ``start_date``–``end_date`` from the database."""
+        return cls(
+            start_date=start_date,
+            end_date=end_date,
+            employees=list_employees(active_only=False),
+            time_slots=list_time_slots(),
+            availability=AvailabilityIndex.load(start_date, end_date),
+            locked=list_locked_shifts(start_date, end_date),
+        )
+
+    def apply(
+        self, scenario: Scenario
+    ) -> Tuple[List[Employee], List[TimeSlot], AvailabilityIndex, List[Tuple[str, str, int]]]:
+        """Employees, time slots, availability and locks with ``scenario``'s overrides.
+
+        Only active employees are returned. Locks are kept only while their
+        employee is active and available for the locked slot under the
+        scenario's absences, since generation pins locks without checking
+        availability. The loaded inputs are not changed.
+        """
+        employees = [
+            replace(employee, is_active=scenario.active[employee.id])
+            if employee.id in scenario.active
+            else employee
+            for employee in self.employees
+        ]
+        employees = [employee for employee in employees if employee.is_active]
+        time_slots = [
+            replace(slot, required_staff=scenario.required_staff[slot.id])
+            if slot.id in scenario.required_staff
+            else slot
+            for slot in self.time_slots
+        ]
+        availability = self.availability
+        if scenario.absences:
+            availability = AvailabilityIndex(
+                [*self.availability.absences(self.start_date, self.end_date), *scenario.absences],
+                self.availability.patterns(),
+            )
+        employees_by_id = {employee.id: employee for employee in employees}
+        slots_by_id = {slot.id: slot for slot in time_slots}
+        locked = [
+            (date_str, slot_id, employee_id)
+            for date_str, slot_id, employee_id in self.locked
+            if employee_id in employees_by_id
+            and slot_id in slots_by_id
+            and availability.is_available(employees_by_id[employee_id], date_str, slots_by_id[slot_id])
+        ]
+        return employees, time_slots, availability, locked
+
+
+@dataclass
+class ScenarioResult:
+    """Roster and metrics of one scenario.
+
+    ``metrics`` is the :func:`~shift_scheduler.optimizer.calculate_skill_balance`
+    dictionary of the roster; ``shortage`` sums the missing staff of every
+    issue. ``dropped_locks`` lists the stored locks the scenario could not
+    keep, e.g. of an employee it makes absent on the locked day.
+    """
+
+    name: str
+    shifts: List[GeneratedShift]
+    metrics: Dict[str, float]
+    issues: List[ShiftGenerationIssue] = field(default_factory=list)
+    dropped_locks: List[Tuple[str, str, int]] = field(default_factory=list)
+
+    @property
+    def shortage(self) -> int:
+        return sum(issue.shortage or 0 for issue in self.issues)
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "scenario": self.name,
+            "shifts": len(self.shifts),
+            "issues": len(self.issues),
+            "shortage": self.shortage,
+            "dropped_locks": len(self.dropped_locks),
+            **self.metrics,
+        }
+
+
+def _run_scenario(payload: Tuple) -> ScenarioResult:
+    inputs, scenario, optimisation_mode, limits = payload
+    employees, time_slots, availability, locked = inputs.apply(scenario)
+    kept = set(locked)
+    report = GenerationReport()
+    try:
+        shifts = generate_shifts(
+            employees, time_slots, inputs.start_date, inputs.end_date,
+            optimisation_mode=optimisation_mode,
+            availability=availability,
+            report=report,
+            locked=locked,
+            limits=limits,
+        )
+    except ShiftGenerationError as exc:
+        # Invalid inputs, e.g. a scenario that deactivates every employee.
+        shifts, report.issues = [], [exc.issue]
+    return ScenarioResult(
+        name=scenario.name,
+        shifts=shifts,
+        metrics=calculate_skill_balance(shifts, time_slots),
+        issues=report.issues,
+        dropped_locks=[lock for lock in inputs.locked if lock not in kept],
+    )
+
+
+def run_scenarios(
+    scenarios: Sequence[Scenario],
+    inputs: ScenarioInputs,
+    *,
+    optimisation_mode: OptimisationMode = "balance",
+    limits: Optional[WorkLimits] = None,
+    workers: int = 1,
+) -> List[ScenarioResult]:
+    """Generate a roster for every scenario on top of ``inputs``.
+
+    With ``workers > 1`` the scenarios run in that many processes. Results
+    keep the order of ``scenarios``.
+    """
+    payloads = [(inputs, scenario, optimisation_mode, limits) for scenario in scenarios]
+    if workers <= 1 or len(payloads) <= 1:
+        return [_run_scenario(payload) for payload in payloads]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(payloads)),
+        initializer=set_area_registry,
+        initargs=(get_area_registry(),),
+    ) as pool:
+        return list(pool.map(_run_scenario, payloads))
@@ -0,0 +1,54 @@
+"""Weights of the candidate scoring engine.
+
+Every pick of a slot's next employee takes the eligible candidate with the
+lowest score
+
+    work × work_count
+    + skill_deviation × slot.skill_weight × |skill score − per-person target|
+    + consecutive_days × days worked in a row up to yesterday
+    − continuity × (afternoon slot and working this morning in the area)
+
+Work counts enter as they are: within one pick every candidate is compared
+against the same least-worked count, so this equals weighting the shifts
+worked above the least-worked candidate. Ties go to the earlier candidate.
+
+The built-in modes are points of this space. A weight of :data:`PRIORITY`
+makes a term a strict priority over the skill deviation, so ``balance``
+still picks the closest skill among the least-worked candidates. The
+built-in modes use a ``slot.skill_weight`` of 1; custom weights apply the
+slot's own, where 0 ignores the skill deviation in that slot.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Union
+
+# Large enough that one shift outweighs any skill deviation.
+PRIORITY = 1e6
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    """Penalty weights of the per-candidate score; see the module docstring."""
+
+    work: float = 0.0
+    skill_deviation: float = 0.0
+    consecutive_days: float = 0.0
+    continuity: float = 0.0
+
+
+# ``optimisation_mode`` arguments: a built-in mode name or custom weights.
+OptimisationMode = Union[str, ScoringWeights]
+
+MODE_WEIGHTS: Dict[str, ScoringWeights] = {
+    "days": ScoringWeights(work=1.0),
+    "skill": ScoringWeights(skill_deviation=1.0),
+    "balance": ScoringWeights(work=PRIORITY, skill_deviation=1.0),
+}
+
+
+def resolve_weights(mode: OptimisationMode) -> ScoringWeights:
+    """Weights of an optimisation mode; unknown modes select like ``balance``."""
+    if isinstance(mode, ScoringWeights):
+        return mode
+    return MODE_WEIGHTS.get(mode, MODE_WEIGHTS["balance"])
@@ -0,0 +1,52 @@
+"""Fixtures shared by the generator test suites."""
+import pytest
+
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.models import Employee, EmploymentPattern, TimeSlot
+
+
+@pytest.fixture
+def employees():
+    """Eight staff across all four employee types, with uneven skills."""
+    specs = [
+        ("TYPE_A", 90, 90), ("TYPE_A", 40, 45), ("TYPE_A", 65, 60), ("TYPE_B", 0, 95),
+        ("TYPE_B", 0, 35), ("TYPE_C", 85, 0), ("TYPE_C", 30, 0), ("TYPE_D", 55, 0),
+    ]
+    return [
+        Employee(
+            id=i, name=f"職員{i}", employee_type=emp_type, employment_type="正職員",
+            employment_pattern_id="full", skill_reha=reha, skill_reception_am=recep,
+            skill_reception_pm=recep, skill_general=50, is_active=True,
+        )
+        for i, (emp_type, reha, recep) in enumerate(specs, 1)
+    ]
+
+
+@pytest.fixture
+def time_slots():
+    """Monday and Tuesday morning/afternoon slots in both areas, two seats each."""
+    slots = []
+    for day, prefix in ((0, "mon"), (1, "tue")):
+        for area, code in (("リハ室", "reha"), ("受付", "recep")):
+            for period, start, end in (("morning", "08:30", "13:00"), ("afternoon", "13:00", "18:00")):
+                slots.append(TimeSlot(
+                    id=f"{prefix}_{code}_{period}", day_of_week=day, period=period,
+                    start_time=start, end_time=end, is_active=True, required_staff=2,
+                    area=area, display_name=f"{prefix}_{code}_{period}",
+                ))
+    return slots
+
+
+@pytest.fixture
+def pattern():
+    """The full-time pattern of every employee above."""
+    return EmploymentPattern(
+        id="full", name="フルタイム", category="full_time", start_time="08:30",
+        end_time="18:30", break_hours=1.0, work_hours=8.0, can_work_afternoon=True,
+    )
+
+
+@pytest.fixture
+def availability(pattern):
+    """No absences and a full-day pattern."""
+    return AvailabilityIndex([], [pattern])
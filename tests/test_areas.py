@@ -0,0 +1,164 @@
+"""Test suite for the data-driven area eligibility and skill rules."""
+import pytest
+
+from src.shift_scheduler import areas, database
+from src.shift_scheduler.areas import DEFAULT_AREA_RULES, AreaRegistry
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.database import (
+    create_employee,
+    create_shift,
+    init_database,
+    list_area_rules,
+    list_shifts,
+    load_area_registry,
+    save_area_rule,
+)
+from src.shift_scheduler.models import AreaRule, Employee, EmploymentPattern, TimeSlot
+from src.shift_scheduler.optimizer import (
+    _can_assign_to_area,
+    _violates_pairing,
+    calculate_skill_score,
+    generate_shifts,
+)
+
+LAB_RULE = AreaRule(
+    area="検査室", employee_types=("TYPE_A", "TYPE_C"),
+    skill_morning="skill_general", skill_afternoon="skill_general",
+)
+
+
+def _employee(emp_id, emp_type, reha=60, recep_am=70, recep_pm=40, general=50):
+    return Employee(
+        id=emp_id, name=f"職員{emp_id}", employee_type=emp_type, employment_type="正職員",
+        employment_pattern_id="full", skill_reha=reha, skill_reception_am=recep_am,
+        skill_reception_pm=recep_pm, skill_general=general, is_active=True,
+    )
+
+
+def _slot(area, period="morning"):
+    start, end = ("08:30", "13:00") if period == "morning" else ("13:00", "18:00")
+    return TimeSlot(
+        id=f"{area}_{period}", day_of_week=0, period=period, start_time=start,
+        end_time=end, is_active=True, required_staff=1, area=area,
+        display_name=f"{area}（{period}）",
+    )
+
+
+@pytest.fixture
+def lab_registry(monkeypatch):
+    """The default rules plus a 検査室 for TYPE_A/C, active for the test only."""
+    registry = AreaRegistry([*DEFAULT_AREA_RULES, LAB_RULE])
+    monkeypatch.setattr(areas, "_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the module at an empty temporary database."""
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "shift.db")
+    init_database()
+
+
+class TestAreaRegistry:
+    """Test the compiled lookups against the clinic's rules."""
+
+    @pytest.mark.parametrize("emp_type, reha, recep", [
+        ("TYPE_A", True, True),
+        ("TYPE_B", False, True),
+        ("TYPE_C", True, False),
+        ("TYPE_D", True, False),
+    ])
+    def test_default_eligibility(self, emp_type, reha, recep):
+        """Employee types are admitted to the areas of the default rules."""
+        employee = _employee(1, emp_type)
+        assert _can_assign_to_area(employee, _slot("リハ室")) is reha
+        assert _can_assign_to_area(employee, _slot("受付")) is recep
+        assert _can_assign_to_area(employee, _slot("倉庫"))
+
+    def test_zero_area_skill_is_not_eligible(self):
+        """An allowed type still needs a non-zero skill for the area."""
+        assert not _can_assign_to_area(_employee(1, "TYPE_A", reha=0), _slot("リハ室"))
+        assert _can_assign_to_area(_employee(1, "TYPE_A", recep_am=0), _slot("受付", "afternoon"))
+
+    def test_default_skill_scores(self):
+        """Scores add the general skill to the area's skill of the period."""
+        employee = _employee(1, "TYPE_A")
+        assert calculate_skill_score(employee, _slot("リハ室")) == 110
+        assert calculate_skill_score(employee, _slot("受付", "morning")) == 120
+        assert calculate_skill_score(employee, _slot("受付", "afternoon")) == 90
+        assert calculate_skill_score(employee, _slot("受付", "evening")) == 105
+        assert calculate_skill_score(employee, _slot("倉庫")) == 50
+
+    def test_unknown_skill_attribute_is_rejected(self):
+        """Rules must name an Employee skill attribute."""
+        with pytest.raises(ValueError):
+            AreaRegistry([AreaRule("検査室", ("TYPE_A",), "skill_lab", "skill_lab")])
+
+    def test_pairing_comes_from_the_rules(self, monkeypatch):
+        """The TYPE_D pairing follows the rule's lead and paired types."""
+        rehab = _slot("リハ室")
+        part_timer, lead = _employee(1, "TYPE_D"), _employee(2, "TYPE_C")
+        assert _violates_pairing([part_timer], rehab)
+        assert not _violates_pairing([part_timer, lead], rehab)
+
+        lab_rule = AreaRule(
+            "検査室", ("TYPE_A", "TYPE_B"), "skill_general", "skill_general",
+            lead_types=("TYPE_A",), paired_types=("TYPE_B",),
+        )
+        registry = AreaRegistry([DEFAULT_AREA_RULES[1], lab_rule])
+        monkeypatch.setattr(areas, "_registry", registry)
+        assert not _violates_pairing([part_timer], rehab)
+        assert _violates_pairing([_employee(3, "TYPE_B")], _slot("検査室"))
+        assert not _violates_pairing([_employee(3, "TYPE_B"), _employee(4, "TYPE_A")], _slot("検査室"))
+
+    def test_paired_types_need_a_lead(self):
+        """A pairing rule without lead types is rejected."""
+        with pytest.raises(ValueError):
+            AreaRegistry([AreaRule("検査室", ("TYPE_B",), "skill_general", "skill_general", paired_types=("TYPE_B",))])
+
+    def test_new_area_is_a_data_change(self, lab_registry):
+        """A registered 検査室 admits TYPE_A/C only and is staffed by the optimiser."""
+        assert lab_registry.areas() == ["リハ室", "受付", "検査室"]
+        employees = [_employee(1, "TYPE_A"), _employee(2, "TYPE_B"), _employee(3, "TYPE_C", general=80)]
+        lab = _slot("検査室")
+        assert [_can_assign_to_area(e, lab) for e in employees] == [True, False, True]
+        assert calculate_skill_score(employees[2], lab) == 160
+
+        pattern = EmploymentPattern(
+            id="full", name="フルタイム", category="full_time", start_time="08:30",
+            end_time="18:30", break_hours=1.0, work_hours=8.0, can_work_afternoon=True,
+        )
+        shifts = generate_shifts(
+            employees, [lab], "2025-12-01", "2025-12-01",
+            availability=AvailabilityIndex([], [pattern]),
+        )
+        assert [shift.employee_id for shift in shifts] in ([1], [3])
+        assert shifts[0].skill_score == calculate_skill_score(shifts[0].employee, lab)
+
+
+class TestAreaRuleStorage:
+    """Test the ``area_rules`` table."""
+
+    def test_seeded_with_defaults(self, temp_db):
+        """init_database stores the default rules."""
+        assert list_area_rules() == list(DEFAULT_AREA_RULES)
+
+    def test_saved_rule_is_compiled(self, temp_db):
+        """A saved rule shows up in the loaded registry; saving again updates it."""
+        save_area_rule(LAB_RULE)
+        save_area_rule(AreaRule("検査室", ("TYPE_C",), "skill_general", "skill_general"))
+        registry = load_area_registry()
+        assert registry.rules["検査室"].employee_types == ("TYPE_C",)
+        assert not registry.can_assign(_employee(1, "TYPE_A"), _slot("検査室"))
+
+    def test_list_shifts_scores_with_the_rules(self, temp_db):
+        """Stored shifts get the same skill score as the optimiser gives them."""
+        employee_id = create_employee(
+            name="職員1", employee_type="TYPE_A", employment_type="正職員",
+            employment_pattern_id="full_early", skill_reha=60, skill_reception_am=70,
+            skill_reception_pm=40, skill_general=50,
+        )
+        create_shift("2025-12-10", "wed_reha_am", employee_id)
+        create_shift("2025-12-10", "wed_recep_pm", employee_id)
+        scores = {row["time_slot_id"]: row["skill_score"] for row in list_shifts("2025-12-10", "2025-12-10")}
+        assert scores == {"wed_reha_am": 110, "wed_recep_pm": 90}
@@ -4,6 +4,7 @@ from datetime import datetime
 from unittest.mock import patch, MagicMock
 from src.shift_scheduler.models import Employee, TimeSlot, Absence, EmploymentPattern
 from src.shift_scheduler.availability import (
+    AvailabilityIndex,
     _parse_date,
     is_employee_available,
     describe_unavailability,
@@ -405,3 +406,42 @@ class TestAvailableTimeSlots:
         
         result = available_time_slots(sample_employee, "2025-12-07", slots)
         assert len(result) == 0
+
+
+class TestAvailabilityIndex:
+    """Test the bulk-loaded in-memory availability index."""
+
+    def test_matches_per_call_lookup(self, sample_employee, sample_time_slot, sample_pattern):
+        """Index answers the same as the database-backed check."""
+        index = AvailabilityIndex([], [sample_pattern])
+        assert index.is_available(sample_employee, "2025-12-08", sample_time_slot)
+        assert index.describe(sample_employee, "2025-12-08", sample_time_slot) is None
+
+    def test_absence_blocks_matching_period(self, sample_employee, sample_time_slot, sample_pattern):
+        """Morning absence blocks morning but not afternoon slots."""
+        absence = Absence(
+            id=1, employee_id=1, absence_date="2025-12-08",
+            absence_type="morning", reason="通院"
+        )
+        afternoon_slot = TimeSlot(
+            id="pm", day_of_week=0, period="afternoon", start_time="13:00",
+            end_time="16:00", is_active=True, required_staff=2, area="リハ室",
+            display_name="午後"
+        )
+        index = AvailabilityIndex([absence], [sample_pattern])
+        assert not index.is_available(sample_employee, "2025-12-08", sample_time_slot)
+        assert "午前休" in index.describe(sample_employee, "2025-12-08", sample_time_slot)
+        assert index.is_available(sample_employee, "2025-12-08", afternoon_slot)
+
+    def test_missing_pattern(self, sample_employee, sample_time_slot):
+        """Unknown employment pattern is reported like the per-call lookup."""
+        index = AvailabilityIndex([], [])
+        assert not index.is_available(sample_employee, "2025-12-08", sample_time_slot)
+        assert index.describe(sample_employee, "2025-12-08", sample_time_slot) == "勤務パターンが見つかりません"
+
+    def test_does_not_query_database(self, sample_employee, sample_time_slot, sample_pattern):
+        """Lookups are answered from memory only."""
+        index = AvailabilityIndex([], [sample_pattern])
+        with patch("src.shift_scheduler.availability.get_absence", side_effect=AssertionError), \
+             patch("src.shift_scheduler.availability.get_employment_pattern", side_effect=AssertionError):
+            assert index.is_available(sample_employee, "2025-12-08", sample_time_slot)
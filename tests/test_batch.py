@@ -0,0 +1,145 @@
+"""Test suite for multi-facility batch generation."""
+import sqlite3
+
+import pytest
+
+from src.shift_scheduler import database
+from src.shift_scheduler.batch import FacilityConfig, generate_facilities
+from src.shift_scheduler.database import (
+    create_employee,
+    create_shift,
+    init_database,
+    list_shifts,
+    save_area_rule,
+    save_generated_shifts,
+    set_shift_locked,
+    use_database,
+)
+from src.shift_scheduler.models import AreaRule
+
+WEDNESDAY = "2025-12-10"
+
+
+def _make_facility(path, staff):
+    """A facility database with ``staff`` TYPE_A employees and one stored shift."""
+    with use_database(path):
+        init_database()
+        ids = [
+            create_employee(
+                name=f"職員{i}", employee_type="TYPE_A", employment_type="正職員",
+                employment_pattern_id="full_early", skill_reha=60 + i, skill_reception_am=70,
+                skill_reception_pm=70, skill_general=50,
+            )
+            for i in range(staff)
+        ]
+        create_shift(WEDNESDAY, "wed_reha_am", ids[0])
+    return path
+
+
+def _assignments(path):
+    with use_database(path):
+        return {(r["date"], r["time_slot_id"], r["employee_id"]) for r in list_shifts(WEDNESDAY, WEDNESDAY)}
+
+
+@pytest.fixture
+def facilities(tmp_path):
+    """A fully staffable clinic and one with a single employee."""
+    return [
+        _make_facility(tmp_path / "north" / "shift.db", staff=5),
+        _make_facility(tmp_path / "south" / "shift.db", staff=1),
+    ]
+
+
+class TestUseDatabase:
+    """Test the database path swap."""
+
+    def test_restores_previous_path(self, tmp_path):
+        """The module path is restored even when the block raises."""
+        before = database.DB_PATH
+        with pytest.raises(RuntimeError):
+            with use_database(tmp_path / "other.db"):
+                assert database.DB_PATH == tmp_path / "other.db"
+                raise RuntimeError
+        assert database.DB_PATH == before
+
+    def test_save_is_one_transaction(self, tmp_path):
+        """A failing insert also undoes the deletion of the old roster."""
+        path = _make_facility(tmp_path / "shift.db", staff=2)
+        before = _assignments(path)
+        with use_database(path):
+            with pytest.raises(sqlite3.IntegrityError):
+                save_generated_shifts(
+                    WEDNESDAY, WEDNESDAY,
+                    [(WEDNESDAY, "wed_recep_am", 1), (WEDNESDAY, "wed_recep_am", 1)],
+                )
+        assert _assignments(path) == before
+
+
+class TestGenerateFacilities:
+    """Test the batch entry point."""
+
+    def test_consolidated_report(self, facilities):
+        """Complete sites are stored; short-staffed sites report issues and stay untouched."""
+        south_before = _assignments(facilities[1])
+        report = generate_facilities(facilities, WEDNESDAY, WEDNESDAY)
+
+        north, south = report.facilities
+        assert north.is_complete
+        assert north.deleted == 1 and north.saved == north.generated == 8
+        assert len(_assignments(facilities[0])) == 8
+
+        assert not south.is_complete and south.saved == 0
+        assert {issue.code for issue in south.issues} >= {"insufficient_staff"}
+        assert _assignments(facilities[1]) == south_before
+        assert not report.is_complete
+        assert {row["facility"] for row in report.issue_rows()} == {str(facilities[1])}
+
+    def test_locked_and_warm_start_shifts_are_kept(self, facilities):
+        """Locked shifts survive a replace; warm start only fills open seats."""
+        path = facilities[0]
+        with use_database(path):
+            shift_id = list_shifts(WEDNESDAY, WEDNESDAY)[0]["id"]
+            set_shift_locked(shift_id)
+        report = generate_facilities([path], WEDNESDAY, WEDNESDAY)
+        assert report.facilities[0].deleted == 0
+        assert report.facilities[0].saved == 7
+        assert len(_assignments(path)) == 8
+
+        warm = generate_facilities([FacilityConfig(path, warm_start=True)], WEDNESDAY, WEDNESDAY)
+        assert warm.facilities[0].saved == 0
+        assert len(_assignments(path)) == 8
+
+    def test_missing_database_is_reported(self, facilities, tmp_path):
+        """A wrong path is an error of that facility only, and creates no file."""
+        missing = tmp_path / "missing" / "shift.db"
+        report = generate_facilities(
+            [FacilityConfig(missing, name="欠番"), facilities[0]], WEDNESDAY, WEDNESDAY
+        )
+        assert report.facilities[0].error is not None
+        assert report.issue_rows()[0]["code"] == "database_error"
+        assert report.facilities[1].is_complete
+        assert not missing.exists()
+
+    def test_invalid_area_rules_do_not_abort_the_batch(self, facilities):
+        """An error other than a generation issue stays with its facility."""
+        with use_database(facilities[1]):
+            save_area_rule(AreaRule(
+                "検査室", ("TYPE_A",), "skill_general", "skill_general", paired_types=("TYPE_A",)
+            ))
+        report = generate_facilities([facilities[1], facilities[0]], WEDNESDAY, WEDNESDAY)
+        broken, north = report.facilities
+        assert broken.error.startswith("ValueError") and broken.saved == 0
+        assert north.is_complete and north.saved == 8
+
+    def test_worker_pool_matches_sequential_run(self, facilities, tmp_path):
+        """Facilities in worker processes give the same report."""
+        copies = [
+            _make_facility(tmp_path / "copy_north" / "shift.db", staff=5),
+            _make_facility(tmp_path / "copy_south" / "shift.db", staff=1),
+        ]
+        pooled = generate_facilities(facilities, WEDNESDAY, WEDNESDAY, workers=2)
+        serial = generate_facilities(copies, WEDNESDAY, WEDNESDAY)
+        assert [(f.saved, len(f.issues)) for f in pooled.facilities] == [
+            (f.saved, len(f.issues)) for f in serial.facilities
+        ]
+        assert _assignments(facilities[0]) == _assignments(copies[0])
@@ -0,0 +1,99 @@
+"""Test suite for memoised generation results."""
+import pytest
+
+from src.shift_scheduler import cache as cache_module
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.cache import (
+    GenerationCache,
+    cached_generate_shifts,
+    generation_fingerprint,
+)
+from src.shift_scheduler.models import Absence
+from src.shift_scheduler.optimizer import GenerationReport, generate_shifts
+
+START, END = "2025-12-01", "2025-12-14"
+
+
+@pytest.fixture
+def time_slots(time_slots):
+    """Only the Monday slots."""
+    return [slot for slot in time_slots if slot.day_of_week == 0]
+
+
+def _assignments(shifts):
+    return [(s.date, s.time_slot_id, s.employee_id) for s in shifts]
+
+
+class TestGenerationFingerprint:
+    """Test the input fingerprint."""
+
+    def test_omitted_defaults_hash_alike(self, employees, time_slots, availability):
+        """Spelling out a default option or an execution option keeps the key."""
+        plain = generation_fingerprint(employees, time_slots, START, END, availability)
+        explicit = generation_fingerprint(
+            employees, time_slots, START, END, availability,
+            optimisation_mode="balance", n_starts=1, workers=4,
+        )
+        assert plain == explicit
+
+    def test_inputs_change_the_key(self, employees, time_slots, availability, pattern):
+        """Absences in range, options and employee data all change the key."""
+        base = generation_fingerprint(employees, time_slots, START, END, availability)
+        absent = AvailabilityIndex([Absence(1, 1, "2025-12-08", "full_day", None)], [pattern])
+        outside = AvailabilityIndex([Absence(1, 1, "2026-01-05", "full_day", None)], [pattern])
+        assert generation_fingerprint(employees, time_slots, START, END, absent) != base
+        assert generation_fingerprint(employees, time_slots, START, END, outside) == base
+        assert generation_fingerprint(
+            employees, time_slots, START, END, availability, optimisation_mode="days"
+        ) != base
+        employees[0].skill_reha += 1
+        assert generation_fingerprint(employees, time_slots, START, END, availability) != base
+
+
+class TestGenerationCache:
+    """Test the LRU and its on-disk backing."""
+
+    def test_hit_skips_generation(self, employees, time_slots, availability, monkeypatch):
+        """A repeated call returns the stored roster without solving again."""
+        cache = GenerationCache(persist=False)
+        first = cached_generate_shifts(
+            employees, time_slots, START, END, cache=cache, availability=availability,
+        )
+        monkeypatch.setattr(cache_module, "generate_shifts", pytest.fail)
+        again = cached_generate_shifts(
+            employees, time_slots, START, END, cache=cache, availability=availability,
+        )
+        assert _assignments(again) == _assignments(first)
+        assert _assignments(first) == _assignments(
+            generate_shifts(employees, time_slots, START, END, availability=availability)
+        )
+
+    def test_least_recently_used_entry_is_evicted(self, employees, time_slots):
+        """Only ``max_entries`` rosters stay in memory."""
+        cache = GenerationCache(max_entries=2, persist=False)
+        for key in ("a", "b", "c"):
+            cache.put(key, [])
+        assert cache.get("a", employees, time_slots) is None
+        assert cache.get("c", employees, time_slots) == []
+
+    def test_disk_backing_survives_a_new_instance(
+        self, employees, time_slots, availability, tmp_path
+    ):
+        """A fresh cache over the same directory finds the stored roster."""
+        first = cached_generate_shifts(
+            employees, time_slots, START, END, availability=availability,
+            cache=GenerationCache(directory=tmp_path),
+        )
+        key = generation_fingerprint(employees, time_slots, START, END, availability)
+        reloaded = GenerationCache(directory=tmp_path).get(key, employees, time_slots)
+        assert _assignments(reloaded) == _assignments(first)
+
+    def test_report_runs_bypass_the_cache(self, employees, time_slots, availability):
+        """Collect-all runs are neither served from nor stored in the cache."""
+        cache = GenerationCache(persist=False)
+        cached_generate_shifts(
+            employees, time_slots, START, END, cache=cache, availability=availability,
+            report=GenerationReport(),
+        )
+        key = generation_fingerprint(employees, time_slots, START, END, availability)
+        assert cache.get(key, employees, time_slots) is None
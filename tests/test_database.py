@@ -0,0 +1,78 @@
+"""Test suite for shift persistence helpers in the database module."""
+import sqlite3
+
+import pytest
+
+from src.shift_scheduler import database
+from src.shift_scheduler.database import (
+    create_employee,
+    create_shift,
+    delete_shifts_by_date_range,
+    init_database,
+    list_locked_shifts,
+    list_shifts,
+    set_shift_locked,
+)
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the module at an empty temporary database."""
+    path = tmp_path / "shift.db"
+    monkeypatch.setattr(database, "DB_PATH", path)
+    return path
+
+
+@pytest.fixture
+def two_shifts(temp_db):
+    """One employee with two Wednesday shifts."""
+    init_database()
+    employee_id = create_employee(
+        name="職員1", employee_type="TYPE_A", employment_type="正職員",
+        employment_pattern_id="full_early", skill_reha=70, skill_reception_am=70,
+        skill_reception_pm=70, skill_general=50,
+    )
+    return [
+        create_shift("2025-12-10", "wed_reha_am", employee_id),
+        create_shift("2025-12-10", "wed_recep_pm", employee_id),
+    ]
+
+
+class TestShiftLocks:
+    """Test locking shifts against overwrite."""
+
+    def test_lock_round_trip(self, two_shifts):
+        """Locked shifts are listed as tuples and flagged in list_shifts."""
+        assert set_shift_locked(two_shifts[0])
+        locked = list_locked_shifts("2025-12-01", "2025-12-31")
+        assert [(date, slot_id) for date, slot_id, _ in locked] == [("2025-12-10", "wed_reha_am")]
+        flags = {row["id"]: row["is_locked"] for row in list_shifts("2025-12-10", "2025-12-10")}
+        assert flags == {two_shifts[0]: True, two_shifts[1]: False}
+
+        set_shift_locked(two_shifts[0], False)
+        assert list_locked_shifts("2025-12-01", "2025-12-31") == []
+
+    def test_delete_keeps_locked(self, two_shifts):
+        """``keep_locked`` leaves locked shifts in place."""
+        set_shift_locked(two_shifts[0])
+        assert delete_shifts_by_date_range("2025-12-10", "2025-12-10", keep_locked=True) == 1
+        assert [row["id"] for row in list_shifts("2025-12-10", "2025-12-10")] == [two_shifts[0]]
+        assert delete_shifts_by_date_range("2025-12-10", "2025-12-10") == 1
+
+    def test_migrates_existing_database(self, temp_db):
+        """init_database adds the lock column to an older shifts table."""
+        conn = sqlite3.connect(str(temp_db))
+        conn.execute(
+            "CREATE TABLE shifts (id INTEGER PRIMARY KEY AUTOINCREMENT, date DATE NOT NULL, "
+            "time_slot_id TEXT NOT NULL, employee_id INTEGER NOT NULL, "
+            "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, UNIQUE(date, time_slot_id, employee_id))"
+        )
+        conn.commit()
+        conn.close()
+
+        init_database()
+
+        conn = sqlite3.connect(str(temp_db))
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(shifts)")}
+        conn.close()
+        assert "is_locked" in columns
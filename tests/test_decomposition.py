@@ -0,0 +1,103 @@
+"""Test suite for block-decomposed generation."""
+import pytest
+
+from src.shift_scheduler.decomposition import _split_blocks, generate_shifts_by_blocks
+from src.shift_scheduler.optimizer import (
+    _can_assign_to_area,
+    _evaluate_part_time_rule,
+    check_time_overlap,
+    generate_shifts,
+    GenerationReport,
+    ShiftGenerationError,
+)
+
+
+def _work_counts(shifts, employees):
+    counts = {employee.id: 0 for employee in employees}
+    for shift in shifts:
+        counts[shift.employee_id] += 1
+    return counts
+
+
+class TestSplitBlocks:
+    """Test splitting a date range into blocks."""
+
+    def test_last_block_is_truncated(self):
+        """Blocks are consecutive and the last one ends on the end date."""
+        assert _split_blocks("2025-12-01", "2025-12-17", 7) == [
+            ("2025-12-01", "2025-12-07"),
+            ("2025-12-08", "2025-12-14"),
+            ("2025-12-15", "2025-12-17"),
+        ]
+
+
+class TestGenerateShiftsByBlocks:
+    """Test block-parallel generation with reconciliation."""
+
+    def test_fills_every_seat_and_levels_work(self, employees, time_slots, availability):
+        """Every seat is filled, hard rules hold and work is no less even than sequentially."""
+        shifts = generate_shifts_by_blocks(
+            employees, time_slots, "2025-12-01", "2026-02-28",
+            availability=availability, seed=1,
+        )
+        sequential = generate_shifts(
+            employees, time_slots, "2025-12-01", "2026-02-28", availability=availability,
+        )
+        assert sorted((s.date, s.time_slot_id) for s in shifts) == sorted(
+            (s.date, s.time_slot_id) for s in sequential
+        )
+        counts = _work_counts(shifts, employees).values()
+        baseline = _work_counts(sequential, employees).values()
+        assert max(counts) - min(counts) <= max(baseline) - min(baseline)
+        for shift in shifts:
+            assert _can_assign_to_area(shift.employee, shift.time_slot)
+        for date in {shift.date for shift in shifts}:
+            daily = [shift for shift in shifts if shift.date == date]
+            assert _evaluate_part_time_rule(daily, time_slots) is None
+            for i, a in enumerate(daily):
+                for b in daily[i + 1:]:
+                    if a.employee_id == b.employee_id:
+                        assert not check_time_overlap(a.time_slot, b.time_slot)
+
+    def test_process_pool_matches_inline(self, employees, time_slots, availability):
+        """Solving the blocks in worker processes gives the same roster."""
+        kwargs = dict(availability=availability, seed=2, reconcile_swaps=500)
+        inline = generate_shifts_by_blocks(
+            employees, time_slots, "2025-12-01", "2025-12-28", **kwargs
+        )
+        pooled = generate_shifts_by_blocks(
+            employees, time_slots, "2025-12-01", "2025-12-28", workers=2, **kwargs
+        )
+        assert [s.to_dict() for s in pooled] == [s.to_dict() for s in inline]
+
+    def test_default_seed_is_repeatable(self, employees, time_slots, availability):
+        """Without a seed two runs still give the same roster."""
+        first, second = (
+            generate_shifts_by_blocks(
+                employees, time_slots, "2025-12-01", "2025-12-28", availability=availability,
+            )
+            for _ in range(2)
+        )
+        assert [s.to_dict() for s in first] == [s.to_dict() for s in second]
+
+    def test_locked_assignment_survives_reconciliation(self, employees, time_slots, availability):
+        """Locked shifts are neither handed over nor swapped."""
+        locked = {("2025-12-09", "tue_reha_morning", 8)}
+        shifts = generate_shifts_by_blocks(
+            employees, time_slots, "2025-12-01", "2025-12-28",
+            availability=availability, locked=locked,
+        )
+        assert locked <= {(s.date, s.time_slot_id, s.employee_id) for s in shifts}
+
+    def test_shortage_raises_or_is_reported(self, employees, time_slots, availability):
+        """A block that cannot be staffed raises, or is reported in collect-all mode."""
+        with pytest.raises(ShiftGenerationError):
+            generate_shifts_by_blocks(
+                employees[:3], time_slots, "2025-12-01", "2025-12-14", availability=availability,
+            )
+        report = GenerationReport()
+        generate_shifts_by_blocks(
+            employees[:3], time_slots, "2025-12-01", "2025-12-14",
+            availability=availability, report=report,
+        )
+        assert {issue.date for issue in report.issues} >= {"2025-12-01", "2025-12-08"}
@@ -0,0 +1,179 @@
+"""Test suite for the exact per-day branch-and-bound."""
+import random
+from itertools import combinations, product
+
+import pytest
+
+from src.shift_scheduler import optimizer
+from src.shift_scheduler.exact import Candidate, SlotProblem, solve_day
+from src.shift_scheduler.optimizer import (
+    _evaluate_part_time_rule,
+    check_time_overlap,
+    generate_shifts,
+    GenerationReport,
+)
+
+MORNING, AFTERNOON, FULL = (510, 780), (780, 1080), (510, 1080)
+
+
+def _brute_force(slots, fairness_weight=10.0):
+    """Cheapest day cost by enumerating every selection of every slot."""
+    best = None
+    for picks in product(*(combinations(slot.candidates, slot.seats) for slot in slots)):
+        booked, cost, valid = {}, 0.0, True
+        for slot, chosen in zip(slots, picks):
+            if any(
+                not (slot.interval[1] <= other[0] or other[1] <= slot.interval[0])
+                for c in chosen for other in booked.get(c.key, ())
+            ):
+                valid = False
+                break
+            paired = slot.has_paired or any(c.paired for c in chosen)
+            if slot.pairing and paired and not (slot.has_lead or any(c.lead for c in chosen)):
+                valid = False
+                break
+            total = slot.base_score + sum(c.score for c in chosen)
+            fairness = sum(2 * (c.work + len(booked.get(c.key, ()))) + 1 for c in chosen)
+            cost += abs(total - slot.target) + fairness_weight * fairness
+            for c in chosen:
+                booked.setdefault(c.key, []).append(slot.interval)
+        if valid and (best is None or cost < best):
+            best = cost
+    return best
+
+
+def _random_day(rng):
+    work = {key: rng.randint(0, 3) for key in range(6)}
+    slots = []
+    for interval in (MORNING, MORNING, AFTERNOON, AFTERNOON):
+        keys = rng.sample(range(6), rng.randint(3, 5))
+        slots.append(SlotProblem(
+            seats=2,
+            target=rng.choice([120, 150, 200]),
+            interval=interval,
+            candidates=[
+                Candidate(
+                    key=key, score=rng.choice([30, 60, 90]), work=work[key],
+                    lead=key < 3, paired=key == 5,
+                )
+                for key in keys
+            ],
+            pairing=interval == MORNING,
+        ))
+    return slots
+
+
+class TestSolveDay:
+    """Test the branch-and-bound on hand-built days."""
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_matches_brute_force(self, seed):
+        """The proven optimum equals exhaustive enumeration."""
+        slots = _random_day(random.Random(seed))
+        expected = _brute_force(slots)
+        solution = solve_day(slots)
+        if expected is None:
+            assert solution is None
+            return
+        assert solution.cost == pytest.approx(expected)
+        assert solution.gap == 0.0
+
+    def test_booked_intervals_matter(self):
+        """Equal candidates with different booked seats are not merged."""
+        for seed in range(200):
+            rng = random.Random(seed)
+            slots = []
+            for _ in range(rng.randint(4, 6)):
+                start = rng.randrange(540, 780, 30)
+                slots.append(SlotProblem(
+                    seats=1, target=0, interval=(start, start + rng.choice([60, 120])),
+                    candidates=[Candidate(key, 10, 0) for key in range(1, rng.randint(3, 4))],
+                ))
+            expected = _brute_force(slots)
+            solution = solve_day(slots)
+            if expected is None:
+                assert solution is None
+                continue
+            assert solution.cost == pytest.approx(expected), seed
+            assert solution.gap == 0.0
+
+    def test_chain_of_overlaps(self):
+        """Two identical candidates over a chain of overlapping slots."""
+        slots = [
+            SlotProblem(seats=1, target=0, interval=interval,
+                        candidates=[Candidate(1, 10, 0), Candidate(2, 10, 0)])
+            for interval in ((540, 600), (600, 660), (720, 780), (630, 750))
+        ]
+        solution = solve_day(slots)
+        assert solution.cost == pytest.approx(_brute_force(slots)) == 120.0
+
+    def test_budget_exhaustion_reports_a_valid_gap(self):
+        """Stopped early, the bound still lies below the optimum."""
+        slots = _random_day(random.Random(3))
+        optimum = _brute_force(slots)
+        solution = solve_day(slots, node_limit=len(slots))
+        assert solution.lower_bound <= optimum + 1e-9 <= solution.cost + 1e-9
+        assert 0.0 <= solution.gap < 1.0
+
+    def test_pairing_and_overlap_make_day_infeasible(self):
+        """A lone TYPE_D candidate cannot staff a rehab slot."""
+        slots = [
+            SlotProblem(seats=1, target=100, interval=FULL, pairing=True,
+                        candidates=[Candidate(key=1, score=50, work=0, paired=True)]),
+        ]
+        assert solve_day(slots) is None
+        booked_twice = [
+            SlotProblem(seats=1, target=100, interval=MORNING, candidates=[Candidate(1, 50, 0)]),
+            SlotProblem(seats=1, target=100, interval=FULL, candidates=[Candidate(1, 50, 0)]),
+        ]
+        assert solve_day(booked_twice) is None
+
+
+@pytest.fixture
+def time_slots(time_slots):
+    """Only the Monday slots, so every test run is a single day."""
+    return [slot for slot in time_slots if slot.day_of_week == 0]
+
+
+class TestExactMode:
+    """Test ``optimisation_mode="exact"`` end to end."""
+
+    def test_fills_every_seat_with_zero_gap(self, employees, time_slots, availability):
+        """Every seat is filled, hard rules hold and the gap is proven zero."""
+        report = GenerationReport()
+        shifts = generate_shifts(
+            employees, time_slots, "2025-12-01", "2025-12-21",
+            optimisation_mode="exact", availability=availability, report=report,
+        )
+        assert report.is_complete
+        assert report.optimality_gap == 0.0 and report.heuristic_days == []
+        assert len(shifts) == 3 * 4 * 2
+        for date in {shift.date for shift in shifts}:
+            daily = [shift for shift in shifts if shift.date == date]
+            assert _evaluate_part_time_rule(daily, time_slots) is None
+            for i, a in enumerate(daily):
+                for b in daily[i + 1:]:
+                    if a.employee_id == b.employee_id:
+                        assert not check_time_overlap(a.time_slot, b.time_slot)
+
+    def test_budget_fallback_has_no_gap(self, employees, time_slots, availability, monkeypatch):
+        """Days the search cannot finish are listed and leave the gap unknown."""
+        monkeypatch.setattr(optimizer, "_EXACT_NODE_LIMIT", 1)
+        report = GenerationReport()
+        shifts = generate_shifts(
+            employees, time_slots, "2025-12-01", "2025-12-08",
+            optimisation_mode="exact", availability=availability, report=report,
+        )
+        assert report.is_complete and len(shifts) == 2 * 4 * 2
+        assert report.heuristic_days == ["2025-12-01", "2025-12-08"]
+        assert report.optimality_gap is None
+
+    def test_locked_shift_is_kept(self, employees, time_slots, availability):
+        """Pinned staff count towards the slot and stay in the roster."""
+        locked = {("2025-12-01", "mon_reha_morning", 8)}
+        shifts = generate_shifts(
+            employees, time_slots, "2025-12-01", "2025-12-01",
+            optimisation_mode="exact", availability=availability, locked=locked,
+        )
+        assert locked <= {(s.date, s.time_slot_id, s.employee_id) for s in shifts}
+        assert _evaluate_part_time_rule(shifts, time_slots) is None
@@ -0,0 +1,88 @@
+"""Test suite for the max-flow feasibility pre-check."""
+import pytest
+
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.feasibility import check_feasibility
+from src.shift_scheduler.models import Absence, Employee, EmploymentPattern, TimeSlot
+
+
+def _employee(emp_id, emp_type, reha=70, recep=70):
+    return Employee(
+        id=emp_id, name=f"職員{emp_id}", employee_type=emp_type, employment_type="正職員",
+        employment_pattern_id="full", skill_reha=reha, skill_reception_am=recep,
+        skill_reception_pm=recep, skill_general=50, is_active=True,
+    )
+
+
+def _slot(slot_id, area, period="morning", required=2):
+    start, end = ("08:30", "13:00") if period == "morning" else ("13:00", "18:00")
+    return TimeSlot(
+        id=slot_id, day_of_week=0, period=period, start_time=start, end_time=end,
+        is_active=True, required_staff=required, area=area, display_name=slot_id,
+    )
+
+
+@pytest.fixture
+def pattern():
+    """Full-day pattern covering every test slot."""
+    return EmploymentPattern(
+        id="full", name="フルタイム", category="full_time", start_time="08:30",
+        end_time="18:30", break_hours=1.0, work_hours=8.0, can_work_afternoon=True,
+    )
+
+
+@pytest.fixture
+def slots():
+    """Monday morning slots in both areas."""
+    return [_slot("reha_am", "リハ室"), _slot("recep_am", "受付")]
+
+
+class TestCheckFeasibility:
+    """Test feasibility verdicts and shortage reporting."""
+
+    def test_feasible_when_staff_suffice(self, pattern, slots):
+        """Four distinct eligible employees cover two overlapping slots of two."""
+        employees = [_employee(1, "TYPE_A"), _employee(2, "TYPE_C"),
+                     _employee(3, "TYPE_B"), _employee(4, "TYPE_A")]
+        report = check_feasibility(
+            employees, slots, "2025-12-08", "2025-12-08",
+            availability=AvailabilityIndex([], [pattern]),
+        )
+        assert report.is_feasible
+        assert report.required == report.assignable == 4
+
+    def test_overlapping_slots_share_employees(self, pattern, slots):
+        """An employee cannot cover both overlapping morning slots."""
+        employees = [_employee(1, "TYPE_A"), _employee(2, "TYPE_A"), _employee(3, "TYPE_A")]
+        report = check_feasibility(
+            employees, slots, "2025-12-08", "2025-12-08",
+            availability=AvailabilityIndex([], [pattern]),
+        )
+        assert not report.is_feasible
+        assert report.shortage == 1
+        assert sum(issue.shortage for issue in report.issues) == 1
+        assert report.issues[0].code == "infeasible"
+
+    def test_absences_reported_per_date(self, pattern, slots):
+        """Only the date with absences is reported as short."""
+        employees = [_employee(1, "TYPE_A"), _employee(2, "TYPE_C"),
+                     _employee(3, "TYPE_B"), _employee(4, "TYPE_B")]
+        absence = Absence(id=1, employee_id=2, absence_date="2025-12-08",
+                          absence_type="full_day", reason=None)
+        report = check_feasibility(
+            employees, slots, "2025-12-08", "2025-12-15",
+            availability=AvailabilityIndex([absence], [pattern]),
+        )
+        assert [(issue.date, issue.time_slot_id) for issue in report.issues] == [
+            ("2025-12-08", "reha_am")
+        ]
+
+    def test_type_d_requires_lead(self, pattern):
+        """A rehab slot staffed only by TYPE_D staff is infeasible."""
+        employees = [_employee(1, "TYPE_D"), _employee(2, "TYPE_D"), _employee(3, "TYPE_B")]
+        report = check_feasibility(
+            employees, [_slot("reha_am", "リハ室")], "2025-12-08", "2025-12-08",
+            availability=AvailabilityIndex([], [pattern]),
+        )
+        assert not report.is_feasible
+        assert report.issues[0].available == 1
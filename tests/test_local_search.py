@@ -0,0 +1,68 @@
+"""Test suite for the local-search improvement phase."""
+from src.shift_scheduler.local_search import improve_shifts
+from src.shift_scheduler.optimizer import (
+    _can_assign_to_area,
+    _evaluate_part_time_rule,
+    check_time_overlap,
+    generate_shifts,
+    score_roster,
+)
+
+
+def _assert_valid(shifts, time_slots, availability):
+    for shift in shifts:
+        assert _can_assign_to_area(shift.employee, shift.time_slot)
+        assert availability.is_available(shift.employee, shift.date, shift.time_slot)
+    for i, a in enumerate(shifts):
+        for b in shifts[i + 1:]:
+            if a.employee_id == b.employee_id and a.date == b.date:
+                assert not check_time_overlap(a.time_slot, b.time_slot)
+    for date in {shift.date for shift in shifts}:
+        daily = [shift for shift in shifts if shift.date == date]
+        assert _evaluate_part_time_rule(daily, time_slots) is None
+
+
+class TestImproveShifts:
+    """Test move/swap improvement of a greedy roster."""
+
+    def test_improves_without_breaking_constraints(self, employees, time_slots, availability):
+        """The score never gets worse and every hard rule still holds."""
+        greedy = generate_shifts(
+            employees, time_slots, "2025-12-01", "2025-12-16",
+            optimisation_mode="skill", availability=availability,
+        )
+        improved = improve_shifts(
+            greedy, employees, time_slots, availability=availability,
+            time_budget_s=10.0, max_iterations=3000, seed=1,
+        )
+        assert len(improved) == len(greedy)
+        assert score_roster(improved, employees) < score_roster(greedy, employees)
+        assert [(s.date, s.time_slot_id) for s in improved] == [(s.date, s.time_slot_id) for s in greedy]
+        _assert_valid(improved, time_slots, availability)
+
+    def test_input_roster_is_not_modified(self, employees, time_slots, availability):
+        """The caller's list is left untouched."""
+        greedy = generate_shifts(
+            employees, time_slots, "2025-12-01", "2025-12-02", availability=availability,
+        )
+        snapshot = [(s.date, s.time_slot_id, s.employee_id) for s in greedy]
+        improve_shifts(greedy, employees, time_slots, availability=availability, max_iterations=500, seed=3)
+        assert [(s.date, s.time_slot_id, s.employee_id) for s in greedy] == snapshot
+
+    def test_empty_roster(self, employees, time_slots, availability):
+        """Nothing to improve on an empty roster."""
+        assert improve_shifts([], employees, time_slots, availability=availability) == []
+
+    def test_pinned_assignments_stay(self, employees, time_slots, availability):
+        """Pinned assignments are never moved or swapped."""
+        greedy = generate_shifts(
+            employees, time_slots, "2025-12-01", "2025-12-16",
+            optimisation_mode="skill", availability=availability,
+        )
+        pinned = [s for s in greedy if s.date == "2025-12-01"]
+        improved = improve_shifts(
+            greedy, employees, time_slots, availability=availability,
+            max_iterations=3000, seed=1, pinned=pinned,
+        )
+        kept = {(s.date, s.time_slot_id, s.employee_id) for s in improved}
+        assert {(s.date, s.time_slot_id, s.employee_id) for s in pinned} <= kept
@@ -1,17 +1,24 @@
 """Test suite for optimizer module with comprehensive coverage."""
 import pytest
 from datetime import datetime
-from src.shift_scheduler.models import Employee, TimeSlot, EmploymentPattern
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.models import Absence, Employee, TimeSlot, EmploymentPattern
 from src.shift_scheduler.optimizer import (
     _time_to_minutes,
     check_time_overlap,
+    ShiftOccupancy,
     calculate_skill_score,
     _can_assign_to_area,
+    _SkillMatrix,
     _select_employees_for_slot,
+    _assign_employees_to_slot,
     _evaluate_part_time_rule,
     generate_shifts,
+    generate_shifts_iter,
     calculate_skill_balance,
     ShiftGenerationError,
+    GenerationReport,
+    score_roster,
 )
 
 
@@ -113,6 +120,60 @@ def sample_time_slots():
     ]
 
 
+@pytest.fixture
+def clinic_employees():
+    """A small clinic whose Monday slots can always be staffed."""
+    specs = [
+        ("A1", "TYPE_A", 80, 70, 70, 60),
+        ("A2", "TYPE_A", 60, 60, 60, 50),
+        ("A3", "TYPE_A", 70, 80, 80, 55),
+        ("B1", "TYPE_B", 0, 85, 80, 65),
+        ("B2", "TYPE_B", 0, 60, 65, 50),
+        ("C1", "TYPE_C", 75, 0, 0, 55),
+    ]
+    return [
+        Employee(
+            id=index, name=name, employee_type=emp_type, employment_type="正職員",
+            employment_pattern_id="full_early", skill_reha=reha,
+            skill_reception_am=recep_am, skill_reception_pm=recep_pm,
+            skill_general=general, is_active=True,
+        )
+        for index, (name, emp_type, reha, recep_am, recep_pm, general) in enumerate(specs, 1)
+    ]
+
+
+@pytest.fixture
+def clinic_time_slots():
+    """Monday morning/afternoon slots for both areas."""
+    slots = []
+    for area, prefix in (("リハ室", "reha"), ("受付", "recep")):
+        for period, start, end in (("morning", "08:30", "13:00"), ("afternoon", "13:00", "18:00")):
+            slots.append(
+                TimeSlot(
+                    id=f"mon_{prefix}_{period[:2]}", day_of_week=0, period=period,
+                    start_time=start, end_time=end, is_active=True, required_staff=2,
+                    area=area, display_name=f"{area}（月曜{period}）",
+                )
+            )
+    return slots
+
+
+@pytest.fixture
+def full_time_pattern():
+    """The full-time pattern shared by the clinic employees."""
+    return EmploymentPattern(
+        id="full_early", name="フルタイム（早番）", category="full_time",
+        start_time="08:30", end_time="18:30", break_hours=2.0, work_hours=8.0,
+        can_work_afternoon=True,
+    )
+
+
+@pytest.fixture
+def clinic_availability(full_time_pattern):
+    """In-memory availability with the full-time pattern and no absences."""
+    return AvailabilityIndex([], [full_time_pattern])
+
+
 class TestTimeUtilities:
     """Test time manipulation utility functions."""
 
@@ -176,6 +237,49 @@ class TestTimeOverlap:
         assert not check_time_overlap(slot_a, slot_b)
 
 
+class TestShiftOccupancy:
+    """Test the per-day occupancy map used for double-booking checks."""
+
+    @staticmethod
+    def _slot(start, end):
+        return TimeSlot(
+            id=f"{start}-{end}", day_of_week=0, period="morning", start_time=start,
+            end_time=end, is_active=True, required_staff=1, area="リハ室", display_name="X"
+        )
+
+    def test_conflict_matches_time_overlap(self):
+        """Occupancy agrees with check_time_overlap for booked intervals."""
+        occupancy = ShiftOccupancy()
+        booked = self._slot("08:30", "12:30")
+        occupancy.book("2025-12-08", 1, booked)
+        occupancy.book("2025-12-08", 1, self._slot("15:00", "17:00"))
+
+        for start, end in (("11:00", "14:00"), ("12:30", "15:00"), ("07:00", "08:30"), ("16:00", "18:00")):
+            probe = self._slot(start, end)
+            expected = check_time_overlap(booked, probe) or check_time_overlap(
+                self._slot("15:00", "17:00"), probe
+            )
+            assert occupancy.conflicts("2025-12-08", 1, probe) == expected
+
+    def test_keyed_by_date_and_employee(self):
+        """Bookings do not leak to other dates or employees."""
+        occupancy = ShiftOccupancy()
+        slot = self._slot("08:30", "12:30")
+        occupancy.book("2025-12-08", 1, slot)
+        assert not occupancy.conflicts("2025-12-09", 1, slot)
+        assert not occupancy.conflicts("2025-12-08", 2, slot)
+        assert occupancy.is_working("2025-12-08", 1)
+
+    def test_release(self):
+        """Released bookings no longer conflict."""
+        occupancy = ShiftOccupancy()
+        slot = self._slot("08:30", "12:30")
+        occupancy.book("2025-12-08", 1, slot)
+        occupancy.release("2025-12-08", 1, slot)
+        assert not occupancy.conflicts("2025-12-08", 1, slot)
+        assert not occupancy.is_working("2025-12-08", 1)
+
+
 class TestSkillScoreCalculation:
     """Test skill score calculation logic."""
 
@@ -301,6 +405,84 @@ class TestEmployeeSelection:
         assert len(selected) == 0  # Returns empty if insufficient
 
 
+class TestSkillMatrix:
+    """Test the precomputed employee × slot score matrix."""
+
+    def test_matches_per_pair_functions(self, sample_employees, sample_time_slots):
+        """Every cell agrees with calculate_skill_score and _can_assign_to_area."""
+        matrix = _SkillMatrix(sample_employees, sample_time_slots)
+        for slot in sample_time_slots:
+            assert list(matrix.column(sample_employees, slot)) == [
+                calculate_skill_score(emp, slot) for emp in sample_employees
+            ]
+            assert [matrix.can_assign(emp, slot) for emp in sample_employees] == [
+                _can_assign_to_area(emp, slot) for emp in sample_employees
+            ]
+
+    def test_unknown_slot_falls_back(self, sample_employees, sample_time_slots):
+        """Slots outside the matrix are scored directly."""
+        matrix = _SkillMatrix(sample_employees, sample_time_slots[:1])
+        slot = sample_time_slots[2]
+        assert list(matrix.column(sample_employees, slot)) == [
+            calculate_skill_score(emp, slot) for emp in sample_employees
+        ]
+
+    @pytest.mark.parametrize("mode", ["days", "skill", "balance"])
+    def test_selection_unchanged_by_matrix(self, sample_employees, sample_time_slots, mode):
+        """Selectors pick the same employees with or without the matrix."""
+        slot = sample_time_slots[1]
+        candidates = [e for e in sample_employees if _can_assign_to_area(e, slot)]
+        work_count = {emp.id: 0 for emp in sample_employees}
+        matrix = _SkillMatrix(sample_employees, sample_time_slots)
+        with_matrix = _select_employees_for_slot(
+            candidates, slot, 2, work_count, mode, skills=matrix
+        )
+        assert with_matrix == _select_employees_for_slot(candidates, slot, 2, work_count, mode)
+
+
+class TestPairingDuringSelection:
+    """Test that selection itself never leaves TYPE_D staff without a lead."""
+
+    @pytest.fixture
+    def part_timers(self):
+        return [
+            Employee(
+                id=emp_id, name=f"パート{emp_id}", employee_type="TYPE_D", employment_type="パート",
+                employment_pattern_id="part_morning", skill_reha=60, skill_reception_am=0,
+                skill_reception_pm=0, skill_general=50, is_active=True,
+            )
+            for emp_id in (4, 5)
+        ]
+
+    @pytest.mark.parametrize("mode", ["days", "skill", "balance"])
+    def test_last_seat_goes_to_lead(self, sample_employees, sample_time_slots, part_timers, mode):
+        """The lead is picked even though both part-timers rank ahead of them."""
+        slot = sample_time_slots[0]  # リハ室, 2 seats
+        candidates = part_timers + [sample_employees[0]]
+        work_count = {4: 0, 5: 0, 1: 9}
+
+        selected = _select_employees_for_slot(candidates, slot, 2, work_count, mode)
+
+        assert len(selected) == 2
+        assert sample_employees[0] in selected
+
+    def test_afternoon_morning_workers_without_lead(self, sample_employees, part_timers):
+        """Part-timer morning workers do not take every afternoon seat."""
+        afternoon = TimeSlot(
+            id="mon_pm_reha", day_of_week=0, period="afternoon", start_time="13:00",
+            end_time="18:00", is_active=True, required_staff=2, area="リハ室",
+            display_name="月曜午後リハ室",
+        )
+        available = part_timers + [sample_employees[0]]
+        work_count = {4: 0, 5: 0, 1: 9}
+
+        selected = _assign_employees_to_slot(
+            available, afternoon, "2025-12-08", "days", work_count, [4, 5]
+        )
+
+        assert {e.id for e in selected} == {1, 4}
+
+
 class TestPartTimeRule:
     """Test part-time staff pairing rule validation."""
 
@@ -423,6 +605,333 @@ class TestShiftGeneration:
             generate_shifts(sample_employees, sample_time_slots, "2025-12-10", "2025-12-08")
         assert exc_info.value.issue.code == "invalid_range"
 
+    def test_generate_shifts_with_availability_index(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """A supplied availability index fills every slot on every Monday."""
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-15",
+            availability=clinic_availability,
+        )
+        assert len(shifts) == 2 * len(clinic_time_slots) * 2
+        booked = {(s.date, s.time_slot_id, s.employee_id) for s in shifts}
+        assert len(booked) == len(shifts)
+
+    def test_collect_all_reports_every_shortage(
+        self, clinic_employees, clinic_time_slots, full_time_pattern
+    ):
+        """Collect-all mode keeps going and returns a partial roster."""
+        absences = [
+            Absence(id=i, employee_id=emp_id, absence_date="2025-12-08",
+                    absence_type="full_day", reason=None)
+            for i, emp_id in enumerate((1, 2, 3, 6), 1)
+        ]
+        availability = AvailabilityIndex(absences, [full_time_pattern])
+
+        with pytest.raises(ShiftGenerationError):
+            generate_shifts(
+                clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-15",
+                availability=availability,
+            )
+
+        report = GenerationReport()
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-15",
+            availability=availability, report=report,
+        )
+        assert not report.is_complete
+        assert {issue.time_slot_id for issue in report.issues} == {"mon_reha_mo", "mon_reha_af"}
+        assert all(issue.date == "2025-12-08" for issue in report.issues)
+        assert len([s for s in shifts if s.date == "2025-12-15"]) == 8
+        assert len([s for s in shifts if s.date == "2025-12-08"]) == 4
+
+
+class TestBacktracking:
+    """Test day-level backtracking when the greedy pass dead-ends."""
+
+    @staticmethod
+    def _employee(emp_id, emp_type, reha=70, recep=70):
+        return Employee(
+            id=emp_id, name=f"職員{emp_id}", employee_type=emp_type, employment_type="正職員",
+            employment_pattern_id="full_early", skill_reha=reha, skill_reception_am=recep,
+            skill_reception_pm=recep, skill_general=50, is_active=True,
+        )
+
+    @staticmethod
+    def _slot(slot_id, area, required=1):
+        return TimeSlot(
+            id=slot_id, day_of_week=0, period="morning", start_time="08:30", end_time="13:00",
+            is_active=True, required_staff=required, area=area, display_name=slot_id,
+        )
+
+    def test_recovers_from_starved_later_slot(self, clinic_availability):
+        """Greedy gives the only receptionist to rehab; backtracking reassigns."""
+        employees = [self._employee(1, "TYPE_A"), self._employee(2, "TYPE_C")]
+        slots = [self._slot("reha_am", "リハ室"), self._slot("recep_am", "受付")]
+        shifts = generate_shifts(
+            employees, slots, "2025-12-08", "2025-12-08",
+            optimisation_mode="days", availability=clinic_availability,
+        )
+        assignment = {s.time_slot_id: s.employee_id for s in shifts}
+        assert assignment == {"reha_am": 2, "recep_am": 1}
+
+    def test_still_raises_when_day_is_infeasible(self, clinic_availability):
+        """Backtracking does not hide genuine shortages."""
+        employees = [self._employee(1, "TYPE_A")]
+        slots = [self._slot("reha_am", "リハ室"), self._slot("recep_am", "受付")]
+        with pytest.raises(ShiftGenerationError) as exc_info:
+            generate_shifts(
+                employees, slots, "2025-12-08", "2025-12-08",
+                optimisation_mode="days", availability=clinic_availability,
+            )
+        assert exc_info.value.issue.code == "insufficient_staff"
+
+
+class TestMultiStart:
+    """Test best-of-N generation with seeded tie-breaking."""
+
+    def test_never_worse_than_single_start(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Start 0 is the deterministic run, so the best of N cannot score worse."""
+        kwargs = dict(availability=clinic_availability, optimisation_mode="days")
+        single = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-29", **kwargs
+        )
+        best = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-29",
+            n_starts=6, seed=3, **kwargs,
+        )
+        assert len(best) == len(single)
+        assert score_roster(best, clinic_employees) <= score_roster(single, clinic_employees)
+
+    def test_seed_is_reproducible(self, clinic_employees, clinic_time_slots, clinic_availability):
+        """The same seed gives the same roster."""
+        runs = [
+            generate_shifts(
+                clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-15",
+                availability=clinic_availability, n_starts=4, seed=7,
+            )
+            for _ in range(2)
+        ]
+        assert [s.to_dict() for s in runs[0]] == [s.to_dict() for s in runs[1]]
+
+    def test_process_pool_matches_inline(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Running the starts in worker processes picks the same roster."""
+        kwargs = dict(availability=clinic_availability, n_starts=3, seed=1)
+        inline = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-08", **kwargs
+        )
+        pooled = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-08",
+            workers=2, **kwargs,
+        )
+        assert [s.to_dict() for s in pooled] == [s.to_dict() for s in inline]
+
+    def test_raises_when_every_start_fails(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """A genuine shortage still raises."""
+        with pytest.raises(ShiftGenerationError):
+            generate_shifts(
+                clinic_employees[:2], clinic_time_slots, "2025-12-08", "2025-12-08",
+                availability=clinic_availability, n_starts=3,
+            )
+
+
+
+class _StopAfter:
+    """Cancellation token that trips after ``calls`` progress callbacks."""
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.fractions = []
+
+    def __call__(self, fraction, best_score):
+        self.fractions.append(fraction)
+
+    def is_set(self):
+        return len(self.fractions) >= self.calls
+
+
+class TestAnytime:
+    """Test time limits, progress callbacks and cancellation."""
+
+    def test_progress_reaches_completion(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Progress rises to 1.0 and does not change the roster."""
+        progress = []
+        kwargs = dict(availability=clinic_availability)
+        plain = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-14", **kwargs
+        )
+        tracked = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-14",
+            on_progress=lambda fraction, score: progress.append(fraction), **kwargs,
+        )
+        assert [s.to_dict() for s in tracked] == [s.to_dict() for s in plain]
+        assert progress == sorted(progress) and progress[-1] == 1.0
+
+    def test_cancel_returns_days_built_so_far(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Cancelling mid-run returns the roster of the finished days."""
+        token = _StopAfter(8)
+        report = GenerationReport()
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-31",
+            availability=clinic_availability, report=report,
+            on_progress=token, cancel=token,
+        )
+        assert report.stopped == "cancelled" and not report.is_complete
+        assert {s.date for s in shifts} == {"2025-12-01", "2025-12-08"}
+
+    def test_expired_time_limit(self, clinic_employees, clinic_time_slots, clinic_availability):
+        """A time limit that has already run out stops before the first day."""
+        report = GenerationReport()
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-31",
+            availability=clinic_availability, report=report, time_limit_s=0,
+        )
+        assert shifts == [] and report.stopped == "timeout"
+
+    def test_multi_start_keeps_best_finished_start(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Cancelling between starts returns the best start finished so far."""
+        kwargs = dict(availability=clinic_availability, seed=5)
+        first = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-14", **kwargs
+        )
+        token = _StopAfter(15)  # 14 days of start 0, then its completion
+        report = GenerationReport()
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-14",
+            n_starts=4, report=report, on_progress=token, cancel=token, **kwargs,
+        )
+        assert report.stopped == "cancelled"
+        assert token.fractions[-1] == pytest.approx(0.25)
+        assert [s.to_dict() for s in shifts] == [s.to_dict() for s in first]
+
+
+class TestGenerateShiftsIter:
+    """Test the day-by-day streaming generator."""
+
+    def test_days_match_generate_shifts(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Streaming yields one list per date with the same assignments."""
+        kwargs = dict(availability=clinic_availability)
+        days = list(
+            generate_shifts_iter(
+                clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-14", **kwargs
+            )
+        )
+        roster = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-14", **kwargs
+        )
+        assert len(days) == 14
+        assert all(len({s.date for s in day}) <= 1 for day in days)
+        assert [s.to_dict() for day in days for s in day] == [s.to_dict() for s in roster]
+
+    def test_pinned_shifts_are_yielded_with_their_day(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """A locked shift appears in its own day's list."""
+        locked = {("2025-12-08", "mon_reha_mo", 6)}
+        days = list(
+            generate_shifts_iter(
+                clinic_employees, clinic_time_slots, "2025-12-01", "2025-12-08",
+                availability=clinic_availability, locked=locked,
+            )
+        )
+        assert (days[-1][0].date, days[-1][0].time_slot_id, days[-1][0].employee_id) == (
+            "2025-12-08", "mon_reha_mo", 6
+        )
+        assert len(days[-1]) == 2 * len(clinic_time_slots)
+
+    def test_inputs_are_validated_before_iteration(self, clinic_time_slots):
+        """Invalid inputs raise when the generator is created."""
+        with pytest.raises(ShiftGenerationError):
+            generate_shifts_iter([], clinic_time_slots, "2025-12-01", "2025-12-02")
+
+class TestWarmStart:
+    """Test generation seeded with pinned shifts and carried-over work counts."""
+
+    def test_pinned_shifts_keep_their_seats(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Pinned shifts are returned unchanged and only open seats are filled."""
+        first = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-08",
+            availability=clinic_availability,
+        )
+        pinned = [s for s in first if s.time_slot_id == "mon_reha_mo"][:1]
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-08",
+            availability=clinic_availability, initial_shifts=pinned,
+        )
+        assert len(shifts) == len(first)
+        assert shifts[0] is pinned[0]
+        reha_morning = [s.employee_id for s in shifts if s.time_slot_id == "mon_reha_mo"]
+        assert len(reha_morning) == len(set(reha_morning)) == 2
+
+    def test_fully_pinned_slot_is_skipped(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """A slot whose seats are all pinned receives nobody new."""
+        first = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-15",
+            availability=clinic_availability,
+        )
+        pinned = [s for s in first if s.date == "2025-12-08"]
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-15",
+            availability=clinic_availability, initial_shifts=pinned,
+        )
+        assert [s for s in shifts if s.date == "2025-12-08"] == pinned
+        assert len(shifts) == len(first)
+
+    def test_carry_over_steers_work_counts(
+        self, clinic_employees, clinic_time_slots, clinic_availability
+    ):
+        """Employees who worked a lot last period are chosen last."""
+        carry_over = {emp.id: 0 for emp in clinic_employees}
+        carry_over[1] = 10
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-08",
+            optimisation_mode="days", availability=clinic_availability,
+            carry_over_work_count=carry_over,
+        )
+        assert 1 not in {s.employee_id for s in shifts if s.time_slot.period == "morning"}
+
+
+class TestLockedAssignments:
+    """Test locked (date, time_slot_id, employee_id) tuples."""
+
+    def test_locked_tuple_is_kept(self, clinic_employees, clinic_time_slots, clinic_availability):
+        """A locked employee keeps the seat and the slot still gets required staff."""
+        locked = {("2025-12-08", "mon_reha_mo", 6)}
+        shifts = generate_shifts(
+            clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-08",
+            availability=clinic_availability, locked=locked,
+        )
+        reha_morning = [s.employee_id for s in shifts if s.time_slot_id == "mon_reha_mo"]
+        assert 6 in reha_morning and len(reha_morning) == 2
+        assert len(shifts) == 2 * len(clinic_time_slots)
+
+    def test_unknown_lock_raises(self, clinic_employees, clinic_time_slots, clinic_availability):
+        """Locks naming unknown employees or slots are rejected."""
+        with pytest.raises(ShiftGenerationError) as exc_info:
+            generate_shifts(
+                clinic_employees, clinic_time_slots, "2025-12-08", "2025-12-08",
+                availability=clinic_availability, locked=[("2025-12-08", "nope", 1)],
+            )
+        assert exc_info.value.issue.code == "invalid_lock"
+
 
 class TestSkillBalance:
     """Test skill balance calculation."""
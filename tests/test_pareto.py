@@ -0,0 +1,71 @@
+"""Test suite for the skill-vs-fairness Pareto front."""
+import pytest
+
+from src.shift_scheduler.optimizer import (
+    _can_assign_to_area,
+    _evaluate_part_time_rule,
+    generate_shifts,
+    ShiftGenerationError,
+)
+from src.shift_scheduler.pareto import generate_pareto_front, roster_objectives
+
+START, END = "2025-12-01", "2026-01-31"
+
+
+class TestGenerateParetoFront:
+    """Test the non-dominated roster set."""
+
+    def test_front_is_non_dominated_and_ordered(self, employees, time_slots, availability):
+        """Skill spread rises while work spread falls, and every roster is valid."""
+        front = generate_pareto_front(
+            employees, time_slots, START, END, availability=availability, seed=0,
+        )
+        assert len(front) >= 2
+        for better, worse in zip(front, front[1:]):
+            assert better.skill_std <= worse.skill_std
+            assert better.work_std > worse.work_std
+        for roster in front:
+            assert (roster.skill_std, roster.work_std) == pytest.approx(
+                roster_objectives(roster.shifts, employees)
+            )
+            assert all(_can_assign_to_area(s.employee, s.time_slot) for s in roster.shifts)
+            assert _evaluate_part_time_rule(roster.shifts, time_slots) is None
+
+    def test_default_seed_is_repeatable(self, employees, time_slots, availability):
+        """Without a seed two calls give the same front."""
+        first, second = (
+            generate_pareto_front(employees, time_slots, START, END, availability=availability)
+            for _ in range(2)
+        )
+        assert [[s.to_dict() for s in r.shifts] for r in first] == [
+            [s.to_dict() for s in r.shifts] for r in second
+        ]
+
+    def test_mode_rosters_match_generate_shifts(self, employees, time_slots, availability):
+        """Sharing the precomputation does not change the mode rosters."""
+        front = generate_pareto_front(
+            employees, time_slots, START, END, availability=availability, iterations=0,
+        )
+        by_label = {roster.label: roster for roster in front}
+        assert "skill" in by_label
+        expected = generate_shifts(
+            employees, time_slots, START, END, optimisation_mode="skill",
+            availability=availability,
+        )
+        assert [s.to_dict() for s in by_label["skill"].shifts] == [s.to_dict() for s in expected]
+
+    def test_locked_assignment_is_kept_everywhere(self, employees, time_slots, availability):
+        """Every front roster keeps the locked shift."""
+        locked = {("2025-12-02", "tue_reha_morning", 8)}
+        front = generate_pareto_front(
+            employees, time_slots, START, END, availability=availability, locked=locked, seed=1,
+        )
+        for roster in front:
+            assert locked <= {(s.date, s.time_slot_id, s.employee_id) for s in roster.shifts}
+
+    def test_shortage_raises(self, employees, time_slots, availability):
+        """When no mode can staff the slots the first error is raised."""
+        with pytest.raises(ShiftGenerationError):
+            generate_pareto_front(
+                employees[:3], time_slots, START, END, availability=availability,
+            )
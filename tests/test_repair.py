@@ -0,0 +1,122 @@
+"""Test suite for incremental roster repair."""
+import pytest
+
+from src.shift_scheduler import database
+from src.shift_scheduler.database import (
+    create_employee,
+    create_shift,
+    init_database,
+    list_employees,
+    list_shifts,
+    list_time_slots,
+    record_absence,
+)
+from src.shift_scheduler.optimizer import WorkLimits, generate_shifts
+from src.shift_scheduler.repair import load_warm_start, repair_shifts
+
+WEDNESDAY = "2025-12-10"
+
+
+@pytest.fixture
+def stored_roster(tmp_path, monkeypatch):
+    """A temporary database holding a generated Wednesday roster."""
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "shift.db")
+    init_database()
+    for index, emp_type in enumerate(
+        ["TYPE_A", "TYPE_A", "TYPE_A", "TYPE_A", "TYPE_B", "TYPE_B", "TYPE_C", "TYPE_C"], 1
+    ):
+        create_employee(
+            name=f"職員{index}", employee_type=emp_type, employment_type="正職員",
+            employment_pattern_id="full_early", skill_reha=60 + index,
+            skill_reception_am=70, skill_reception_pm=70, skill_general=50,
+        )
+    slots = [slot for slot in list_time_slots() if slot.day_of_week == 2]
+    for shift in generate_shifts(list_employees(), slots, WEDNESDAY, WEDNESDAY):
+        create_shift(shift.date, shift.time_slot_id, shift.employee_id)
+    return list_shifts(WEDNESDAY, WEDNESDAY)
+
+
+def _assignments(rows):
+    return {(row["time_slot_id"], row["employee_id"]) for row in rows}
+
+
+class TestRepairShifts:
+    """Test that repairs touch only the affected seats."""
+
+    def test_no_change_without_absence(self, stored_roster):
+        """Employees whose availability did not change keep their seats."""
+        employee_id = stored_roster[0]["employee_id"]
+        result = repair_shifts(WEDNESDAY, WEDNESDAY, [employee_id])
+        assert result.removed == [] and result.added == []
+        assert _assignments(list_shifts(WEDNESDAY, WEDNESDAY)) == _assignments(stored_roster)
+
+    def test_morning_absence_refills_only_morning_seat(self, stored_roster):
+        """A morning absence replaces that seat and leaves the rest untouched."""
+        morning = next(row for row in stored_roster if row["time_slot_id"].endswith("_am"))
+        employee_id = morning["employee_id"]
+        record_absence(employee_id, WEDNESDAY, "morning")
+
+        result = repair_shifts(WEDNESDAY, WEDNESDAY, [employee_id])
+
+        assert result.is_complete
+        assert [row["id"] for row in result.removed] == [morning["id"]]
+        assert len(result.added) == 1
+        replacement = result.added[0]
+        assert replacement.time_slot_id == morning["time_slot_id"]
+        assert replacement.employee_id != employee_id
+
+        after = _assignments(list_shifts(WEDNESDAY, WEDNESDAY))
+        before = _assignments(stored_roster)
+        assert before - after == {(morning["time_slot_id"], employee_id)}
+        assert after - before == {(replacement.time_slot_id, replacement.employee_id)}
+
+    def test_dry_run_does_not_persist(self, stored_roster):
+        """``persist=False`` computes the diff without writing it."""
+        employee_id = stored_roster[0]["employee_id"]
+        record_absence(employee_id, WEDNESDAY, "full_day")
+        result = repair_shifts(WEDNESDAY, WEDNESDAY, [employee_id], persist=False)
+        assert result.removed
+        assert _assignments(list_shifts(WEDNESDAY, WEDNESDAY)) == _assignments(stored_roster)
+
+    def test_unfillable_seat_is_reported(self, stored_roster):
+        """When nobody can replace the absentee, the gap is reported."""
+        for employee in list_employees():
+            record_absence(employee.id, WEDNESDAY, "full_day")
+        employee_id = stored_roster[0]["employee_id"]
+        result = repair_shifts(WEDNESDAY, WEDNESDAY, [employee_id])
+        assert not result.is_complete
+        assert all(issue.code == "insufficient_staff" for issue in result.issues)
+
+    def test_replacements_keep_work_limits(self, stored_roster):
+        """Nobody who worked the day before takes the seat under a one-day limit."""
+        employee_id = stored_roster[0]["employee_id"]
+        for employee in list_employees():
+            if employee.id != employee_id:
+                create_shift("2025-12-09", "tue_reha_am", employee.id)
+        record_absence(employee_id, WEDNESDAY, "full_day")
+        assert repair_shifts("2025-12-09", WEDNESDAY, [employee_id], persist=False).is_complete
+        limited = repair_shifts(
+            "2025-12-09", WEDNESDAY, [employee_id],
+            limits=WorkLimits(max_consecutive_days=1), persist=False,
+        )
+        assert limited.removed and limited.added == []
+        assert all(issue.code == "insufficient_staff" for issue in limited.issues)
+
+
+class TestLoadWarmStart:
+    """Test loading the stored roster and previous-period work counts."""
+
+    def test_loads_roster_and_carry_over(self, stored_roster):
+        """Stored shifts become pinned and the prior period is counted."""
+        employee_id = stored_roster[0]["employee_id"]
+        create_shift("2025-11-26", stored_roster[0]["time_slot_id"], employee_id)
+        create_shift("2025-11-19", stored_roster[0]["time_slot_id"], employee_id)
+
+        warm = load_warm_start("2025-12-01", "2025-12-31", list_employees(), list_time_slots())
+
+        assert _assignments(
+            {"time_slot_id": s.time_slot_id, "employee_id": s.employee_id}
+            for s in warm.initial_shifts
+        ) == _assignments(stored_roster)
+        assert warm.carry_over_work_count[employee_id] == 1
+        assert sum(warm.carry_over_work_count.values()) == 1
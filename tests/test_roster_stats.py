@@ -0,0 +1,125 @@
+"""Test suite for the running roster statistics."""
+import random
+
+import pytest
+
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.models import Employee, EmploymentPattern, GeneratedShift, TimeSlot
+from src.shift_scheduler.optimizer import (
+    _new_state,
+    _std,
+    calculate_skill_balance,
+    generate_shifts,
+    score_roster,
+)
+from src.shift_scheduler.roster_stats import RosterStatistics, RunningStats
+
+PATTERN = EmploymentPattern(
+    id="full", name="フルタイム", category="full_time", start_time="08:30",
+    end_time="18:30", break_hours=1.0, work_hours=8.0, can_work_afternoon=True,
+)
+
+
+def _employee(emp_id, reha):
+    return Employee(
+        id=emp_id, name=f"職員{emp_id}", employee_type="TYPE_A", employment_type="正職員",
+        employment_pattern_id="full", skill_reha=reha, skill_reception_am=50,
+        skill_reception_pm=50, skill_general=50, is_active=True,
+    )
+
+
+def _slot(day, required=1):
+    return TimeSlot(
+        id=f"d{day}_reha_am", day_of_week=day, period="morning", start_time="08:30",
+        end_time="13:00", is_active=True, required_staff=required, area="リハ室",
+        display_name="リハ室（午前）",
+    )
+
+
+def _shift(date, slot, employee, score):
+    return GeneratedShift(
+        date=date, time_slot_id=slot.id, employee_id=employee.id, employee_name=employee.name,
+        time_slot_name=slot.display_name, start_time=slot.start_time, end_time=slot.end_time,
+        skill_score=score, employee=employee, time_slot=slot,
+    )
+
+
+def test_running_stats_follow_the_values():
+    """Adding, removing and replacing values matches a fresh computation."""
+    rng = random.Random(0)
+    stats, values = RunningStats(), []
+    for _ in range(500):
+        if values and rng.random() < 0.3:
+            stats.remove(values.pop(rng.randrange(len(values))))
+        elif values and rng.random() < 0.5:
+            index = rng.randrange(len(values))
+            new = rng.randint(0, 300)
+            stats.replace(values[index], new)
+            values[index] = new
+        else:
+            values.append(rng.randint(0, 300))
+            stats.add(values[-1])
+        assert stats.count == len(values)
+        assert stats.std == pytest.approx(_std(values), abs=1e-6)
+
+
+class TestRosterStatistics:
+    """Test the per (date, slot) and per-employee populations."""
+
+    def test_dates_of_one_slot_are_separate(self):
+        """The same slot on two dates gives two skill totals."""
+        employees = [_employee(1, 90), _employee(2, 40)]
+        slot = _slot(0)
+        shifts = [
+            _shift("2025-12-01", slot, employees[0], 140),
+            _shift("2025-12-08", slot, employees[1], 90),
+        ]
+        balance = calculate_skill_balance(shifts, [slot])
+        assert balance["avg_skill"] == 115.0
+        assert balance["std_skill"] == 25.0
+        assert (balance["min_skill"], balance["max_skill"]) == (90.0, 140.0)
+
+    def test_updates_match_score_roster(self):
+        """Random add/remove/reassign sequences keep both objectives exact."""
+        rng = random.Random(1)
+        employees = [_employee(i, 40 + 10 * i) for i in range(1, 6)]
+        slots = [_slot(day, required=2) for day in range(5)]
+        stats, roster = RosterStatistics(employees), []
+        for _ in range(400):
+            action = rng.random()
+            if roster and action < 0.3:
+                stats.remove(roster.pop(rng.randrange(len(roster))))
+            elif roster and action < 0.6:
+                index = rng.randrange(len(roster))
+                old = roster[index]
+                new = _shift(old.date, old.time_slot, rng.choice(employees), rng.randint(50, 150))
+                stats.reassign(old, new)
+                roster[index] = new
+            else:
+                slot = rng.choice(slots)
+                shift = _shift(f"2025-12-0{slot.day_of_week + 1}", slot, rng.choice(employees), rng.randint(50, 150))
+                stats.add(shift)
+                roster.append(shift)
+            assert stats.score() == pytest.approx(score_roster(roster, employees), abs=1e-6)
+        expected = calculate_skill_balance(roster, slots)
+        for key, value in stats.skill_balance().items():
+            assert value == pytest.approx(expected[key])
+
+    def test_generation_state_tracks_the_schedule(self):
+        """The state's statistics follow commits and rollbacks."""
+        employees = [_employee(i, 40 + 10 * i) for i in range(1, 5)]
+        slots = [_slot(day, required=2) for day in range(5)]
+        availability = AvailabilityIndex([], [PATTERN])
+        shifts = generate_shifts(
+            employees, slots, "2025-12-01", "2025-12-05", availability=availability
+        )
+        state = _new_state(
+            employees, slots, "2025-12-01", "2025-12-05", availability, None,
+            carry_over_work_count={1: 7},
+        )
+        state.commit(shifts[:6])
+        state.commit(shifts[6:])
+        assert state.stats.score() == pytest.approx(score_roster(shifts, employees))
+        state.rollback(3)
+        assert state.stats.score() == pytest.approx(score_roster(shifts[:3], employees))
+        assert state.work_count[1] - state.stats.work_count[1] == 7
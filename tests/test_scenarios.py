@@ -0,0 +1,170 @@
+"""Test suite for in-memory what-if scenarios."""
+import pytest
+
+from src.shift_scheduler import database
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.database import (
+    create_employee,
+    init_database,
+    list_employees,
+    list_shifts,
+    record_absence,
+)
+from src.shift_scheduler.models import Employee, EmploymentPattern, TimeSlot
+from src.shift_scheduler.optimizer import calculate_skill_balance
+from src.shift_scheduler.scenarios import (
+    Scenario,
+    ScenarioInputs,
+    absence_days,
+    run_scenarios,
+)
+
+MONDAY = "2025-12-01"
+FRIDAY = "2025-12-05"
+
+PATTERN = EmploymentPattern(
+    id="full", name="フルタイム", category="full_time", start_time="08:30",
+    end_time="18:30", break_hours=1.0, work_hours=8.0, can_work_afternoon=True,
+)
+
+
+def _employee(emp_id, reha, active=True):
+    return Employee(
+        id=emp_id, name=f"職員{emp_id}", employee_type="TYPE_A", employment_type="正職員",
+        employment_pattern_id="full", skill_reha=reha, skill_reception_am=50,
+        skill_reception_pm=50, skill_general=50, is_active=active,
+    )
+
+
+def _slots():
+    return [
+        TimeSlot(
+            id=f"d{day}_reha_am", day_of_week=day, period="morning", start_time="08:30",
+            end_time="13:00", is_active=True, required_staff=1, area="リハ室",
+            display_name="リハ室（午前）",
+        )
+        for day in range(5)
+    ]
+
+
+@pytest.fixture
+def inputs():
+    """A week of one リハ室 slot per day; employee 3 is inactive."""
+    return ScenarioInputs(
+        start_date=MONDAY,
+        end_date=FRIDAY,
+        employees=[_employee(1, 90), _employee(2, 40), _employee(3, 70, active=False)],
+        time_slots=_slots(),
+        availability=AvailabilityIndex([], [PATTERN]),
+        locked=[(MONDAY, "d0_reha_am", 1)],
+    )
+
+
+def test_absence_days_cover_the_range():
+    """One unsaved absence per day of the range."""
+    absences = absence_days(7, "2025-12-29", "2026-01-02", absence_type="morning")
+    assert [a.absence_date for a in absences] == [
+        "2025-12-29", "2025-12-30", "2025-12-31", "2026-01-01", "2026-01-02",
+    ]
+    assert {(a.employee_id, a.absence_type) for a in absences} == {(7, "morning")}
+
+
+class TestApply:
+    """Test the overrides on top of the loaded inputs."""
+
+    def test_baseline_is_the_loaded_situation(self, inputs):
+        """A scenario without overrides keeps the active employees and every lock."""
+        employees, time_slots, availability, locked = inputs.apply(Scenario("現状"))
+        assert [emp.id for emp in employees] == [1, 2]
+        assert time_slots == inputs.time_slots
+        assert availability is inputs.availability
+        assert locked == inputs.locked
+
+    def test_overrides_do_not_touch_the_inputs(self, inputs):
+        """Overrides work on copies of the employees and slots."""
+        scenario = Scenario(
+            "変更", required_staff={"d1_reha_am": 2}, active={1: False, 3: True},
+            absences=absence_days(2, MONDAY),
+        )
+        employees, time_slots, availability, locked = inputs.apply(scenario)
+        assert [emp.id for emp in employees] == [2, 3]
+        assert time_slots[1].required_staff == 2
+        assert inputs.time_slots[1].required_staff == 1
+        assert not inputs.employees[2].is_active
+        assert not availability.is_available(employees[0], MONDAY, time_slots[0])
+        assert inputs.availability.is_available(employees[0], MONDAY, time_slots[0])
+        assert locked == []
+
+    def test_absence_on_a_locked_day_drops_the_lock(self, inputs):
+        """A locked employee made absent no longer holds the locked seat."""
+        _, _, _, locked = inputs.apply(Scenario("休み", absences=absence_days(1, MONDAY)))
+        assert locked == []
+        (result,) = run_scenarios([Scenario("職員1が月曜休み", absences=absence_days(1, MONDAY))], inputs)
+        assert result.dropped_locks == [(MONDAY, "d0_reha_am", 1)]
+        assert result.to_row()["dropped_locks"] == 1
+        assert [s.employee_id for s in result.shifts if s.date == MONDAY] == [2]
+
+
+class TestRunScenarios:
+    """Test the comparative runs."""
+
+    def test_metrics_per_scenario(self, inputs):
+        """Each result carries its roster, issues and skill balance."""
+        baseline, absent, staffed = run_scenarios(
+            [
+                Scenario("現状"),
+                Scenario("職員1が休む", absences=absence_days(1, "2025-12-02", FRIDAY)),
+                Scenario("火曜は3人", required_staff={"d1_reha_am": 3}),
+            ],
+            inputs,
+        )
+        assert [r.name for r in (baseline, absent, staffed)] == ["現状", "職員1が休む", "火曜は3人"]
+        assert baseline.metrics == calculate_skill_balance(baseline.shifts, inputs.time_slots)
+        assert not baseline.issues and len(baseline.shifts) == 5
+
+        assert {s.employee_id for s in absent.shifts if s.date > MONDAY} == {2}
+        assert absent.metrics["avg_skill"] < baseline.metrics["avg_skill"]
+
+        assert staffed.shortage == 1
+        assert staffed.to_row()["shortage"] == 1
+
+    def test_deactivating_everyone_is_an_issue(self, inputs):
+        """Invalid scenario inputs become the result's issue."""
+        (result,) = run_scenarios([Scenario("全員停止", active={1: False, 2: False})], inputs)
+        assert result.shifts == [] and result.issues
+        assert result.metrics["avg_skill"] == 0.0
+
+    def test_worker_pool_matches_sequential_run(self, inputs):
+        """Scenarios in worker processes give the same rosters."""
+        scenarios = [Scenario("現状"), Scenario("職員3が復帰", active={3: True})]
+        pooled = run_scenarios(scenarios, inputs, workers=2)
+        serial = run_scenarios(scenarios, inputs)
+        assert [r.to_row() for r in pooled] == [r.to_row() for r in serial]
+
+
+def test_load_leaves_the_database_untouched(tmp_path, monkeypatch):
+    """Scenarios read the database once and never write to it."""
+    db_path = tmp_path / "shift.db"
+    monkeypatch.setattr(database, "DB_PATH", db_path)
+    init_database()
+    ids = [
+        create_employee(
+            name=f"職員{i}", employee_type="TYPE_A", employment_type="正職員",
+            employment_pattern_id="full_early", skill_reha=60, skill_reception_am=70,
+            skill_reception_pm=70, skill_general=50,
+        )
+        for i in range(5)
+    ]
+    record_absence(ids[0], "2025-12-10", "full_day", None)
+    before = db_path.read_bytes()
+
+    inputs = ScenarioInputs.load("2025-12-08", "2025-12-13")
+    results = run_scenarios(
+        [Scenario("現状"), Scenario("職員2が休む", absences=absence_days(ids[1], "2025-12-08", "2025-12-13"))],
+        inputs,
+    )
+    assert all(s.employee_id != ids[0] for s in results[0].shifts if s.date == "2025-12-10")
+    assert all(s.employee_id != ids[1] for s in results[1].shifts)
+    assert db_path.read_bytes() == before
+    assert list_shifts("2025-12-08", "2025-12-13") == []
+    assert len(list_employees()) == 5
@@ -0,0 +1,162 @@
+"""Test suite for the candidate scoring engine."""
+from dataclasses import replace
+
+import pytest
+
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.models import Employee, EmploymentPattern, TimeSlot
+from src.shift_scheduler.optimizer import (
+    ShiftOccupancy,
+    _SelectionContext,
+    _select_employees_for_slot,
+    generate_shifts,
+)
+from src.shift_scheduler.scoring import MODE_WEIGHTS, ScoringWeights, resolve_weights
+
+
+def _employee(emp_id, recep):
+    return Employee(
+        id=emp_id, name=f"職員{emp_id}", employee_type="TYPE_B", employment_type="正職員",
+        employment_pattern_id="full", skill_reha=0, skill_reception_am=recep,
+        skill_reception_pm=recep, skill_general=50, is_active=True,
+    )
+
+
+@pytest.fixture
+def reception():
+    """A one-seat afternoon reception slot aiming at 130 points (80 + general 50)."""
+    return TimeSlot(
+        id="mon_recep_pm", day_of_week=0, period="afternoon", start_time="13:00",
+        end_time="18:00", is_active=True, required_staff=1, area="受付",
+        display_name="月曜午後受付", target_skill_score=130,
+    )
+
+
+@pytest.fixture
+def morning_reception():
+    return TimeSlot(
+        id="mon_recep_am", day_of_week=0, period="morning", start_time="08:30",
+        end_time="13:00", is_active=True, required_staff=1, area="受付",
+        display_name="月曜午前受付",
+    )
+
+
+class TestScoringWeights:
+    """Test mode resolution and the individual score terms."""
+
+    def test_modes_resolve_to_their_weights(self):
+        """Built-in names map to their weights; custom weights pass through."""
+        assert resolve_weights("days") == MODE_WEIGHTS["days"]
+        assert resolve_weights("exact") == MODE_WEIGHTS["balance"]
+        custom = ScoringWeights(work=2.0)
+        assert resolve_weights(custom) is custom
+
+    def test_skill_weight_scales_the_deviation(self, reception):
+        """A low skill_weight lets the work term win, a high one the skill term."""
+        close, rested = _employee(1, 80), _employee(2, 30)
+        work_count = {1: 2, 2: 0}
+        weights = ScoringWeights(work=10.0, skill_deviation=1.0)
+        picked = _select_employees_for_slot([close, rested], reception, 1, work_count, weights)
+        assert picked == [close]
+        light = replace(reception, skill_weight=0.1)
+        picked = _select_employees_for_slot([close, rested], light, 1, work_count, weights)
+        assert picked == [rested]
+
+    def test_zero_skill_weight_only_affects_custom_weights(self, reception):
+        """Built-in modes keep their skill term; custom weights drop it in the slot."""
+        first, close = _employee(1, 30), _employee(2, 80)
+        ignored = replace(reception, skill_weight=0.0)
+        work_count = {1: 0, 2: 0}
+        for mode in ("skill", "balance"):
+            assert _select_employees_for_slot([first, close], ignored, 1, work_count, mode) == [close]
+        weights = ScoringWeights(skill_deviation=1.0)
+        assert _select_employees_for_slot([first, close], reception, 1, work_count, weights) == [close]
+        assert _select_employees_for_slot([first, close], ignored, 1, work_count, weights) == [first]
+
+    def test_consecutive_days_are_penalised(self, reception, morning_reception):
+        """The candidate working the days before ranks behind a rested one."""
+        tired, rested = _employee(1, 80), _employee(2, 80)
+        occupancy = ShiftOccupancy()
+        for day in ("2025-12-05", "2025-12-06", "2025-12-07"):
+            occupancy.book(day, tired.id, morning_reception)
+        assert occupancy.streak("2025-12-08", tired.id, 14) == 3
+        context = _SelectionContext("2025-12-08", occupancy)
+        work_count = {1: 0, 2: 0}
+        assert _select_employees_for_slot(
+            [tired, rested], reception, 1, work_count, "days", context=context
+        ) == [tired]
+        assert _select_employees_for_slot(
+            [tired, rested], reception, 1, work_count,
+            ScoringWeights(work=1.0, consecutive_days=1.0), context=context,
+        ) == [rested]
+
+    def test_continuity_favours_morning_workers(self, reception):
+        """An afternoon candidate who worked the morning gets the bonus."""
+        first, morning = _employee(1, 80), _employee(2, 80)
+        context = _SelectionContext("2025-12-08", ShiftOccupancy(), morning_workers=[2])
+        picked = _select_employees_for_slot(
+            [first, morning], reception, 1, {1: 0, 2: 0},
+            ScoringWeights(work=1.0, continuity=0.5), context=context,
+        )
+        assert picked == [morning]
+
+
+class TestCustomWeightsInGeneration:
+    """Test ``generate_shifts`` driven by explicit weights."""
+
+    def test_balance_weights_reproduce_balance_mode(self, reception, morning_reception):
+        """Passing the balance weights is the same as naming the mode."""
+        employees = [_employee(i, recep) for i, recep in enumerate((90, 70, 50, 30), 1)]
+        slots = [replace(slot, required_staff=2) for slot in (morning_reception, reception)]
+        pattern = EmploymentPattern(
+            id="full", name="フルタイム", category="full_time", start_time="08:30",
+            end_time="18:30", break_hours=1.0, work_hours=8.0, can_work_afternoon=True,
+        )
+        availability = AvailabilityIndex([], [pattern])
+        named = generate_shifts(
+            employees, slots, "2025-12-01", "2025-12-28", availability=availability,
+        )
+        weighted = generate_shifts(
+            employees, slots, "2025-12-01", "2025-12-28", availability=availability,
+            optimisation_mode=MODE_WEIGHTS["balance"],
+        )
+        assert [s.to_dict() for s in weighted] == [s.to_dict() for s in named]
+
+
+class TestStaticScoreHeap:
+    """Test the heap selection used when scores do not change between picks."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_repeated_argmin(self, seed):
+        """Heap picks equal repeated first-minimum scans, lead rule included."""
+        import random
+
+        rng = random.Random(seed)
+        types = ["TYPE_A", "TYPE_C", "TYPE_D"]
+        candidates = [
+            Employee(
+                id=i, name=f"職員{i}", employee_type=rng.choice(types), employment_type="正職員",
+                employment_pattern_id="full", skill_reha=rng.randint(30, 90),
+                skill_reception_am=0, skill_reception_pm=0, skill_general=50, is_active=True,
+            )
+            for i in range(1, 41)
+        ]
+        work_count = {e.id: rng.randint(0, 4) for e in candidates}
+        slot = TimeSlot(
+            id="mon_reha_am", day_of_week=0, period="morning", start_time="08:30",
+            end_time="13:00", is_active=True, required_staff=5, area="リハ室",
+            display_name="月曜午前リハ室",
+        )
+        picked = _select_employees_for_slot(candidates, slot, 5, work_count, "days")
+
+        remaining, expected = list(candidates), []
+        for seats_left in range(5, 0, -1):
+            pool = remaining
+            has_lead = any(e.employee_type != "TYPE_D" for e in expected)
+            leads = [e for e in remaining if e.employee_type != "TYPE_D"]
+            if seats_left == 1 and not has_lead and leads:
+                pool = leads
+            chosen = min(pool, key=lambda e: work_count[e.id])
+            expected.append(chosen)
+            remaining.remove(chosen)
+        assert picked == expected
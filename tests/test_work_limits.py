@@ -0,0 +1,213 @@
+"""Test suite for the consecutive-day and weekly-hours work limits."""
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+from src.shift_scheduler.availability import AvailabilityIndex
+from src.shift_scheduler.decomposition import generate_shifts_by_blocks
+from src.shift_scheduler.local_search import improve_shifts
+from src.shift_scheduler.models import TimeSlot
+from src.shift_scheduler.optimizer import (
+    GenerationReport,
+    WorkLimits,
+    _WorkLimitCounters,
+    generate_shifts,
+)
+from src.shift_scheduler.pareto import generate_pareto_front
+
+START, END = "2025-12-01", "2025-12-21"
+
+
+@pytest.fixture
+def patterns(pattern):
+    """The full-time pattern of 8 working hours a day."""
+    return [pattern]
+
+
+@pytest.fixture
+def employees(employees):
+    """The shared staff and a ninth TYPE_A, enough to staff a limited week."""
+    ninth = replace(
+        employees[0], id=9, name="職員9", skill_reha=70, skill_reception_am=70,
+        skill_reception_pm=70,
+    )
+    return [*employees, ninth]
+
+
+@pytest.fixture
+def time_slots():
+    """Monday–Saturday morning/afternoon slots in both areas, one seat each."""
+    return [
+        TimeSlot(
+            id=f"{day}_{code}_{period}", day_of_week=day, period=period, start_time=start,
+            end_time=end, is_active=True, required_staff=1, area=area,
+            display_name=f"{day}_{code}_{period}",
+        )
+        for day in range(6)
+        for area, code in (("リハ室", "reha"), ("受付", "recep"))
+        for period, start, end in (("morning", "08:30", "13:00"), ("afternoon", "13:00", "18:00"))
+    ]
+
+
+def _worked_days(shifts):
+    days = {}
+    for shift in shifts:
+        days.setdefault(shift.employee_id, set()).add(date.fromisoformat(shift.date))
+    return days
+
+
+def _longest_run(days):
+    longest = 0
+    for day in days:
+        if day - timedelta(days=1) not in days:
+            run = 1
+            while day + timedelta(days=run) in days:
+                run += 1
+            longest = max(longest, run)
+    return longest
+
+
+def _weekly_hours(shifts, daily_cap_hours):
+    """Hours per (employee, ISO week), each day capped at ``daily_cap_hours``."""
+    minutes = {}
+    for shift in shifts:
+        key = (shift.employee_id, shift.date)
+        start_h, start_m = map(int, shift.start_time.split(":"))
+        end_h, end_m = map(int, shift.end_time.split(":"))
+        minutes[key] = minutes.get(key, 0) + (end_h - start_h) * 60 + end_m - start_m
+    weeks = {}
+    for (employee_id, day), total in minutes.items():
+        week = (employee_id, date.fromisoformat(day).isocalendar()[1])
+        weeks[week] = weeks.get(week, 0) + min(total, daily_cap_hours * 60) / 60
+    return weeks
+
+
+class TestWorkLimitCounters:
+    """Test the rolling counters on hand-booked shifts."""
+
+    def test_consecutive_days_counts_both_sides_and_undoes(self, employees, patterns, time_slots):
+        """A day joining two runs is rejected; releasing a day frees it again."""
+        counters = _WorkLimitCounters(WorkLimits(max_consecutive_days=3), employees, patterns)
+        slot = time_slots[0]
+        for day in ("2025-12-01", "2025-12-02", "2025-12-04"):
+            counters.book(1, day, slot)
+        assert counters.violation(1, "2025-12-03", slot) == "連続勤務の上限（3日）を超えます"
+        assert counters.violation(1, "2025-12-02", time_slots[1]) is None
+        counters.release(1, "2025-12-01", slot)
+        assert counters.violation(1, "2025-12-03", slot) is None
+
+    def test_weekly_hours_cap_the_day_at_work_hours(self, employees, patterns, time_slots):
+        """A 9.5-hour full day counts as the pattern's 8 hours, so five days fit a 40-hour week."""
+        counters = _WorkLimitCounters(
+            WorkLimits(max_consecutive_days=None), employees, patterns
+        )
+        morning, afternoon = time_slots[0], time_slots[1]
+        for offset in range(5):
+            day = f"2025-12-0{1 + offset}"
+            counters.book(1, day, morning)
+            counters.book(1, day, afternoon)
+        assert counters.violation(1, "2025-12-06", morning) == "週の労働時間の上限（40時間）を超えます"
+        # The next Monday starts a new week.
+        assert counters.violation(1, "2025-12-08", morning) is None
+
+    def test_employee_without_pattern_uses_default_weekly_hours(self, employees, patterns, time_slots):
+        """Slot time counts in full against ``default_weekly_hours``."""
+        employees[0].employment_pattern_id = None
+        counters = _WorkLimitCounters(
+            WorkLimits(max_consecutive_days=None, default_weekly_hours=9.5), employees, patterns
+        )
+        counters.book(1, "2025-12-01", time_slots[0])
+        counters.book(1, "2025-12-02", time_slots[1])
+        assert counters.violation(1, "2025-12-03", time_slots[0]) == "週の労働時間の上限（9.5時間）を超えます"
+
+
+class TestLimitsInGeneration:
+    """Test the limits as hard rules of the generators."""
+
+    @pytest.mark.parametrize("mode", ["skill", "balance", "exact"])
+    def test_generated_roster_respects_limits(self, employees, patterns, time_slots, mode):
+        """No employee works more than two days in a row or 16 hours a week."""
+        limits = WorkLimits(max_consecutive_days=2, weekly_workdays=2.0)
+        report = GenerationReport()
+        shifts = generate_shifts(
+            employees, time_slots, START, END, optimisation_mode=mode,
+            availability=AvailabilityIndex([], patterns), report=report, limits=limits,
+        )
+        assert report.is_complete
+        assert len(shifts) == 18 * 4
+        assert max(_longest_run(days) for days in _worked_days(shifts).values()) <= 2
+        assert max(_weekly_hours(shifts, 8).values()) <= 16
+
+    def test_without_limits_the_roster_breaks_them(self, employees, patterns, time_slots):
+        """The limits above actually bind on this instance."""
+        shifts = generate_shifts(
+            employees, time_slots, START, END, optimisation_mode="skill",
+            availability=AvailabilityIndex([], patterns),
+        )
+        assert max(_longest_run(days) for days in _worked_days(shifts).values()) > 2
+        assert max(_weekly_hours(shifts, 8).values()) > 16
+
+    def test_violations_are_reported_as_rejection_reasons(self, employees, patterns, time_slots):
+        """With too few staff the shortage names the limit."""
+        limits = WorkLimits(max_consecutive_days=1)
+        report = GenerationReport()
+        generate_shifts(
+            employees[:2], time_slots, START, END,
+            availability=AvailabilityIndex([], patterns), report=report, limits=limits,
+        )
+        reasons = {summary.reason for issue in report.issues for summary in issue.rejections}
+        assert "連続勤務の上限（1日）を超えます" in reasons
+
+    def test_improve_shifts_keeps_limits(self, employees, patterns, time_slots):
+        """Local search only accepts neighbours within the limits."""
+        availability = AvailabilityIndex([], patterns)
+        limits = WorkLimits(max_consecutive_days=2, weekly_workdays=2.0)
+        shifts = generate_shifts(
+            employees, time_slots, START, END, optimisation_mode="skill",
+            availability=availability, limits=limits,
+        )
+        improved = improve_shifts(
+            shifts, employees, time_slots, availability=availability,
+            max_iterations=2000, time_budget_s=10.0, seed=0, limits=limits,
+        )
+        assert max(_longest_run(days) for days in _worked_days(improved).values()) <= 2
+        assert max(_weekly_hours(improved, 8).values()) <= 16
+
+    @pytest.mark.parametrize("reconcile", [True, False])
+    def test_blocks_keep_limits_across_boundaries(self, employees, patterns, time_slots, reconcile):
+        """Three-day blocks split runs and weeks; the joined roster still keeps the limits."""
+        limits = WorkLimits(max_consecutive_days=2, weekly_workdays=2.0)
+        report = GenerationReport()
+        shifts = generate_shifts_by_blocks(
+            employees, time_slots, START, END, availability=AvailabilityIndex([], patterns),
+            report=report, block_days=3, reconcile=reconcile, limits=limits, seed=0,
+        )
+        assert max(_longest_run(days) for days in _worked_days(shifts).values()) <= 2
+        assert max(_weekly_hours(shifts, 8).values()) <= 16
+        shortage = sum(issue.shortage for issue in report.issues)
+        assert len(shifts) + shortage == 18 * 4
+
+    def test_pareto_front_keeps_limits(self, employees, patterns, time_slots):
+        """Every roster of the front, mode or search step, keeps the limits."""
+        limits = WorkLimits(max_consecutive_days=2, weekly_workdays=2.0)
+        front = generate_pareto_front(
+            employees, time_slots, START, END, availability=AvailabilityIndex([], patterns),
+            iterations=500, seed=0, limits=limits,
+        )
+        for roster in front:
+            assert max(_longest_run(days) for days in _worked_days(roster.shifts).values()) <= 2
+            assert max(_weekly_hours(roster.shifts, 8).values()) <= 16
+
+    def test_blocks_report_shifts_nobody_can_take(self, employees, patterns, time_slots):
+        """A boundary breach without a taker becomes a reported shortage."""
+        limits = WorkLimits(max_consecutive_days=1)
+        report = GenerationReport()
+        shifts = generate_shifts_by_blocks(
+            employees[:4], time_slots, START, END, availability=AvailabilityIndex([], patterns),
+            report=report, block_days=3, limits=limits, seed=0,
+        )
+        assert max(_longest_run(days) for days in _worked_days(shifts).values()) <= 1
+        assert len(shifts) + sum(issue.shortage for issue in report.issues) == 18 * 4
+        reasons = {summary.reason for issue in report.issues for summary in issue.rejections}
+        assert "連続勤務の上限（1日）を超えます" in reasons